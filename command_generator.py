@@ -4,7 +4,7 @@ from utils import get_config_from_file, get_validation_schemas
 import sys
 import os
 from dotenv import load_dotenv
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 from server.amqp import AMQPServer, CFunction, CPipeline
 from server.http import HttpServer, EFunction
 from server.validation import Validator
@@ -12,8 +12,15 @@ from exceptions import BaseException, BaseExceptionType
 from server.exceptions import ServerException
 import logging
 import argparse
+import time
 import model
 from model.action import Action
+from model.incremental import IncrementalGenerator
+from model.exceptions import ModelException
+from model.command import refresh_uids
+from db.command_cache import DiskCommandCache
+from db.driver import AsyncDBDriver
+from db.exceptions import DBDriverException, DBExceptionType
 import mars
 
 # TODO update server code define in build_processor
@@ -27,6 +34,12 @@ __MARS_CONFIG_FILE = './config/mars.yaml'
 # declare amqp topics
 __AMQP_TOPICS = 'request.command_generator','report.command_generator'
 
+# generator keeping the action hashes for incremental regenerations
+__INCREMENTAL_GENERATOR = IncrementalGenerator()
+
+# on-disk cache of the generated command sets, built in main if configured
+__COMMAND_CACHE:DiskCommandCache = None
+
 class ConfigLoader(argparse.Action):
   def __call__(self, parser, namespace, values, option_strings=None) -> Dict:
     try:
@@ -82,28 +95,133 @@ def build_amqp_server(amqp_config:Dict):
     raise error
 
 
+def build_command_cache(cache_config:Dict) -> DiskCommandCache:
+  try:
+    return DiskCommandCache.build_from_config(cache_config, model.DB_DRIVER, mars.GENERATOR_VERSION)
+  except DBDriverException as error:
+    error.add_in_stack(['CONFIG', 'SERVER'])
+    raise error
+
+def __get_cached_commands(id:str, document_hash:str=None) -> List[Dict]:
+  # command set stored on disk for the current document content of the action, with new uids
+  # None if no cache, not stored or generated for another content
+  # without hash, served before reading the action only if the cache follows the modifications
+  if __COMMAND_CACHE is None:
+    return None
+  commands = __COMMAND_CACHE.find(id, document_hash)
+  return refresh_uids(commands) if commands is not None else None
+
+def __build_action_body(id:str, action:Action, read_at:float=None) -> Dict:
+  if action:
+    # the command set stored on disk is only served if the action document did not change
+    commands = __get_cached_commands(action.id, action.hash)
+    if commands is None:
+      try:
+        commands = action.get_commands()
+      except ModelException as error:
+        # not valid definition, reported in the response
+        error.add_in_stack(['GENERATOR'])
+        return {
+          "uid": action.id,
+          "commands": None,
+          "error": error.describe()
+        }
+      # keep the generated commands on disk for the next requests and restarts
+      # not stored if the action is modified since its read (read_at)
+      if __COMMAND_CACHE is not None and commands is not None:
+        __COMMAND_CACHE.save(action.id, action.hash, commands, read_at)
+    # build a body with commands
+    return {
+      "uid": action.id,
+      "commands": commands
+    }
+  else:
+    return {
+      "uid": id,
+      "commands": None
+    }
+
 def build_commands(body:Dict,
                    headers:Dict,
                    path:str,
                    query_args:Dict):
   
-  #get the action id from the body
-  id = body.get('uid')
+  # if a root action id is requested
+  # get the root and all its linked actions (dependencies and next) in execution order
+  if 'root' in body:
+    root = body.get('root')
 
-  # extract data from database and generate an action
-  action = Action.get_from_db(id)
+    # extract the action graph from database and generate the actions
+    read_at = time.time()
+    try:
+      actions = Action.get_graph_from_db(root)
+    except ModelException as error:
+      # not valid graph (ex: cycle), reported in the response
+      error.add_in_stack(['GENERATOR'])
+      return {"root": root, "actions": None, "error": error.describe()}, headers
 
-  if action:
-    # build a body with commands
+    # build a body with the commands of each action
     body = {
-      "uid": action.id,
-      "commands":action.get_commands()
+      "root": root,
+      "actions": [__build_action_body(action.id, action, read_at) for action in actions]
     }
-  else:
+
+    return body, headers
+
+  # if an incremental regeneration of a list of action ids is requested
+  # only the new and modified actions are generated again
+  if 'uids' in body and body.get('incremental'):
+    ids = body.get('uids')
+
+    # regenerate the modified actions and get the report
+    report = __INCREMENTAL_GENERATOR.regenerate(ids)
+
+    # build a body with the commands of each action and the report
+    # the kept command sets are served with new uids, like the other reused sets
+    commands = {id: __INCREMENTAL_GENERATOR.get_commands(id) for id in ids}
     body = {
-      "uid": id,
-      "commands": None
+      "actions": [{"uid": id, "commands": refresh_uids(commands[id]) if commands[id] is not None else None}
+                  for id in ids],
+      **report
     }
+
+    return body, headers
+
+  # if a list of action ids is requested
+  # get all the actions with a single database request
+  if 'uids' in body:
+    ids = body.get('uids')
+
+    # serve the sets stored on disk before reading the database
+    cached = [__get_cached_commands(id) for id in ids]
+    missing = list(dict.fromkeys(id for id, commands in zip(ids, cached) if commands is None))
+
+    # extract the other actions from database and generate them
+    read_at = time.time()
+    actions = dict(zip(missing, Action.get_many_from_db(missing))) if missing else {}
+
+    # build a body with the commands of each action
+    body = {
+      "actions": [{"uid": id, "commands": commands} if commands is not None
+                  else __build_action_body(id, actions[id], read_at) for id, commands in zip(ids, cached)]
+    }
+    
+    return body, headers
+
+  #get the action id from the body
+  id = body.get('uid')
+
+  # serve the set stored on disk before reading the database
+  commands = __get_cached_commands(id)
+  if commands is not None:
+    return {"uid": id, "commands": commands}, headers
+
+  # extract data from database and generate an action
+  read_at = time.time()
+  action = Action.get_from_db(id)
+
+  # build a body with commands
+  body = __build_action_body(id, action, read_at)
     
   return body, headers
 
@@ -121,20 +239,36 @@ def main(activated_server:str,
          environment_config:str,
          validation_schemas:str,):
 
+  global __COMMAND_CACHE
+
   AMQP_SERVER:AMQPServer = None
   HTTP_SERVER:HttpServer = None
-  
+
   # get server configurations
   amqp_config:Dict = server_config.get('amqp')
   http_config:Dict = server_config.get('http')
+  cache_config:Dict = server_config.get('command_cache')
 
   # build the validator object
   request_validator = build_validator(validation_schemas)
 
   # load mars environment
   LOGGER.info("load mars environment")
-  model.EQUIPMENT, model.REFERENCE, model.COMMAND_REGISTER, model.DB_DRIVER = mars.build_environment(environment_config)
-
+  model.EQUIPMENT, model.REFERENCE, model.COMMAND_REGISTER, model.DB_DRIVER, model.COMMAND_STORE = \
+    mars.build_environment(environment_config)
+  model.COMMAND_TRANSLATORS = mars.COMMAND_TRANSLATORS
+
+  # the amqp and http servers run the synchronous generation (build_commands)
+  # the asynchronous driver is used from an event loop with the Action *_async functions
+  if isinstance(model.DB_DRIVER, AsyncDBDriver):
+    raise DBDriverException(['CONFIG', 'SERVER'],
+                            DBExceptionType.CONFIG_ERROR,
+                            "the asynchronous database driver is not supported by the amqp and http servers")
+
+  # if command cache configuration is defined and if parameter activate == true
+  if cache_config and cache_config.get('activate'):
+    LOGGER.info("open command cache")
+    __COMMAND_CACHE = build_command_cache(cache_config)
 
   # if amqp server configuration is defined and if parameter activate == true
   if activated_server == 'amqp' and amqp_config:
@@ -171,16 +305,22 @@ def main(activated_server:str,
                         BaseExceptionType.CONFIG_NOT_CONFORM,
                         "no server activated, check the configuration")
   
-  if HTTP_SERVER:
-    LOGGER.info('run http server and wait for messages')
-    # http_server run on new tread - not implemented yet
-    HTTP_SERVER.run(HTTP_HOST, HTTP_PORT)
-
-  if AMQP_SERVER:
-    # run amqp server on the current tread
-    LOGGER.info('run amqp server and wait for messages')
-    AMQP_SERVER.run()
-  
+  try:
+    if HTTP_SERVER:
+      LOGGER.info('run http server and wait for messages')
+      # http_server run on new tread - not implemented yet
+      HTTP_SERVER.run(HTTP_HOST, HTTP_PORT)
+
+    if AMQP_SERVER:
+      # run amqp server on the current tread
+      LOGGER.info('run amqp server and wait for messages')
+      AMQP_SERVER.run()
+  finally:
+    # write the command sets waiting in the store
+    if model.COMMAND_STORE is not None:
+      LOGGER.info("close command store")
+      model.COMMAND_STORE.close()
+
 if __name__ == '__main__':
   try:
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -0,0 +1,121 @@
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
+from typing import Dict, List
+
+from .driver import AsyncDBDriver
+from .exceptions import DBDriverException, DBExceptionType
+from .mongodb import MONGO_SELECTION_TIMEOUT, RAW_CODEC_OPTIONS, _get_pool_options, _build_graph_pipeline, _get_graph_frontier
+
+class AsyncMongoDriver(AsyncDBDriver):
+  """asyncio driver for mongodb based on motor
+     the client connects on the first query, the existence of the database
+     and the collection is not checked at initialization
+  """
+  def __init__(self, host:str, port:int, database:str, collection:str, pool_options:Dict=None):
+    self.__client:AsyncIOMotorClient = AsyncIOMotorClient(host,
+                                                          port,
+                                                          serverSelectionTimeoutMS=MONGO_SELECTION_TIMEOUT,
+                                                          **(pool_options or {}))
+    self.__collection_name:str = collection
+    # collection returning raw bson documents, decoded lazily on field access
+    self.__collection:AsyncIOMotorCollection = self.__client.get_database(database)\
+                                                            .get_collection(collection,
+                                                                            codec_options=RAW_CODEC_OPTIONS)
+
+  async def find_by_id(self, id:str, projection:Dict=None) -> RawBSONDocument:
+    """coroutine to find a document with using its id
+
+    Args:
+        id (str): document id
+        projection (Dict, optional): mongo projection to apply. Defaults to None.
+
+    Returns:
+        RawBSONDocument: document found
+    """
+    # build the id
+    _id = ObjectId(id)
+    # get the document using the collection coroutine
+    document = await self.__collection.find_one({'_id':_id}, projection)
+    return document
+
+  async def find_by_ids(self, ids:List[str], projection:Dict=None) -> List[RawBSONDocument]:
+    """coroutine to find a list of documents in one query using their ids
+       the order of the documents returned is not guaranteed
+
+    Args:
+        ids (List[str]): list of documents id
+        projection (Dict, optional): mongo projection to apply. Defaults to None.
+
+    Returns:
+        List[RawBSONDocument]: list of documents found
+    """
+    # build the ids
+    _ids = [ObjectId(id) for id in ids]
+    # get all the documents with a single $in query
+    cursor = self.__collection.find({'_id':{'$in':_ids}}, projection)
+    return await cursor.to_list(length=None)
+
+  async def find_graph(self, root_id:str, connect_fields:List[str], projection:Dict=None) -> List[RawBSONDocument]:
+    """coroutine to find a document and all the documents linked to it
+       one aggregation by pass, a new pass starts from the links of the documents found
+       through another link field (ex: dependencies of an action reached through next)
+       the root document and the linked documents are returned once, in any order
+
+    Args:
+        root_id (str): id of the root document
+        connect_fields (List[str]): fields containing the ids of the linked documents
+        projection (Dict, optional): mongo projection to apply. Defaults to None.
+
+    Returns:
+        List[RawBSONDocument]: root document and linked documents
+    """
+    documents = {}
+    start_ids = [str(root_id)]
+    while start_ids:
+      pipeline = _build_graph_pipeline(self.__collection_name, start_ids, connect_fields, projection)
+      cursor = self.__collection.aggregate(pipeline)
+      start_ids = _get_graph_frontier(documents, await cursor.to_list(length=None), connect_fields)
+    return list(documents.values())
+
+  @staticmethod
+  def build_from_config(config:Dict)->'AsyncMongoDriver':
+    """function to build a AsyncMongoDriver object from a configuration
+       config must contains following keys:
+       - host
+       - port
+       - database
+       - collection
+       and can contains following keys:
+       - pool : connection pool configuration (max_size, min_size, max_idle_time)
+      raise an error if config not conform
+    Args:
+        config (Dict): configuration of mongo driver
+
+    Raises:
+        DBDriverException:
+
+    Returns:
+        AsyncMongoDriver: Driver object for asynchronous mongodb communications
+    """
+    try:
+      # get all info from config
+      mongo_host = config['host']
+      mongo_port = config['port']
+      mongo_db = config['database']
+      mongo_coll = config['collection']
+      pool_options = _get_pool_options(config.get('pool') or {})
+
+      return AsyncMongoDriver(mongo_host, mongo_port, mongo_db, mongo_coll, pool_options)
+
+    except DBDriverException as error:
+      # raise if the pool configuration is not conform
+      error.add_in_stack(["MONGODB_ASYNC", "BUILD"])
+      raise error
+
+    except KeyError as error:
+      # raise if info missing in configuration
+      missing_para = error.args[0]
+      raise DBDriverException(["MONGODB_ASYNC", "BUILD"],
+                              DBExceptionType.CONFIG_ERROR,
+                              f"mandatory parameter {missing_para} not found in the configuration")
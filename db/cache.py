@@ -0,0 +1,306 @@
+import logging
+import sys
+import time
+from collections import OrderedDict
+from threading import Event, Lock, Thread
+from typing import Dict, List, Tuple
+
+from .driver import DBDriver
+from .exceptions import DBDriverException, DBExceptionType
+
+LOGGER = logging.getLogger("cmd_generator.db.cache")
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_TTL = 600
+DEFAULT_MAX_MEMORY = 64 * 1024 * 1024
+DEFAULT_POLL_INTERVAL = 10
+
+def _document_size(document) -> int:
+  """function to estimate the memory size of a document in bytes
+
+  Args:
+      document: document or document element
+
+  Returns:
+      int: estimated size in bytes
+  """
+  size = sys.getsizeof(document)
+  # raw bson document, the size is the size of the encoded buffer
+  raw = getattr(document, 'raw', None)
+  if isinstance(raw, bytes):
+    size += len(raw)
+  elif isinstance(document, dict):
+    for key, value in document.items():
+      size += sys.getsizeof(key) + _document_size(value)
+  elif isinstance(document, (list, tuple)):
+    for value in document:
+      size += _document_size(value)
+  return size
+
+class CacheStatistics:
+  """Class used to count the cache hits, misses, evictions and invalidations
+  """
+  def __init__(self):
+    self.hits:int = 0
+    self.misses:int = 0
+    self.evictions:int = 0
+    self.invalidations:int = 0
+
+  def to_dict(self) -> Dict:
+    return {
+      'hits': self.hits,
+      'misses': self.misses,
+      'evictions': self.evictions,
+      'invalidations': self.invalidations
+    }
+
+class CachedDriver(DBDriver):
+  """read-through cache wrapping a database driver
+     documents are stored in a lru bounded by number of entries, time to live and memory size
+     the cache is invalidated using the watch function of the wrapped driver if available
+     (mongo change stream), with a polling of the cached documents as fallback
+  """
+  def __init__(self,
+               driver:DBDriver,
+               max_entries:int=DEFAULT_MAX_ENTRIES,
+               ttl:float=DEFAULT_TTL,
+               max_memory:int=DEFAULT_MAX_MEMORY,
+               poll_interval:float=DEFAULT_POLL_INTERVAL):
+    self.__driver:DBDriver = driver
+    self.__max_entries:int = max_entries
+    self.__ttl:float = ttl
+    self.__max_memory:int = max_memory
+    self.__poll_interval:float = poll_interval
+
+    # id -> (document, projection, expiration time, size)
+    self.__entries:'OrderedDict[str, Tuple[Dict, Dict, float, int]]' = OrderedDict()
+    self.__memory:int = 0
+    # incremented on each invalidation to not store a document fetched before an invalidation
+    self.__generation:int = 0
+    self.__lock = Lock()
+    self.__stop = Event()
+    self.__statistics = CacheStatistics()
+
+    self.__invalidation_thread = Thread(target=self.__follow_invalidations,
+                                        name="db-cache-invalidation",
+                                        daemon=True)
+    self.__invalidation_thread.start()
+
+  @property
+  def driver(self) -> DBDriver:
+    return self.__driver
+
+  @property
+  def statistics(self) -> CacheStatistics:
+    return self.__statistics
+
+  @property
+  def memory(self) -> int:
+    return self.__memory
+
+  def __len__(self) -> int:
+    return len(self.__entries)
+
+  def find_by_id(self, id:str, projection:Dict=None) -> Dict:
+    """function to find a document with using its id
+       the document is read from the cache or from the database on cache miss
+       a cached document is only served for the projection used to fetch it
+
+    Args:
+        id (str): document id
+        projection (Dict, optional): projection to apply. Defaults to None.
+
+    Returns:
+        Dict: document found
+    """
+    id = str(id)
+    with self.__lock:
+      document = self.__get(id, projection)
+      generation = self.__generation
+
+    if document is not None:
+      return document
+
+    document = self.__driver.find_by_id(id, projection)
+
+    if document is not None:
+      self.__put(id, document, projection, generation)
+
+    return document
+
+  def find_by_ids(self, ids:List[str], projection:Dict=None) -> List[Dict]:
+    """function to find a list of documents using their ids
+       the missing documents are requested with a single database query
+
+    Args:
+        ids (List[str]): list of documents id
+        projection (Dict, optional): projection to apply. Defaults to None.
+
+    Returns:
+        List[Dict]: list of documents found
+    """
+    documents = []
+    missing = []
+
+    with self.__lock:
+      for id in ids:
+        document = self.__get(str(id), projection)
+        if document is not None:
+          documents.append(document)
+        else:
+          missing.append(str(id))
+      generation = self.__generation
+
+    if missing:
+      for document in self.__driver.find_by_ids(missing, projection):
+        self.__put(str(document['_id']), document, projection, generation)
+        documents.append(document)
+
+    return documents
+
+  def invalidate(self, id:str=None):
+    """function to remove a document from the cache
+       remove all the documents if id is None
+
+    Args:
+        id (str, optional): document id. Defaults to None.
+    """
+    with self.__lock:
+      self.__generation += 1
+      if id is None:
+        self.__statistics.invalidations += len(self.__entries)
+        self.__entries.clear()
+        self.__memory = 0
+      elif str(id) in self.__entries:
+        self.__statistics.invalidations += 1
+        self.__remove(str(id))
+
+  def close(self):
+    """function to stop the invalidation thread
+    """
+    self.__stop.set()
+
+  def __get(self, id:str, projection:Dict) -> Dict:
+    # must be called with the lock acquired
+    entry = self.__entries.get(id)
+
+    # no document or document fetched with another projection
+    if entry is None or entry[1] != projection:
+      self.__statistics.misses += 1
+      return None
+
+    document, projection, expiration, size = entry
+    if expiration < time.monotonic():
+      # expired document => considered as a miss
+      self.__remove(id)
+      self.__statistics.evictions += 1
+      self.__statistics.misses += 1
+      return None
+
+    self.__entries.move_to_end(id)
+    self.__statistics.hits += 1
+    return document
+
+  def __put(self, id:str, document:Dict, projection:Dict, generation:int):
+    size = _document_size(document)
+
+    # a document bigger than the cache is not stored
+    if size > self.__max_memory:
+      return
+
+    with self.__lock:
+      # an invalidation occured during the database request, the document can be stale
+      if generation != self.__generation:
+        return
+
+      if id in self.__entries:
+        self.__remove(id)
+
+      self.__entries[id] = (document, projection, time.monotonic() + self.__ttl, size)
+      self.__memory += size
+
+      # evict the least recently used documents to respect the limits
+      while len(self.__entries) > self.__max_entries or self.__memory > self.__max_memory:
+        lru_id = next(iter(self.__entries))
+        self.__remove(lru_id)
+        self.__statistics.evictions += 1
+
+  def __remove(self, id:str):
+    # must be called with the lock acquired
+    document, projection, expiration, size = self.__entries.pop(id)
+    self.__memory -= size
+
+  def __follow_invalidations(self):
+    # use the driver change notifications if available
+    if hasattr(self.__driver, 'watch'):
+      try:
+        for id in self.__driver.watch():
+          if self.__stop.is_set():
+            return
+          self.invalidate(id)
+      except DBDriverException as error:
+        LOGGER.warning(f"{error.describe()}, fallback on cache polling")
+        # the modifications during the interruption are unknown
+        self.invalidate()
+
+    self.__poll_invalidations()
+
+  def __poll_invalidations(self):
+    # compare periodically the cached documents with the database documents
+    while not self.__stop.wait(self.__poll_interval):
+      with self.__lock:
+        cached = {id:entry[:2] for id, entry in self.__entries.items()}
+
+      # group the cached ids by projection, one database query by projection
+      groups:List[Tuple[Dict, List[str]]] = []
+      for id, (document, projection) in cached.items():
+        group = next((g for g in groups if g[0] == projection), None)
+        if group is None:
+          group = (projection, [])
+          groups.append(group)
+        group[1].append(id)
+
+      for projection, ids in groups:
+        try:
+          documents = self.__driver.find_by_ids(ids, projection)
+        except DBDriverException as error:
+          LOGGER.warning(f"{error.describe()}, cache invalidated")
+          self.invalidate()
+          break
+
+        documents = {str(document['_id']):document for document in documents}
+        for id in ids:
+          if documents.get(id) != cached[id][0]:
+            self.invalidate(id)
+
+  @staticmethod
+  def build_from_config(config:Dict, driver:DBDriver)->'CachedDriver':
+    """function to build a CachedDriver object from a configuration
+       config can contains following keys:
+       - max_entries
+       - ttl (in seconds)
+       - max_memory (in bytes)
+       - poll_interval (in seconds)
+    Args:
+        config (Dict): configuration of the cache
+        driver (DBDriver): driver to wrap
+
+    Raises:
+        DBDriverException:
+
+    Returns:
+        CachedDriver: driver with a read-through cache
+    """
+    try:
+      max_entries = int(config.get('max_entries', DEFAULT_MAX_ENTRIES))
+      ttl = float(config.get('ttl', DEFAULT_TTL))
+      max_memory = int(config.get('max_memory', DEFAULT_MAX_MEMORY))
+      poll_interval = float(config.get('poll_interval', DEFAULT_POLL_INTERVAL))
+
+      return CachedDriver(driver, max_entries, ttl, max_memory, poll_interval)
+
+    except (TypeError, ValueError) as error:
+      # raise if a parameter has not a numeric value
+      raise DBDriverException(["CACHE", "BUILD"],
+                              DBExceptionType.CONFIG_ERROR,
+                              f"cache configuration not conform : {error}")
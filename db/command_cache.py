@@ -0,0 +1,330 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from threading import Event, Lock, Thread
+from typing import Dict, List
+
+from .exceptions import DBDriverException, DBExceptionType
+
+LOGGER = logging.getLogger("cmd_generator.db.command_cache")
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+DEFAULT_TTL = 24 * 3600
+
+# max duration between the read of an action document and the save of its command set
+# the invalidations are kept during this duration to reject the sets generated from a modified document
+MAX_GENERATION_TIME = 60
+
+__CREATE_TABLE = """CREATE TABLE IF NOT EXISTS command_sets (
+  action TEXT PRIMARY KEY,
+  hash TEXT NOT NULL,
+  commands BLOB NOT NULL,
+  size INTEGER NOT NULL,
+  stored_at REAL NOT NULL,
+  accessed_at REAL NOT NULL
+)"""
+__CREATE_INDEX = "CREATE INDEX IF NOT EXISTS command_sets_accessed_at ON command_sets (accessed_at)"
+
+def _get_stored_hash(version:str, document_hash:str) -> str:
+  # the sets generated by another version of the generator are not served
+  return f"{version}:{document_hash}"
+
+def _open_database(path:str) -> sqlite3.Connection:
+  """function to open the cache database file, the file and the table are created if needed
+
+  Args:
+      path (str): path of the sqlite file
+
+  Returns:
+      sqlite3.Connection: connection to the cache database
+  """
+  directory = os.path.dirname(path)
+  if directory:
+    os.makedirs(directory, exist_ok=True)
+
+  connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+  # write ahead log => the reads are not blocked by the writes
+  connection.execute("PRAGMA journal_mode=WAL")
+  connection.execute("PRAGMA synchronous=NORMAL")
+  connection.execute(__CREATE_TABLE)
+  connection.execute(__CREATE_INDEX)
+  return connection
+
+class DiskCommandCache:
+  """on-disk cache of the generated command sets, stored in a single sqlite file
+     keeps the last command set of each action with the generator version and the hash
+     of the action document used for the generation, a set is only served for the same version and hash
+     the cache survives the restarts of the service and is bounded by the size of the stored sets,
+     the least recently used sets are evicted first
+     a set is served during ttl seconds, the sets of the modified actions are removed early
+     if the database driver can notify the modifications (watch function)
+     while the modifications are followed, the sets stored since the start of the follow
+     are also served by action id only, before reading the action document
+  """
+  def __init__(self,
+               path:str,
+               max_size:int=DEFAULT_MAX_SIZE,
+               ttl:float=DEFAULT_TTL,
+               driver=None,
+               version:str=''):
+    self.__path:str = path
+    self.__version:str = version
+    self.__max_size:int = max_size
+    self.__ttl:float = ttl
+    self.__lock = Lock()
+    self.__stop = Event()
+
+    try:
+      self.__connection:sqlite3.Connection = _open_database(path)
+      self.__size:int = self.__connection.execute("SELECT COALESCE(SUM(size), 0) FROM command_sets")\
+                                         .fetchone()[0]
+    except (sqlite3.Error, OSError) as error:
+      raise DBDriverException(["COMMAND_CACHE"],
+                              DBExceptionType.NOT_REACHABLE,
+                              f"the command cache file {path} can not be opened : {error}")
+
+    # remove the sets of the actions modified in database
+    self.__invalidation_thread = None
+    self.__watched_since:float = None
+    # last invalidation time by action id (None for all the actions), kept MAX_GENERATION_TIME seconds
+    self.__invalidations:Dict[str, float] = {}
+    if driver is not None and hasattr(driver, 'watch'):
+      self.__invalidation_thread = Thread(target=self.__follow_invalidations,
+                                          args=(driver,),
+                                          name="db-command-cache-invalidation",
+                                          daemon=True)
+      self.__invalidation_thread.start()
+
+  @property
+  def version(self) -> str:
+    return self.__version
+
+  @property
+  def size(self) -> int:
+    return self.__size
+
+  @property
+  def watching(self) -> bool:
+    """the modifications of the actions are followed, the sets can be served without document hash
+    """
+    return self.__watched_since is not None and self.__invalidation_thread.is_alive()
+
+  def __len__(self) -> int:
+    with self.__lock:
+      return self.__connection.execute("SELECT COUNT(*) FROM command_sets").fetchone()[0]
+
+  def find(self, action_id:str, document_hash:str=None) -> List[Dict]:
+    """function to find the command set of an action generated for the current action document
+       without document hash, the set is served only if the modifications are followed (see watching)
+       and if it is stored since the start of the follow, the sets of the modified actions being removed
+       the stored uids are returned, the caller must give new uids to the served set (see refresh_uids)
+
+    Args:
+        action_id (str): action id
+        document_hash (str, optional): hash of the current action document. Defaults to None.
+
+    Returns:
+        List[Dict]: command set or None if not stored, expired or generated for another document
+    """
+    now = time.time()
+    if document_hash is None and not self.watching:
+      return None
+
+    try:
+      with self.__lock:
+        row = self.__connection.execute("SELECT hash, commands, stored_at FROM command_sets WHERE action = ?",
+                                        (action_id,)).fetchone()
+        if row is None:
+          return None
+
+        stored_hash, commands, stored_at = row
+        if stored_at + self.__ttl < now:
+          return None
+        if document_hash is not None:
+          if stored_hash != _get_stored_hash(self.__version, document_hash):
+            return None
+        # the modifications done before the follow were not removed
+        elif stored_at < self.__watched_since or stored_hash.rsplit(':', 1)[0] != self.__version:
+          return None
+
+        self.__connection.execute("UPDATE command_sets SET accessed_at = ? WHERE action = ?",
+                                  (now, action_id))
+      return json.loads(commands)
+
+    except sqlite3.Error as error:
+      # a set not readable is generated again
+      LOGGER.warning(f"command set of action {action_id} not readable : {error}")
+      return None
+
+  def save(self, action_id:str, document_hash:str, commands:List[Dict], read_at:float=None):
+    """function to save the command set of an action, replace the set previously stored
+       the least recently used sets are evicted if the max size is reached
+       the set is not stored if the action is modified since the read of its document
+
+    Args:
+        action_id (str): action id
+        document_hash (str): hash of the action document used for the generation
+        commands (List[Dict]): command set
+        read_at (float, optional): time of the action document read (time.time). Defaults to None.
+    """
+    data = json.dumps(commands).encode()
+    size = len(data)
+
+    # a set bigger than the cache is not stored
+    if size > self.__max_size:
+      return
+
+    now = time.time()
+    try:
+      with self.__lock:
+        if read_at is not None and self.__is_modified_since(action_id, read_at, now):
+          return
+        self.__connection.execute("BEGIN IMMEDIATE")
+        try:
+          self.__size -= self.__remove(action_id)
+          self.__connection.execute("INSERT INTO command_sets VALUES (?, ?, ?, ?, ?, ?)",
+                                    (action_id, _get_stored_hash(self.__version, document_hash),
+                                     data, size, now, now))
+          self.__size += size
+
+          # evict the least recently used sets to respect the max size
+          if self.__size > self.__max_size:
+            self.__evict()
+          self.__connection.execute("COMMIT")
+        except sqlite3.Error:
+          self.__connection.execute("ROLLBACK")
+          self.__size = self.__connection.execute("SELECT COALESCE(SUM(size), 0) FROM command_sets")\
+                                         .fetchone()[0]
+          raise
+
+    except sqlite3.Error as error:
+      # best effort, the set will be generated again
+      LOGGER.warning(f"command set of action {action_id} not stored : {error}")
+
+  def invalidate(self, action_id:str=None):
+    """function to remove the command set of an action
+       remove all the sets if action_id is None
+
+    Args:
+        action_id (str, optional): action id. Defaults to None.
+    """
+    try:
+      with self.__lock:
+        self.__add_invalidation(action_id)
+        if action_id is None:
+          self.__connection.execute("DELETE FROM command_sets")
+          self.__size = 0
+        else:
+          self.__size -= self.__remove(action_id)
+    except sqlite3.Error as error:
+      LOGGER.warning(f"command cache not invalidated : {error}")
+
+  def close(self):
+    """function to stop the invalidation and close the cache file
+    """
+    self.__stop.set()
+    with self.__lock:
+      self.__connection.close()
+
+  def __remove(self, action_id:str) -> int:
+    # must be called with the lock acquired, return the size removed
+    row = self.__connection.execute("SELECT size FROM command_sets WHERE action = ?",
+                                    (action_id,)).fetchone()
+    if row is None:
+      return 0
+    self.__connection.execute("DELETE FROM command_sets WHERE action = ?", (action_id,))
+    return row[0]
+
+  def __add_invalidation(self, action_id:str):
+    # must be called with the lock acquired
+    now = time.time()
+    # the dict is ordered by invalidation time => remove the old invalidations from the start
+    self.__invalidations.pop(action_id, None)
+    while self.__invalidations:
+      oldest = next(iter(self.__invalidations))
+      if self.__invalidations[oldest] >= now - MAX_GENERATION_TIME:
+        break
+      del self.__invalidations[oldest]
+    self.__invalidations[action_id] = now
+
+  def __is_modified_since(self, action_id:str, read_at:float, now:float) -> bool:
+    # must be called with the lock acquired
+    # the invalidations older than MAX_GENERATION_TIME are not kept => a longer generation is not stored
+    if read_at < now - MAX_GENERATION_TIME:
+      return True
+    return self.__invalidations.get(action_id, 0) >= read_at or self.__invalidations.get(None, 0) >= read_at
+
+  def __evict(self):
+    # must be called with the lock acquired
+    cursor = self.__connection.execute("SELECT action, size FROM command_sets ORDER BY accessed_at")
+    evicted = []
+    for action_id, size in cursor:
+      if self.__size <= self.__max_size:
+        break
+      evicted.append((action_id,))
+      self.__size -= size
+    cursor.close()
+
+    self.__connection.executemany("DELETE FROM command_sets WHERE action = ?", evicted)
+    LOGGER.debug(f"{len(evicted)} command sets evicted from the command cache")
+
+  def __follow_invalidations(self, driver):
+    try:
+      changes = driver.watch()
+      # the modifications are followed from now
+      self.__watched_since = time.time()
+      for id in changes:
+        if self.__stop.is_set():
+          return
+        self.invalidate(id)
+    except DBDriverException as error:
+      # the sets of the modified actions are still not served (hash check) and removed by the eviction
+      LOGGER.warning(f"{error.describe()}, command sets of the modified actions not removed early")
+
+  @staticmethod
+  def build_from_config(config:Dict, driver=None, version:str='') -> 'DiskCommandCache':
+    """function to build a DiskCommandCache object from a configuration
+       config must contains following keys:
+       - path : path of the sqlite file
+       and can contains following keys:
+       - max_size : max size of the stored sets (in bytes)
+       - ttl : max age of a served set (in seconds)
+
+    Args:
+        config (Dict): configuration of the command cache
+        driver (optional): database driver used to follow the modifications of the actions
+        version (str, optional): version of the generator. Defaults to ''.
+
+    Raises:
+        DBDriverException:
+
+    Returns:
+        DiskCommandCache: on-disk command cache
+    """
+    try:
+      path = config['path']
+      max_size = int(config.get('max_size', DEFAULT_MAX_SIZE))
+      ttl = float(config.get('ttl', DEFAULT_TTL))
+
+      # follow the modifications on the driver wrapped by the cache or the preload
+      while hasattr(driver, 'driver'):
+        driver = driver.driver
+
+      return DiskCommandCache(path, max_size, ttl, driver, version)
+
+    except DBDriverException as error:
+      error.add_in_stack(["BUILD"])
+      raise error
+    except KeyError as error:
+      # raise if info missing in configuration
+      missing_para = error.args[0]
+      raise DBDriverException(["COMMAND_CACHE", "BUILD"],
+                              DBExceptionType.CONFIG_ERROR,
+                              f"mandatory parameter {missing_para} not found in the configuration")
+    except (TypeError, ValueError) as error:
+      # raise if a parameter has not a numeric value
+      raise DBDriverException(["COMMAND_CACHE", "BUILD"],
+                              DBExceptionType.CONFIG_ERROR,
+                              f"command cache configuration not conform : {error}")
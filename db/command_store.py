@@ -0,0 +1,212 @@
+import logging
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+from typing import Dict, List, Tuple
+import time
+
+from pymongo import ReplaceOne
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+
+from .exceptions import DBDriverException, DBExceptionType
+
+LOGGER = logging.getLogger("cmd_generator.db.command_store")
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 1
+
+def _get_key(version:str, action_id:str, document_hash:str) -> str:
+  return f"{version}:{action_id}:{document_hash}"
+
+class CommandStore:
+  """store of the generated command sets, keyed by generator version, action id and action document hash
+     the sets generated by another version of the generator are not served
+     the command sets are written behind : save only put the set in a queue,
+     a background thread writes the queued sets by batch
+     the sets waiting for writing are served by find
+  """
+  def __init__(self,
+               batch_size:int=DEFAULT_BATCH_SIZE,
+               flush_interval:float=DEFAULT_FLUSH_INTERVAL,
+               version:str=''):
+    self.__version:str = version
+    self.__batch_size:int = batch_size
+    self.__flush_interval:float = flush_interval
+    self.__queue:Queue = Queue()
+    self.__pending:Dict[str, List[Dict]] = {}
+    self.__lock = Lock()
+    self.__stop = Event()
+
+    self.__write_thread = Thread(target=self.__write_behind,
+                                 name="db-command-store",
+                                 daemon=True)
+    self.__write_thread.start()
+
+  def find(self, action_id:str, document_hash:str) -> List[Dict]:
+    """function to find the command set generated for an action document
+
+    Args:
+        action_id (str): action id
+        document_hash (str): hash of the action document used for the generation
+
+    Returns:
+        List[Dict]: command set or None if not stored
+    """
+    key = _get_key(self.__version, action_id, document_hash)
+    with self.__lock:
+      commands = self.__pending.get(key)
+
+    if commands is not None:
+      return commands
+
+    return self._read(key)
+
+  def find_many(self, entries:List[Tuple[str, str]]) -> List[List[Dict]]:
+    """function to find the command sets generated for a batch of action documents
+       the sets not waiting for writing are read in one request
+
+    Args:
+        entries (List[Tuple[str, str]]): action ids and hashes of the action documents
+
+    Returns:
+        List[List[Dict]]: command sets in the entries order, None if not stored
+    """
+    keys = [_get_key(self.__version, action_id, document_hash) for action_id, document_hash in entries]
+    with self.__lock:
+      found = {key: self.__pending[key] for key in keys if key in self.__pending}
+
+    missing = [key for key in dict.fromkeys(keys) if key not in found]
+    if missing:
+      found.update(self._read_many(missing))
+
+    return [found.get(key) for key in keys]
+
+  def save(self, action_id:str, document_hash:str, commands:List[Dict]):
+    """function to save a command set, the set is written in background
+
+    Args:
+        action_id (str): action id
+        document_hash (str): hash of the action document used for the generation
+        commands (List[Dict]): command set
+    """
+    key = _get_key(self.__version, action_id, document_hash)
+    with self.__lock:
+      self.__pending[key] = commands
+    self.__queue.put((key, action_id, document_hash, commands))
+
+  @property
+  def version(self) -> str:
+    return self.__version
+
+  def close(self):
+    """function to write the queued command sets and stop the write thread
+    """
+    self.__stop.set()
+    # wake up the write thread waiting for the next set
+    self.__queue.put(None)
+    self.__write_thread.join()
+
+  def __write_behind(self):
+    while not (self.__stop.is_set() and self.__queue.empty()):
+      batch = []
+      deadline = time.monotonic() + self.__flush_interval
+
+      # fill the batch until the batch size or the flush interval is reached
+      while len(batch) < self.__batch_size:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+          break
+        try:
+          item = self.__queue.get(timeout=timeout)
+        except Empty:
+          break
+        # close => write the batch without waiting for the flush interval
+        if item is None:
+          break
+        batch.append(item)
+
+      if not batch:
+        continue
+
+      try:
+        self._write(batch)
+      except DBDriverException as error:
+        # write behind => best effort, the command sets will be generated again
+        LOGGER.warning(f"{error.describe()}, {len(batch)} command sets not stored")
+
+      with self.__lock:
+        for key, *_ in batch:
+          self.__pending.pop(key, None)
+
+  def _read(self, key:str) -> List[Dict]:
+    raise NotImplementedError
+
+  def _read_many(self, keys:List[str]) -> Dict[str, List[Dict]]:
+    raise NotImplementedError
+
+  def _write(self, batch:List[Tuple[str, str, str, List[Dict]]]):
+    raise NotImplementedError
+
+class MemoryCommandStore(CommandStore):
+  """command store keeping the command sets in a dictionnary
+  """
+  def __init__(self,
+               batch_size:int=DEFAULT_BATCH_SIZE,
+               flush_interval:float=DEFAULT_FLUSH_INTERVAL,
+               version:str=''):
+    self.__sets:Dict[str, List[Dict]] = {}
+    super().__init__(batch_size, flush_interval, version)
+
+  def _read(self, key:str) -> List[Dict]:
+    return self.__sets.get(key)
+
+  def _read_many(self, keys:List[str]) -> Dict[str, List[Dict]]:
+    return {key: self.__sets[key] for key in keys if key in self.__sets}
+
+  def _write(self, batch:List[Tuple[str, str, str, List[Dict]]]):
+    for key, action_id, document_hash, commands in batch:
+      self.__sets[key] = commands
+
+class MongoCommandStore(CommandStore):
+  """command store writing the command sets in a mongodb collection
+     one document by set : {_id: version:action_id:hash, version: version, action: action_id, hash: hash, commands: [...]}
+  """
+  def __init__(self,
+               collection:Collection,
+               batch_size:int=DEFAULT_BATCH_SIZE,
+               flush_interval:float=DEFAULT_FLUSH_INTERVAL,
+               version:str=''):
+    self.__collection:Collection = collection
+    super().__init__(batch_size, flush_interval, version)
+
+  def _read(self, key:str) -> List[Dict]:
+    try:
+      document = self.__collection.find_one({'_id':key}, {'commands':1})
+      return document['commands'] if document else None
+    except PyMongoError as error:
+      # a missing set is generated again
+      LOGGER.warning(f"command set {key} not readable : {error}")
+      return None
+
+  def _read_many(self, keys:List[str]) -> Dict[str, List[Dict]]:
+    try:
+      # one request for the whole batch
+      documents = self.__collection.find({'_id':{'$in':keys}}, {'commands':1})
+      return {document['_id']: document['commands'] for document in documents}
+    except PyMongoError as error:
+      # the missing sets are generated again
+      LOGGER.warning(f"{len(keys)} command sets not readable : {error}")
+      return {}
+
+  def _write(self, batch:List[Tuple[str, str, str, List[Dict]]]):
+    requests = [ReplaceOne({'_id':key},
+                           {'version':self.version, 'action':action_id, 'hash':document_hash, 'commands':commands},
+                           upsert=True)
+                for key, action_id, document_hash, commands in batch]
+    try:
+      # one request for the whole batch
+      self.__collection.bulk_write(requests, ordered=False)
+    except PyMongoError as error:
+      raise DBDriverException(["COMMAND_STORE", "WRITE"],
+                              DBExceptionType.NOT_REACHABLE,
+                              f"command sets not written in collection {self.__collection.name} : {error}")
@@ -1,11 +1,18 @@
 
 import abc
+import inspect
+from typing import Dict, List
 class DBDriver(metaclass=abc.ABCMeta):
 
   @classmethod
   def __subclasshook__(cls, subclass):
+    # structural check only for the interface, not for its implementations
+    if cls is not DBDriver:
+      return NotImplemented
     return (hasattr(subclass, 'find_by_id') and 
-            callable(subclass.find_by_id) or 
+            callable(subclass.find_by_id) and
+            hasattr(subclass, 'find_by_ids') and 
+            callable(subclass.find_by_ids) or 
             NotImplemented)
 
   @abc.abstractstaticmethod
@@ -13,6 +20,35 @@ class DBDriver(metaclass=abc.ABCMeta):
     pass
 
   @abc.abstractmethod
-  def find_by_id(self, id:str):
+  def find_by_id(self, id:str, projection:Dict=None):
+    raise NotImplementedError
+
+  @abc.abstractmethod
+  def find_by_ids(self, ids:List[str], projection:Dict=None) -> List[Dict]:
+    raise NotImplementedError
+
+class AsyncDBDriver(metaclass=abc.ABCMeta):
+
+  @classmethod
+  def __subclasshook__(cls, subclass):
+    # structural check only for the interface, not for its implementations
+    if cls is not AsyncDBDriver:
+      return NotImplemented
+    return (hasattr(subclass, 'find_by_id') and 
+            inspect.iscoroutinefunction(subclass.find_by_id) and
+            hasattr(subclass, 'find_by_ids') and 
+            inspect.iscoroutinefunction(subclass.find_by_ids) or 
+            NotImplemented)
+
+  @abc.abstractstaticmethod
+  def build_from_config()->'AsyncDBDriver':
+    pass
+
+  @abc.abstractmethod
+  async def find_by_id(self, id:str, projection:Dict=None):
+    raise NotImplementedError
+
+  @abc.abstractmethod
+  async def find_by_ids(self, ids:List[str], projection:Dict=None) -> List[Dict]:
     raise NotImplementedError
 
@@ -7,6 +7,7 @@ class DBExceptionType(ExceptionType):
   MISSING_ELEMENT = 'DB_MISSING_ELEMENT'
   CONFIG_ERROR = 'DB_CONFIG_ERROR'
   UNKNOW_TYPE = 'DB_TYPE_UNKNOW'
+  UNSUPPORTED_OPERATION = 'DB_UNSUPPORTED_OPERATION'
 
 
 class DBDriverException(BaseException):
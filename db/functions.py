@@ -2,28 +2,44 @@
 from enum import Enum
 
 from attr import has
-from .driver import DBDriver
+from .driver import DBDriver, AsyncDBDriver
 from .mongodb import MongoDriver
+from .memory import MemoryDriver
+from .snapshot import SnapshotDriver
+from .cache import CachedDriver
+from .preload import PreloadedDriver
+from .command_store import CommandStore, MemoryCommandStore, MongoCommandStore
 from db.exceptions import DBDriverException, DBExceptionType
 from utils import GetItemEnum
-from typing import Dict
+from typing import Dict, Union
 from functools import partial
 
 
+def _get_async_mongo_driver() -> AsyncDBDriver:
+  # motor is only needed by the asynchronous mongodb driver, imported on demand
+  from .async_mongodb import AsyncMongoDriver
+  return AsyncMongoDriver
+
 class DBType(Enum, metaclass=GetItemEnum):
   """Enumeration to list all database type supported
 
   Args:
       Enum (DBDriver): DBDriver object associated to the database type
+                       or function returning it if the driver has optional dependencies
   """
   MONGODB = MongoDriver
+  MONGODB_ASYNC = partial(_get_async_mongo_driver)
+  MEMORY = MemoryDriver
+  SNAPSHOT = SnapshotDriver
 
-def build_driver(db_config:Dict) -> DBDriver:
+def build_driver(db_config:Dict) -> Union[DBDriver, AsyncDBDriver]:
   """function to build a database driver from a database configuration
      raise a DBDriverException if
      - the configuration is not conform
      - the database is not reachable
      - the database element not exist
+     if the configuration contains a preload key, the whole collection is loaded in memory
+     else if the configuration contains a cache key, the driver is wrapped in a read-through cache
   Args:
       db_config (Dict): database configuration
 
@@ -31,7 +47,7 @@ def build_driver(db_config:Dict) -> DBDriver:
       DBDriverException: Exception object
 
   Returns:
-      DBDriver: Object ot communicate with the database
+      Union[DBDriver, AsyncDBDriver]: Object ot communicate with the database
   """
   try:
     # get the database type from config
@@ -41,10 +57,41 @@ def build_driver(db_config:Dict) -> DBDriver:
     
     #get the Driver class associated to the type
     driver_class:DBDriver = DBType[db_type]
+    if isinstance(driver_class, partial):
+      driver_class = driver_class()
+
+    # build the driver
+    driver = driver_class.build_from_config(db_config)
+
+    preload_config = db_config.get('preload')
+    cache_config = db_config.get('cache')
+
+    # load the whole collection in memory if a preload is configured
+    # the cache is useless in this case
+    if preload_config:
+      if isinstance(driver, AsyncDBDriver):
+        raise DBDriverException(["DBDRIVER", "PRELOAD"],
+                                DBExceptionType.CONFIG_ERROR,
+                                f"the preload is not supported with the asynchronous database type {db_type}")
+      driver = PreloadedDriver.build_from_config(preload_config, driver)
+
+    # wrap the driver in a cache if a cache is configured
+    elif cache_config:
+      # the cache is synchronous, not usable with an asynchronous driver
+      if isinstance(driver, AsyncDBDriver):
+        raise DBDriverException(["DBDRIVER", "CACHE"],
+                                DBExceptionType.CONFIG_ERROR,
+                                f"the cache is not supported with the asynchronous database type {db_type}")
+      driver = CachedDriver.build_from_config(cache_config, driver)
 
     # return the builded driver
-    return driver_class.build_from_config(db_config)
+    return driver
 
+  except ImportError as error:
+    # raise if an optional dependency of the driver is not installed
+    raise DBDriverException(["DBDRIVER", "IDENTIFY"],
+                            DBExceptionType.CONFIG_ERROR,
+                            f"the database type {db_type} needs a missing dependency : {error}")
   except AssertionError:
     # raise if type not supported
     raise DBDriverException(["DBDRIVER", "IDENTIFY"],
@@ -56,4 +103,56 @@ def build_driver(db_config:Dict) -> DBDriver:
     raise DBDriverException(["DBDRIVER"],
                             DBExceptionType.CONFIG_ERROR,
                             f"the parameter {missing_para} is missing in the configuration")
-  
\ No newline at end of file
+
+def build_command_store(store_config:Dict,
+                        driver:Union[DBDriver, AsyncDBDriver],
+                        version:str='') -> CommandStore:
+  """function to build the store of the generated command sets
+     the sets are stored in a collection of the mongodb database if the driver is a mongodb driver
+     in memory else
+     store_config can contains following keys:
+     - collection : name of the collection (mandatory for mongodb)
+     - batch_size : max number of sets written in one request
+     - flush_interval : max time in seconds before writing the waiting sets
+
+  Args:
+      store_config (Dict): command store configuration
+      driver (Union[DBDriver, AsyncDBDriver]): database driver
+      version (str, optional): version of the generator, part of the key of the stored sets
+
+  Raises:
+      DBDriverException: Exception object
+
+  Returns:
+      CommandStore: command sets store
+  """
+  try:
+    batch_size = int(store_config.get('batch_size', 100))
+    flush_interval = float(store_config.get('flush_interval', 1))
+
+    if isinstance(driver, AsyncDBDriver):
+      raise DBDriverException(["COMMAND_STORE", "BUILD"],
+                              DBExceptionType.CONFIG_ERROR,
+                              "the command store is not supported with an asynchronous database driver")
+
+    # get the driver wrapped by the cache or the preload
+    while hasattr(driver, 'driver'):
+      driver = driver.driver
+
+    if isinstance(driver, MongoDriver):
+      collection = driver.get_collection(store_config['collection'])
+      return MongoCommandStore(collection, batch_size, flush_interval, version)
+    else:
+      return MemoryCommandStore(batch_size, flush_interval, version)
+
+  except KeyError as error:
+    # raise if bad configuration
+    missing_para = error.args[0]
+    raise DBDriverException(["COMMAND_STORE", "BUILD"],
+                            DBExceptionType.CONFIG_ERROR,
+                            f"the parameter {missing_para} is missing in the configuration")
+  except (TypeError, ValueError) as error:
+    # raise if a parameter has not a numeric value
+    raise DBDriverException(["COMMAND_STORE", "BUILD"],
+                            DBExceptionType.CONFIG_ERROR,
+                            f"command store configuration not conform : {error}")
@@ -0,0 +1,132 @@
+from queue import Queue
+from threading import Lock
+from typing import Dict, Iterator, List
+
+from .driver import DBDriver
+from .exceptions import DBDriverException, DBExceptionType
+
+class MemoryDriver(DBDriver):
+  """in process database driver storing the documents in a dictionnary
+     used as a local stand-in for mongodb, documents are indexed by str(_id)
+     insert, update and delete notify the consumers of the watch function
+  """
+  def __init__(self, documents:List[Dict]=None):
+    self.__documents:Dict[str, Dict] = {}
+    self.__watchers:List[Queue] = []
+    self.__lock = Lock()
+
+    for document in documents or []:
+      self.__documents[str(document['_id'])] = document
+
+  def find_by_id(self, id:str, projection:Dict=None) -> Dict:
+    """function to find a document with using its id
+       the projection is not applied, the whole document is returned
+
+    Args:
+        id (str): document id
+        projection (Dict, optional): ignored. Defaults to None.
+
+    Returns:
+        Dict: document found
+    """
+    return self.__documents.get(str(id))
+
+  def find_by_ids(self, ids:List[str], projection:Dict=None) -> List[Dict]:
+    """function to find a list of documents using their ids
+       the projection is not applied, the whole documents are returned
+
+    Args:
+        ids (List[str]): list of documents id
+        projection (Dict, optional): ignored. Defaults to None.
+
+    Returns:
+        List[Dict]: list of documents found
+    """
+    documents = [self.__documents.get(str(id)) for id in ids]
+    return [document for document in documents if document]
+
+  def find_all(self, projection:Dict=None) -> Iterator[Dict]:
+    """function to iterate on all the documents
+       the projection is not applied, the whole documents are returned
+
+    Args:
+        projection (Dict, optional): ignored. Defaults to None.
+
+    Yields:
+        Dict: document
+    """
+    yield from list(self.__documents.values())
+
+  def insert(self, document:Dict):
+    """function to insert or replace a document and notify the watchers
+
+    Args:
+        document (Dict): document to insert
+    """
+    id = str(document['_id'])
+    self.__documents[id] = document
+    self.__notify(id)
+
+  def update(self, id:str, fields:Dict):
+    """function to update the fields of a document and notify the watchers
+
+    Args:
+        id (str): document id
+        fields (Dict): fields to update
+    """
+    id = str(id)
+    # replace the document to not modify the object already served
+    self.__documents[id] = {**self.__documents[id], **fields}
+    self.__notify(id)
+
+  def delete(self, id:str):
+    """function to delete a document and notify the watchers
+
+    Args:
+        id (str): document id
+    """
+    id = str(id)
+    self.__documents.pop(id, None)
+    self.__notify(id)
+
+  def watch(self) -> Iterator[str]:
+    """function to follow the modifications of the documents
+       the modifications done after the call are yielded
+       blocking iterator, yield the id of each modified document
+
+    Returns:
+        Iterator[str]: ids of the modified documents
+    """
+    queue = Queue()
+    with self.__lock:
+      self.__watchers.append(queue)
+
+    return iter(queue.get, object())
+
+  def __notify(self, id:str):
+    with self.__lock:
+      for queue in self.__watchers:
+        queue.put(id)
+
+  @staticmethod
+  def build_from_config(config:Dict)->'MemoryDriver':
+    """function to build a MemoryDriver object from a configuration
+       config can contains the following keys:
+       - documents : list of documents to load
+    Args:
+        config (Dict): configuration of memory driver
+
+    Raises:
+        DBDriverException:
+
+    Returns:
+        MemoryDriver: in process driver
+    """
+    try:
+      return MemoryDriver(config.get('documents'))
+
+    except KeyError as error:
+      # raise if a document has no _id
+      raise DBDriverException(["MEMORY", "BUILD"],
+                              DBExceptionType.CONFIG_ERROR,
+                              f"document without {error.args[0]} key in the configuration")
@@ -1,50 +1,72 @@
 import imp
 from pymongo import MongoClient
 from bson.objectid import ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
 from pymongo.collection import Collection, Cursor
 from pymongo.database import Database
-from pymongo.errors import ServerSelectionTimeoutError
-from typing import Dict
+from pymongo.errors import ServerSelectionTimeoutError, PyMongoError
+from typing import Dict, Iterator, List
 
 from .driver import DBDriver
 from .exceptions import DBDriverException, DBExceptionType
 
 MONGO_SELECTION_TIMEOUT = 10
+# pool configuration keys and associated MongoClient options
+POOL_OPTIONS = {
+  'max_size': 'maxPoolSize',
+  'min_size': 'minPoolSize',
+  'max_idle_time': 'maxIdleTimeMS'
+}
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
  
+def _get_pool_options(pool_config:Dict) -> Dict:
+  """function to build the MongoClient connection pool options from the pool configuration
+     pool_config can contains the following keys:
+     - max_size : max number of connections in the pool
+     - min_size : number of connections opened in background at startup (warm-up)
+     - max_idle_time : max time in ms a connection can remain idle in the pool
+
+  Args:
+      pool_config (Dict): pool configuration
+
+  Raises:
+      DBDriverException
+
+  Returns:
+      Dict: MongoClient keyword arguments
+  """
+  options = {}
+  try:
+    for key, option in POOL_OPTIONS.items():
+      if key in pool_config:
+        options[option] = int(pool_config[key])
+    return options
+  except (TypeError, ValueError):
+    # raise if an option has not an integer value
+    raise DBDriverException(['POOL'],
+                            DBExceptionType.CONFIG_ERROR,
+                            f"the pool parameter {key} must be an integer")
+
 def _get_database(database:str, client:MongoClient) -> Database:
   """function to get the database object
-     raise an error if database not exist
+     no request is sent to the server,
+     the existence of the database is checked with its collection
 
   Args:
       database (str): database name
       client (MongoClient): Mongo Client
 
-  Raises:
-      DBDriverException
-
   Returns:
       Database: Object representing the database
   """
-  try:
-    # get the list of database in mongo server
-    db_names = client.list_database_names()
-    #check if database in listif not raise error
-    assert(database in db_names)
-    return client.get_database(database)
-  except AssertionError :
-    # raise if database not exist in server
-    raise DBDriverException(['DATABASE'],
-                            DBExceptionType.MISSING_ELEMENT,
-                            f"the database {database} not exist in mongodb instance")
-  except ServerSelectionTimeoutError:
-    # raise if client not able to reach the server
-    raise DBDriverException(["CLIENT"],
-                            DBExceptionType.NOT_REACHABLE,
-                            f"no mongo server listening on url {client.HOST}:{client.PORT}") 
+  return client.get_database(database)
 
 def _get_collection(collection:str, database:Database) -> Collection:
   """function to get the collection object
      raise an error if collection not exist
+     the existence is checked with a listCollections command filtered on the collection name
+     (no enumeration of the databases and collections, only the authorized collections are listed)
 
   Args:
       database (str): collection name
@@ -58,38 +80,284 @@ def _get_collection(collection:str, database:Database) -> Collection:
   """
   try:
     # check if collection exist in database if not raise an error
-    assert(collection in database.list_collection_names())
+    collection_names = database.list_collection_names(filter={'name':collection},
+                                                      authorizedCollections=True)
+    assert(collection in collection_names)
     return database.get_collection(collection)
   except AssertionError:
     # raise if collection not exist in database 
+    # (a database without collection does not exist in mongodb)
     db_name = database.name
     raise DBDriverException(['COLLECTION'],
                             DBExceptionType.MISSING_ELEMENT,
                             f"the collection {collection} not exist in database {db_name}")
+  except ServerSelectionTimeoutError:
+    # raise if client not able to reach the server
+    client = database.client
+    raise DBDriverException(["CLIENT"],
+                            DBExceptionType.NOT_REACHABLE,
+                            f"no mongo server listening on url {client.HOST}:{client.PORT}") 
+
+def _build_graph_pipeline(collection:str,
+                          start_ids:List[str],
+                          connect_fields:List[str],
+                          projection:Dict=None) -> List[Dict]:
+  """function to build the aggregation pipeline getting documents and the documents linked to them
+     a $graphLookup stage by link field gets the documents reachable through this field only,
+     the start documents and the linked documents are returned once
+     the paths mixing the link fields are followed by the next passes (see _get_graph_frontier)
+
+  Args:
+      collection (str): collection name
+      start_ids (List[str]): ids of the start documents
+      connect_fields (List[str]): fields containing the ids of the linked documents
+      projection (Dict, optional): mongo projection to apply, the link fields are kept. Defaults to None.
+
+  Returns:
+      List[Dict]: aggregation pipeline
+  """
+  lookup_fields = [f'_graph_{field}' for field in connect_fields]
+
+  # get the start documents
+  pipeline = [{'$match': {'_id': {'$in': [ObjectId(id) for id in start_ids]}}}]
+
+  # get the documents reachable through each link field
+  for field, lookup_field in zip(connect_fields, lookup_fields):
+    pipeline.append({
+      '$graphLookup': {
+        'from': collection,
+        'startWith': f'${field}',
+        'connectFromField': field,
+        'connectToField': '_id',
+        'as': lookup_field
+      }
+    })
+
+  # flatten the root and the linked documents, one document by id
+  pipeline.extend([
+    {'$project': {'_graph': {'$concatArrays': [['$$ROOT']] + [f'${f}' for f in lookup_fields]}}},
+    {'$unwind': '$_graph'},
+    {'$replaceRoot': {'newRoot': '$_graph'}},
+    {'$unset': lookup_fields},
+    {'$group': {'_id': '$_id', '_document': {'$first': '$$ROOT'}}},
+    {'$replaceRoot': {'newRoot': '$_document'}}
+  ])
+
+  if projection:
+    # the link fields are needed to follow the mixed paths
+    pipeline.append({'$project': {**projection, **{field: 1 for field in connect_fields}}})
+
+  return pipeline
+
+def _get_graph_frontier(documents:Dict[str, Dict],
+                        new_documents:List[Dict],
+                        connect_fields:List[str]) -> List[str]:
+  """function to add the documents of a graph pass and to get the linked ids not found yet
+
+  Args:
+      documents (Dict[str, Dict]): documents already found by id, updated with the new documents
+      new_documents (List[Dict]): documents of the pass
+      connect_fields (List[str]): fields containing the ids of the linked documents
+
+  Returns:
+      List[str]: ids to start the next pass from, empty if the graph is complete
+  """
+  for document in new_documents:
+    documents.setdefault(str(document['_id']), document)
+
+  frontier = {str(id) for document in new_documents
+                      for field in connect_fields
+                      for id in (document.get(field) or [])}
+  return [id for id in frontier if id not in documents]
 
 class MongoDriver(DBDriver):
-  def __init__(self, host:str, port:int, database:str, collection:str):
+  def __init__(self,
+               host:str,
+               port:int,
+               database:str,
+               collection:str,
+               lazy:bool=False,
+               pool_options:Dict=None):
+    """MongoDriver object initializer
+       in lazy mode, the existence of the collection is checked on the first query
+
+    Args:
+        host (str): mongo server host
+        port (int): mongo server port
+        database (str): database name
+        collection (str): collection name
+        lazy (bool, optional): defer the collection check to the first query. Defaults to False.
+        pool_options (Dict, optional): MongoClient pool options. Defaults to None.
+    """
     self.__client:MongoClient = MongoClient(host,
                                             port,
-                                            serverSelectionTimeoutMS=MONGO_SELECTION_TIMEOUT)
+                                            serverSelectionTimeoutMS=MONGO_SELECTION_TIMEOUT,
+                                            **(pool_options or {}))
     self.__db:Database = _get_database(database, self.__client)
-    self.__collection:Collection = _get_collection(collection, self.__db)
+    self.__collection_name:str = collection
+    self.__collection:Collection = None
+    self.__raw_collection:Collection = None
+
+    if not lazy:
+      self.__init_collection()
+
+  def __init_collection(self):
+    self.__collection = _get_collection(self.__collection_name, self.__db)
+    # collection returning raw bson documents, decoded lazily on field access
+    self.__raw_collection = self.__collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+
+  def __get_raw_collection(self) -> Collection:
+    # in lazy mode, check the collection on the first query
+    if self.__raw_collection is None:
+      try:
+        self.__init_collection()
+      except DBDriverException as error:
+        error.add_in_stack(["MONGODB"])
+        raise error
+    return self.__raw_collection
+
+  def get_collection(self, collection:str) -> Collection:
+    """function to get another collection of the driver database
+       the collection shares the connection pool of the driver
+
+    Args:
+        collection (str): collection name
+
+    Returns:
+        Collection: Object representing the collection
+    """
+    return self.__db.get_collection(collection)
 
-  def find_by_id(self, id:str) -> Dict:
+  def find_by_id(self, id:str, projection:Dict=None) -> RawBSONDocument:
     """function to find a document with using its id
+       the document is returned under raw bson format, the fields are decoded on access
 
     Args:
         id (str): document id
+        projection (Dict, optional): mongo projection to apply. Defaults to None.
 
     Returns:
-        Dict: document found
+        RawBSONDocument: document found
     """
     # build the id
     _id = ObjectId(id)
     # get the document using the collection function
-    document = self.__collection.find_one({'_id':_id})
+    document = self.__get_raw_collection().find_one({'_id':_id}, projection)
     return document
 
+  def find_by_ids(self, ids:List[str], projection:Dict=None) -> List[RawBSONDocument]:
+    """function to find a list of documents in one query using their ids
+       the order of the documents returned is not guaranteed
+       the documents are returned under raw bson format, the fields are decoded on access
+
+    Args:
+        ids (List[str]): list of documents id
+        projection (Dict, optional): mongo projection to apply. Defaults to None.
+
+    Returns:
+        List[RawBSONDocument]: list of documents found
+    """
+    # build the ids
+    _ids = [ObjectId(id) for id in ids]
+    # get all the documents with a single $in query
+    cursor:Cursor = self.__get_raw_collection().find({'_id':{'$in':_ids}}, projection)
+    return list(cursor)
+
+  def find_all(self, projection:Dict=None, batch_size:int=1000) -> Iterator[RawBSONDocument]:
+    """function to stream all the documents of the collection sorted by id
+       the documents are read with a server side cursor, batch by batch
+
+    Args:
+        projection (Dict, optional): mongo projection to apply. Defaults to None.
+        batch_size (int, optional): number of documents by cursor batch. Defaults to 1000.
+
+    Yields:
+        RawBSONDocument: document of the collection
+    """
+    cursor:Cursor = self.__get_raw_collection().find({}, projection)\
+                                               .sort('_id', 1)\
+                                               .batch_size(batch_size)
+    with cursor:
+      for document in cursor:
+        yield document
+
+  def find_updated_since(self, field:str, watermark, projection:Dict=None) -> Iterator[RawBSONDocument]:
+    """function to stream the documents updated at or after a watermark
+       sorted by the watermark field
+       the documents written with the watermark date are returned again, several documents
+       can share a date and some of them can be written after the watermark was read
+
+    Args:
+        field (str): document field containing the update date
+        watermark: last update date already known
+        projection (Dict, optional): mongo projection to apply. Defaults to None.
+
+    Yields:
+        RawBSONDocument: document updated at or after the watermark
+    """
+    cursor:Cursor = self.__get_raw_collection().find({field:{'$gte':watermark}}, projection)\
+                                               .sort(field, 1)
+    with cursor:
+      for document in cursor:
+        yield document
+
+  def find_graph(self, root_id:str, connect_fields:List[str], projection:Dict=None) -> List[RawBSONDocument]:
+    """function to find a document and all the documents linked to it
+       one aggregation by pass, a new pass starts from the links of the documents found
+       through another link field (ex: dependencies of an action reached through next)
+       the root document and the linked documents are returned once, in any order
+
+    Args:
+        root_id (str): id of the root document
+        connect_fields (List[str]): fields containing the ids of the linked documents
+        projection (Dict, optional): mongo projection to apply. Defaults to None.
+
+    Returns:
+        List[RawBSONDocument]: root document and linked documents
+    """
+    documents = {}
+    start_ids = [str(root_id)]
+    while start_ids:
+      pipeline = _build_graph_pipeline(self.__collection_name, start_ids, connect_fields, projection)
+      start_ids = _get_graph_frontier(documents,
+                                      list(self.__get_raw_collection().aggregate(pipeline)),
+                                      connect_fields)
+    return list(documents.values())
+
+  def watch(self) -> Iterator[str]:
+    """function to follow the modifications of the collection documents using a change stream
+       the change stream is opened by the call, all the modifications done after the call are yielded
+       blocking iterator, yield the id of each modified document
+       or None if the whole collection is invalidated (drop, rename ...)
+       need a replica set, raise an error if change streams are not supported
+
+    Raises:
+        DBDriverException
+
+    Returns:
+        Iterator[str]: ids of the modified documents
+    """
+    try:
+      stream = self.__get_raw_collection().watch()
+    except PyMongoError as error:
+      # raise if the change stream can not be opened
+      raise DBDriverException(["MONGODB", "WATCH"],
+                              DBExceptionType.UNSUPPORTED_OPERATION,
+                              f"change stream on collection {self.__collection_name} not opened : {error}")
+    return self.__iter_changes(stream)
+
+  def __iter_changes(self, stream) -> Iterator[str]:
+    try:
+      with stream:
+        for change in stream:
+          document_key = change.get('documentKey')
+          yield str(document_key['_id']) if document_key else None
+    except PyMongoError as error:
+      # raise if the change stream can not be opened or is interrupted
+      raise DBDriverException(["MONGODB", "WATCH"],
+                              DBExceptionType.UNSUPPORTED_OPERATION,
+                              f"change stream on collection {self.__collection_name} interrupted : {error}")
+
   @staticmethod
   def build_from_config(config:Dict)->'MongoDriver':
     """function to build a MongoDriver object from a configuration
@@ -98,6 +366,9 @@ class MongoDriver(DBDriver):
        - port
        - database
        - collection
+       and can contains following keys:
+       - lazy : defer the collection check to the first query
+       - pool : connection pool configuration (max_size, min_size, max_idle_time)
       raise an error if config not conform or database not reachable ...
     Args:
         config (Dict): configuration of mongo driver
@@ -114,8 +385,10 @@ class MongoDriver(DBDriver):
       mongo_port = config['port']
       mongo_db = config['database']
       mongo_coll = config['collection']
+      lazy = bool(config.get('lazy', False))
+      pool_options = _get_pool_options(config.get('pool') or {})
 
-      return MongoDriver(mongo_host, mongo_port, mongo_db, mongo_coll)
+      return MongoDriver(mongo_host, mongo_port, mongo_db, mongo_coll, lazy, pool_options)
     
     except DBDriverException as error:
       # raise if error during MongoDriver initialization
@@ -0,0 +1,199 @@
+import logging
+from threading import Event, Thread
+from typing import Dict, List
+
+from .driver import DBDriver
+from .exceptions import DBDriverException, DBExceptionType
+
+LOGGER = logging.getLogger("cmd_generator.db.preload")
+
+DEFAULT_SYNC_INTERVAL = 5
+DEFAULT_WATERMARK_FIELD = 'updated_at'
+
+class PreloadedDriver(DBDriver):
+  """driver keeping the whole collection in memory
+     all the documents are loaded at initialization using the find_all function of the wrapped driver
+     the deltas are applied in background from the watch function of the wrapped driver (mongo change stream),
+     the change stream is opened before the load, no modification is lost between the load and the stream
+     as fallback, the documents updated since the last known watermark (included) are queried periodically
+     (the deletions are only followed with the change notifications)
+     or, without watermark field in the documents, the whole collection is reloaded periodically
+  """
+  def __init__(self,
+               driver:DBDriver,
+               sync_interval:float=DEFAULT_SYNC_INTERVAL,
+               watermark_field:str=DEFAULT_WATERMARK_FIELD):
+    self.__driver:DBDriver = driver
+    self.__sync_interval:float = sync_interval
+    self.__watermark_field:str = watermark_field
+    self.__watermark = None
+    self.__documents:Dict[str, Dict] = {}
+    self.__stop = Event()
+
+    # open the change notifications before the load
+    # the documents modified during the load are loaded again from the notifications
+    self.__changes = None
+    if hasattr(driver, 'watch'):
+      try:
+        self.__changes = driver.watch()
+      except DBDriverException as error:
+        LOGGER.warning(f"{error.describe()}, fallback on periodic synchronization")
+
+    # bulk load of the collection
+    for document in driver.find_all():
+      self.__store(document)
+
+    LOGGER.info(f"{len(self.__documents)} documents preloaded")
+
+    self.__sync_thread = Thread(target=self.__follow_updates,
+                                name="db-preload-sync",
+                                daemon=True)
+    self.__sync_thread.start()
+
+  @property
+  def driver(self) -> DBDriver:
+    return self.__driver
+
+  @property
+  def watermark(self):
+    return self.__watermark
+
+  def __len__(self) -> int:
+    return len(self.__documents)
+
+  def find_by_id(self, id:str, projection:Dict=None) -> Dict:
+    """function to find a document with using its id
+       the projection is not applied, the whole document is returned
+
+    Args:
+        id (str): document id
+        projection (Dict, optional): ignored. Defaults to None.
+
+    Returns:
+        Dict: document found
+    """
+    return self.__documents.get(str(id))
+
+  def find_by_ids(self, ids:List[str], projection:Dict=None) -> List[Dict]:
+    """function to find a list of documents using their ids
+       the projection is not applied, the whole documents are returned
+
+    Args:
+        ids (List[str]): list of documents id
+        projection (Dict, optional): ignored. Defaults to None.
+
+    Returns:
+        List[Dict]: list of documents found
+    """
+    documents = [self.__documents.get(str(id)) for id in ids]
+    return [document for document in documents if document is not None]
+
+  def find_all(self, projection:Dict=None):
+    """function to iterate on all the documents in memory
+       the projection is not applied, the whole documents are returned
+
+    Args:
+        projection (Dict, optional): ignored. Defaults to None.
+
+    Yields:
+        Dict: document
+    """
+    yield from list(self.__documents.values())
+
+  def close(self):
+    """function to stop the synchronization thread
+    """
+    self.__stop.set()
+
+  def __store(self, document:Dict):
+    self.__documents[str(document['_id'])] = document
+
+    # update the watermark with the last update date
+    updated_at = document.get(self.__watermark_field)
+    if updated_at is not None and (self.__watermark is None or updated_at > self.__watermark):
+      self.__watermark = updated_at
+
+  def __follow_updates(self):
+    # use the driver change notifications if available
+    if self.__changes is not None:
+      try:
+        for id in self.__changes:
+          if self.__stop.is_set():
+            return
+          self.__apply_change(id)
+      except DBDriverException as error:
+        LOGGER.warning(f"{error.describe()}, fallback on periodic synchronization")
+        # catch up the modifications done during the interruption
+        self.__synchronize()
+
+    if self.__watermark is None or not hasattr(self.__driver, 'find_updated_since'):
+      LOGGER.warning(f"no {self.__watermark_field} watermark, the whole collection is reloaded "
+                     f"every {self.__sync_interval} s")
+
+    while not self.__stop.wait(self.__sync_interval):
+      try:
+        self.__synchronize()
+      except DBDriverException as error:
+        LOGGER.warning(error.describe())
+
+  def __synchronize(self):
+    # documents updated since the watermark (the documents of the watermark date are stored again,
+    # the store is idempotent), or the whole collection without watermark
+    if self.__watermark is None or not hasattr(self.__driver, 'find_updated_since'):
+      self.__apply_change(None)
+    else:
+      self.__sync_from_watermark()
+
+  def __apply_change(self, id:str):
+    # the whole collection is invalidated, reload all the documents
+    if id is None:
+      self.__documents = {str(document['_id']):document for document in self.__driver.find_all()}
+      for document in self.__documents.values():
+        self.__store(document)
+      return
+
+    document = self.__driver.find_by_id(id)
+    if document is None:
+      self.__documents.pop(id, None)
+    else:
+      self.__store(document)
+
+  def __sync_from_watermark(self):
+    for document in self.__driver.find_updated_since(self.__watermark_field, self.__watermark):
+      self.__store(document)
+
+  @staticmethod
+  def build_from_config(config:Dict, driver:DBDriver)->'PreloadedDriver':
+    """function to build a PreloadedDriver object from a configuration
+       config can contains following keys:
+       - sync_interval (in seconds)
+       - watermark_field : document field containing the last update date
+    Args:
+        config (Dict): configuration of the preload
+        driver (DBDriver): driver to load the documents from
+
+    Raises:
+        DBDriverException:
+
+    Returns:
+        PreloadedDriver: driver with the whole collection in memory
+    """
+    try:
+      # the wrapped driver must be able to stream the whole collection
+      assert(hasattr(driver, 'find_all'))
+
+      sync_interval = float(config.get('sync_interval', DEFAULT_SYNC_INTERVAL))
+      watermark_field = config.get('watermark_field', DEFAULT_WATERMARK_FIELD)
+
+      return PreloadedDriver(driver, sync_interval, watermark_field)
+
+    except AssertionError:
+      raise DBDriverException(["PRELOAD", "BUILD"],
+                              DBExceptionType.UNSUPPORTED_OPERATION,
+                              f"the driver {driver.__class__.__name__} can not stream the whole collection")
+
+    except (TypeError, ValueError) as error:
+      # raise if a parameter has not a numeric value
+      raise DBDriverException(["PRELOAD", "BUILD"],
+                              DBExceptionType.CONFIG_ERROR,
+                              f"preload configuration not conform : {error}")
@@ -0,0 +1,204 @@
+import mmap
+import os
+import struct
+from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
+from typing import Dict, Iterable, Iterator, List
+
+from .driver import DBDriver
+from .exceptions import DBDriverException, DBExceptionType
+
+"""
+snapshot file layout (little endian) :
+- header : magic (8 bytes), number of documents (uint64), index offset (uint64)
+- records : bson documents, one after the other
+- index : one entry by document sorted by id : id (12 bytes), record offset (uint64), record size (uint32)
+"""
+
+SNAPSHOT_MAGIC = b'MARSSNP1'
+HEADER_FORMAT = struct.Struct('<8sQQ')
+INDEX_FORMAT = struct.Struct('<12sQI')
+
+def write_snapshot(documents:Iterable[RawBSONDocument], file_path:str) -> int:
+  """function to write a snapshot file from a list of raw bson documents
+     the file is written in a temporary file then renamed
+
+  Args:
+      documents (Iterable[RawBSONDocument]): documents to export
+      file_path (str): path of the snapshot file
+
+  Returns:
+      int: number of documents written
+  """
+  tmp_path = file_path + '.tmp'
+  index = []
+
+  with open(tmp_path, 'wb') as snapshot:
+    # reserve the header place
+    snapshot.write(bytes(HEADER_FORMAT.size))
+    offset = HEADER_FORMAT.size
+
+    # write the records
+    for document in documents:
+      raw = document.raw
+      snapshot.write(raw)
+      index.append((document['_id'].binary, offset, len(raw)))
+      offset += len(raw)
+
+    # write the sorted index after the records
+    index.sort()
+    for entry in index:
+      snapshot.write(INDEX_FORMAT.pack(*entry))
+
+    # write the header
+    snapshot.seek(0)
+    snapshot.write(HEADER_FORMAT.pack(SNAPSHOT_MAGIC, len(index), offset))
+
+  os.replace(tmp_path, file_path)
+  return len(index)
+
+class SnapshotDriver(DBDriver):
+  """database driver reading the documents from a snapshot file
+     the file is memory mapped, a document is found with a binary search in the index
+     and returned as a raw bson document built from a slice of the mapped file
+  """
+  def __init__(self, file_path:str):
+    self.__file = open(file_path, 'rb')
+    self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, self.__count, self.__index_offset = HEADER_FORMAT.unpack_from(self.__map, 0)
+    if magic != SNAPSHOT_MAGIC:
+      raise DBDriverException(['SNAPSHOT'],
+                              DBExceptionType.CONFIG_ERROR,
+                              f"the file {file_path} is not a snapshot file")
+
+  def __len__(self) -> int:
+    return self.__count
+
+  def __search(self, binary_id:bytes) -> RawBSONDocument:
+    # binary search of the id in the sorted index
+    low = 0
+    high = self.__count - 1
+    while low <= high:
+      middle = (low + high) // 2
+      position = self.__index_offset + middle * INDEX_FORMAT.size
+      entry_id = self.__map[position:position + 12]
+      if entry_id < binary_id:
+        low = middle + 1
+      elif entry_id > binary_id:
+        high = middle - 1
+      else:
+        _, offset, size = INDEX_FORMAT.unpack_from(self.__map, position)
+        return RawBSONDocument(self.__map[offset:offset + size])
+    return None
+
+  def find_by_id(self, id:str, projection:Dict=None) -> RawBSONDocument:
+    """function to find a document with using its id
+       the projection is not applied, the whole document is returned
+
+    Args:
+        id (str): document id
+        projection (Dict, optional): ignored. Defaults to None.
+
+    Returns:
+        RawBSONDocument: document found
+    """
+    return self.__search(ObjectId(id).binary)
+
+  def find_by_ids(self, ids:List[str], projection:Dict=None) -> List[RawBSONDocument]:
+    """function to find a list of documents using their ids
+       the projection is not applied, the whole documents are returned
+
+    Args:
+        ids (List[str]): list of documents id
+        projection (Dict, optional): ignored. Defaults to None.
+
+    Returns:
+        List[RawBSONDocument]: list of documents found
+    """
+    documents = [self.__search(ObjectId(id).binary) for id in ids]
+    return [document for document in documents if document is not None]
+
+  def find_all(self, projection:Dict=None) -> Iterator[RawBSONDocument]:
+    """function to iterate on all the documents sorted by id
+       the projection is not applied, the whole documents are returned
+
+    Args:
+        projection (Dict, optional): ignored. Defaults to None.
+
+    Yields:
+        RawBSONDocument: document of the snapshot
+    """
+    for i in range(self.__count):
+      _, offset, size = INDEX_FORMAT.unpack_from(self.__map,
+                                                 self.__index_offset + i * INDEX_FORMAT.size)
+      yield RawBSONDocument(self.__map[offset:offset + size])
+
+  def close(self):
+    self.__map.close()
+    self.__file.close()
+
+  @staticmethod
+  def build_from_config(config:Dict)->'SnapshotDriver':
+    """function to build a SnapshotDriver object from a configuration
+       config must contains following keys:
+       - file : path of the snapshot file
+    Args:
+        config (Dict): configuration of snapshot driver
+
+    Raises:
+        DBDriverException:
+
+    Returns:
+        SnapshotDriver: Driver object reading a snapshot file
+    """
+    try:
+      return SnapshotDriver(config['file'])
+
+    except DBDriverException as error:
+      error.add_in_stack(["SNAPSHOT", "BUILD"])
+      raise error
+
+    except KeyError as error:
+      # raise if info missing in configuration
+      missing_para = error.args[0]
+      raise DBDriverException(["SNAPSHOT", "BUILD"],
+                              DBExceptionType.CONFIG_ERROR,
+                              f"mandatory parameter {missing_para} not found in the configuration")
+
+    except (OSError, ValueError, struct.error) as error:
+      # raise if the file can not be read or mapped
+      raise DBDriverException(["SNAPSHOT", "BUILD"],
+                              DBExceptionType.MISSING_ELEMENT,
+                              f"the snapshot file {config['file']} is not readable : {error}")
+
+if __name__ == '__main__':
+  # export the configured mongodb collection in a snapshot file
+  # python -m db.snapshot [--environment-config config/mars.yaml] output_file
+  import argparse
+  import sys
+  from utils import get_config_from_file
+  from exceptions import BaseException
+  from .mongodb import MongoDriver
+
+  parser = argparse.ArgumentParser(description="export the configured collection in a snapshot file")
+  parser.add_argument('--environment-config',
+                      type=str,
+                      default='./config/mars.yaml',
+                      help='path of environment configuration yaml file')
+  parser.add_argument('output',
+                      type=str,
+                      help='path of the snapshot file to write')
+  args = parser.parse_args()
+
+  try:
+    db_config = get_config_from_file(args.environment_config)['database']
+    driver = MongoDriver.build_from_config(db_config)
+    count = write_snapshot(driver.find_all(), args.output)
+    print(f"{count} documents exported in {args.output}")
+  except BaseException as error:
+    print(error.describe())
+    sys.exit(1)
+  except KeyError as error:
+    print(f"the configuration parameter {error.args[0]} is missing")
+    sys.exit(1)
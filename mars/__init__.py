@@ -1,21 +1,78 @@
 from db.exceptions import DBDriverException
 from db.functions import build_driver as __build_driver
+from db.functions import build_command_store as __build_command_store
 from typing import Dict
+import glob
+import hashlib
+import json
+import os
+from model.uid import build_uid_generator, set_uid_generator
 from exceptions import BaseException
 from .exceptions import MarsException, MarsExceptionType
 from mars.equipment import Equipment as EQUIPMENT
 from mars.reference import Reference as REFERENCE
+from mars.proxy import build_tracking_policy, set_tracking_policy
 from mars.register import COMMAND_REGISTER
+from mars.register import compile_translators as __compile_translators
+from mars.register import precompile_templates as __precompile_templates
+from mars.template import CommandTemplateCache
+from model.action import ACTION_DEFINITION
 from db.exceptions import DBDriverException
 
 
+def __get_sources_digest():
+  # hash of the sources generating the commands (model and mars modules)
+  root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+  digest = hashlib.blake2b(digest_size=8)
+  for package in ('model', 'mars'):
+    for file_path in sorted(glob.glob(os.path.join(root, package, '*.py'))):
+      with open(file_path, 'rb') as source:
+        digest.update(source.read())
+  return digest
+
+__SOURCES_DIGEST = __get_sources_digest()
+
+def __get_generator_version(settings:Dict) -> str:
+  # hash of the sources and of the settings changing the generated commands (ex: tracking policy)
+  # a modification of the generation gives a new version, the stored command sets are not served anymore
+  digest = __SOURCES_DIGEST.copy()
+  digest.update(json.dumps(settings, sort_keys=True).encode())
+  return digest.hexdigest()
+
+# version of the command generation, updated by build_environment with the configured settings
+GENERATOR_VERSION = __get_generator_version({})
+
+# command skeletons of the small definitions, the finite domains are built at startup
+COMMAND_TEMPLATES = CommandTemplateCache()
+__precompile_templates(COMMAND_TEMPLATES, COMMAND_REGISTER)
+
+# translators from the raw definition documents to the command dicts (fast path)
+COMMAND_TRANSLATORS = __compile_translators(ACTION_DEFINITION, COMMAND_REGISTER, COMMAND_TEMPLATES)
 
 def build_environment(mars_config:Dict):
+  global GENERATOR_VERSION
   try:
+    # select the uid generation strategy
+    set_uid_generator(build_uid_generator(mars_config.get('uid') or {}))
+
+    # select the tracking of the program ends, the templates contain the tracker settings
+    tracking_config = mars_config.get('tracking') or {}
+    tracking_policy = build_tracking_policy(tracking_config)
+    set_tracking_policy(tracking_policy)
+    COMMAND_TEMPLATES.clear()
+    __precompile_templates(COMMAND_TEMPLATES, COMMAND_REGISTER)
+    GENERATOR_VERSION = __get_generator_version({'tracking': tracking_policy.to_dict()})
+
     # build the driver from conf database definition
     database_config = mars_config['database']
     MARS_DB_DRIVER = __build_driver(database_config)
-    return EQUIPMENT, REFERENCE, COMMAND_REGISTER, MARS_DB_DRIVER
+
+    # build the store of generated command sets if configured
+    store_config = database_config.get('command_store')
+    MARS_COMMAND_STORE = __build_command_store(store_config, MARS_DB_DRIVER, GENERATOR_VERSION)\
+                         if store_config else None
+
+    return EQUIPMENT, REFERENCE, COMMAND_REGISTER, MARS_DB_DRIVER, MARS_COMMAND_STORE
 
   except KeyError as error:
     missing_key = error.args[0]
@@ -1,20 +1,34 @@
 
 from abc import abstractmethod
 from enum import Enum, EnumMeta
-import uuid
 from mars.equipment import Effector
 from mars.reference import Frame
 from model.definition import Manipulation
-from typing import List, Dict, Union, Tuple
+from typing import Iterator, List, Dict, Union, Tuple
 from inspect import signature
-from model.movement import Position, Movement
+from model.movement import Movement
+from model.trajectory import MOVEMENT_TYPES, PathArray
 from model.command import Command
+from model.uid import new_uid
 from utils import GetAttrEnum, GetItemEnum
+from .exceptions import MarsException, MarsExceptionType
+import numpy as np
 
 """
 CONSTANTS
 """
 DEFAULT_TRACKING_INTERVAL = 1000
+# defaults of the adaptive tracking of the program ends (see TrackingPolicy)
+# polling interval near the expected end of a program (ms)
+DEFAULT_FAST_TRACKING_INTERVAL = 100
+# growth of the polling interval when the program lasts longer than expected
+DEFAULT_TRACKING_BACKOFF = 2.0
+# part of the expected program duration waited before the first poll
+DEFAULT_TRACKING_DELAY_RATIO = 0.8
+# max wait before the first poll (ms)
+DEFAULT_MAX_TRACKING_DELAY = 60000
+# nominal drilling stroke (mm) used to estimate the drilling duration from the feed (mm/min)
+DEFAULT_DRILLING_STROKE = 10
 
 """
 ENUMERATIONS
@@ -28,11 +42,12 @@ class RegisterBulk(Enum, metaclass=GetAttrEnum):
 
 # Enumeration defining the register types
 class RegisterType(Enum):
-  STRING = "/stringRegister", 5, 5, None, "text"
-  POSITION_JOINT = "/positionRegister", 10, 10, 'jnt', "position"
-  POSITION_CARTESIAN = "/positionRegister", 10, 10, 'crt', "position"
-  NUMERIC_INT = "/numericRegister", 120, 115, 'int', "value"
-  NUMERIC_FLOAT = "/numericRegister", 120, 115, 'float', "value"
+  # path, read limit, write limit, type, body key, number of registers of the bank
+  STRING = "/stringRegister", 5, 5, None, "text", 25
+  POSITION_JOINT = "/positionRegister", 10, 10, 'jnt', "position", 100
+  POSITION_CARTESIAN = "/positionRegister", 10, 10, 'crt', "position", 100
+  NUMERIC_INT = "/numericRegister", 120, 115, 'int', "value", 200
+  NUMERIC_FLOAT = "/numericRegister", 120, 115, 'float', "value", 200
 
   @property
   def base_path(self):
@@ -45,6 +60,10 @@ class RegisterType(Enum):
   @property
   def write_limit(self):
     return self.value[2]
+
+  @property
+  def bank_size(self):
+    return self.value[5]
   
   def build_query(self, start_register:int, block_size:int =1):
     if block_size > 1:
@@ -92,6 +111,13 @@ class ConstantRegister(Enum, metaclass=GetAttrEnum):
   DRILLING_COUNTER = 162
   CLAMPING_COUNTER = 163
 
+# max number of movements sent to the robot in one TRAJ_GEN launch
+# the positions are written from POSITION_BEGIN in the position register bank,
+# the parameters (number of movements + type, speed and cnt of each movement) are written
+# from MOVEMENT_PARA_BEGIN and must not overwrite the effector reference register
+TRAJECTORY_WINDOW = min(RegisterType.POSITION_CARTESIAN.bank_size - ConstantRegister.POSITION_BEGIN + 1,
+                        (ConstantRegister.EFFECTOR_REFERENCE - ConstantRegister.MOVEMENT_PARA_BEGIN - 1) // 3)
+
 class ConstantRegBlockSize(Enum, metaclass=GetAttrEnum):
   DRILLING_FEEDBACK = 7
 
@@ -185,6 +211,172 @@ class ProxyMethod(Enum):
   PUT = "PUT"
   SUBSCRIBE= "SUBSCRIBE"
 
+"""
+TRACKING SCHEDULE
+"""
+class TrackingSchedule:
+  """polling schedule of a tracker : first poll after delay ms, then every interval ms,
+     the interval is multiplied by backoff after each poll up to max_interval ms
+
+     tracker settings sent to the proxy (see to_dict) :
+     - interval : polling interval in ms, the only setting of the fixed schedule
+     - delay : wait before the first poll in ms, omitted if 0
+     - backoff : {factor, max_interval}, growth of the interval after each poll, omitted if no growth
+     delay and backoff extend the tracker protocol, a proxy ignoring them polls every interval ms
+     from the start, they are only sent if the adaptive tracking is enabled (see TrackingPolicy)
+  """
+  __slots__ = ('__delay', '__interval', '__backoff', '__max_interval')
+
+  def __init__(self,
+               delay:int=0,
+               interval:int=DEFAULT_TRACKING_INTERVAL,
+               backoff:float=1.0,
+               max_interval:int=DEFAULT_TRACKING_INTERVAL):
+    self.__delay = delay
+    self.__interval = interval
+    self.__backoff = backoff
+    self.__max_interval = max_interval
+
+  @property
+  def delay(self) -> int:
+    return self.__delay
+
+  @property
+  def interval(self) -> int:
+    return self.__interval
+
+  def to_dict(self) -> Dict:
+    # tracker settings, the fixed interval schedule only sets the interval
+    settings = {"interval": self.__interval}
+    if self.__delay:
+      settings["delay"] = self.__delay
+    if self.__backoff != 1.0:
+      settings["backoff"] = {
+        "factor": self.__backoff,
+        "max_interval": self.__max_interval
+      }
+    return settings
+
+class TrackingPolicy:
+  """configuration of the end trackers of the programs
+     - adaptive disabled (default) : the trackers poll every DEFAULT_TRACKING_INTERVAL ms
+     - adaptive enabled : the tracker waits a part (delay_ratio) of the expected duration of the program,
+       limited to max_delay ms, then polls every fast_interval ms, the interval is multiplied
+       by backoff after each poll up to DEFAULT_TRACKING_INTERVAL ms
+       the proxies must support the delay and backoff tracker settings (see TrackingSchedule)
+  """
+  __slots__ = ('__adaptive', '__fast_interval', '__backoff', '__delay_ratio', '__max_delay', '__drilling_stroke')
+
+  def __init__(self,
+               adaptive:bool=False,
+               fast_interval:int=DEFAULT_FAST_TRACKING_INTERVAL,
+               backoff:float=DEFAULT_TRACKING_BACKOFF,
+               delay_ratio:float=DEFAULT_TRACKING_DELAY_RATIO,
+               max_delay:int=DEFAULT_MAX_TRACKING_DELAY,
+               drilling_stroke:float=DEFAULT_DRILLING_STROKE):
+    self.__adaptive = adaptive
+    self.__fast_interval = fast_interval
+    self.__backoff = backoff
+    self.__delay_ratio = delay_ratio
+    self.__max_delay = max_delay
+    self.__drilling_stroke = drilling_stroke
+
+  @property
+  def adaptive(self) -> bool:
+    return self.__adaptive
+
+  @property
+  def drilling_stroke(self) -> float:
+    return self.__drilling_stroke
+
+  def get_schedule(self, expected_duration:float=None) -> TrackingSchedule:
+    """function to build the polling schedule of a program from its expected duration
+       an unknown duration or a disabled adaptive tracking gives the default fixed interval
+
+    Args:
+        expected_duration (float, optional): expected duration in seconds. Defaults to None.
+
+    Returns:
+        TrackingSchedule: polling schedule
+    """
+    if not self.__adaptive or expected_duration is None:
+      return TrackingSchedule()
+
+    return TrackingSchedule(min(int(expected_duration * 1000 * self.__delay_ratio), self.__max_delay),
+                            self.__fast_interval,
+                            self.__backoff,
+                            DEFAULT_TRACKING_INTERVAL)
+
+  def to_dict(self) -> Dict:
+    return {
+      "adaptive": self.__adaptive,
+      "fast_interval": self.__fast_interval,
+      "backoff": self.__backoff,
+      "delay_ratio": self.__delay_ratio,
+      "max_delay": self.__max_delay,
+      "drilling_stroke": self.__drilling_stroke
+    }
+
+TRACKING_POLICY:TrackingPolicy = TrackingPolicy()
+
+def set_tracking_policy(policy:TrackingPolicy):
+  global TRACKING_POLICY
+  TRACKING_POLICY = policy
+
+def build_tracking_policy(tracking_config:Dict) -> TrackingPolicy:
+  """function to build the tracking policy from a configuration
+     tracking_config can contains following keys:
+     - adaptive : enable the delay and backoff tracker settings (default false)
+     - fast_interval : polling interval near the expected end of a program (ms)
+     - backoff : growth factor of the polling interval
+     - delay_ratio : part of the expected duration waited before the first poll
+     - max_delay : max wait before the first poll (ms)
+     - drilling_stroke : nominal drilling stroke (mm)
+
+  Args:
+      tracking_config (Dict): tracking configuration
+
+  Raises:
+      MarsException:
+
+  Returns:
+      TrackingPolicy: tracking policy
+  """
+  try:
+    policy = TrackingPolicy(bool(tracking_config.get('adaptive', False)),
+                            int(tracking_config.get('fast_interval', DEFAULT_FAST_TRACKING_INTERVAL)),
+                            float(tracking_config.get('backoff', DEFAULT_TRACKING_BACKOFF)),
+                            float(tracking_config.get('delay_ratio', DEFAULT_TRACKING_DELAY_RATIO)),
+                            int(tracking_config.get('max_delay', DEFAULT_MAX_TRACKING_DELAY)),
+                            float(tracking_config.get('drilling_stroke', DEFAULT_DRILLING_STROKE)))
+  except (TypeError, ValueError) as error:
+    raise MarsException(['TRACKING'],
+                        MarsExceptionType.CONFIG_ERROR,
+                        f"tracking configuration not conform : {error}")
+
+  settings = policy.to_dict()
+  if settings['fast_interval'] <= 0 or settings['backoff'] < 1 or not 0 <= settings['delay_ratio'] <= 1\
+     or settings['max_delay'] < 0 or settings['drilling_stroke'] <= 0:
+    raise MarsException(['TRACKING'],
+                        MarsExceptionType.CONFIG_ERROR,
+                        f"tracking configuration not conform : {settings}")
+  return policy
+
+def estimate_drilling_duration(feed:int, peak:bool) -> float:
+  """function to estimate the duration of a drilling from the feed and the configured drilling stroke
+
+  Args:
+      feed (int): feed in mm/min
+      peak (bool): peck drilling, the tool goes back and forth
+
+  Returns:
+      float: expected duration in seconds or None if the feed is not known
+  """
+  if not isinstance(feed, (int, float)) or feed <= 0:
+    return None
+  duration = TRACKING_POLICY.drilling_stroke / feed * 60
+  return 2 * duration if peak else duration
+
 """
 PROXYCOMMAND OBJECT
 """
@@ -246,22 +438,6 @@ def __split_data_by_limit(data: List[Union[Dict, int, str]],
 
   return sub_list
 
-def __split_position_list_generator(position_list:List[Position]) -> Tuple[str, List[Position]]:
-  
-  pos_type = position_list[0].type
-  index = 0
-  while 1 :
-      sublist = []
-      while position_list[index].type == pos_type:
-          sublist.append(position_list[index])
-          index+=1
-          if index >= len(position_list):
-              yield pos_type, sublist
-              return 0
-      yield pos_type, sublist
-      pos_type = position_list[index].type
-
-
 """
 LOW LEVEL PROXY COMMANDS
 """
@@ -373,7 +549,7 @@ def __write_register(register_type:RegisterType,
         body = BODY.copy()
         body['data'] = register_type.build_body(d)
         
-        commands.append(METHOD, PATH, query, body)
+        commands.append((METHOD, PATH, query, body))
         # update the index
         index += len(d)
       
@@ -426,7 +602,7 @@ def __track_register(register_type:RegisterType,
       "setting": None
   }
   
-  tracker_uid = str(uuid.uuid4())
+  tracker_uid = new_uid(('TRACKER', PATH, register_num))
 
   # define the tracker settings
   # if expected, tracker type alert
@@ -467,43 +643,186 @@ def __track_register(register_type:RegisterType,
   return METHOD, PATH, query, body, tracker_uid
 
 
+"""
+WRITE COALESCING
+"""
+
+# register type of a write from its base path and its query type
+__REGISTER_TYPES = {(register_type.base_path, register_type.value[3]): register_type
+                    for register_type in RegisterType}
+
+def decode_register_write(definition:Dict) -> Tuple[RegisterType, int, List]:
+  """function to get the register type, the first register and the values written by a proxy command definition
+
+  Args:
+      definition (Dict): definition of a proxy command
+
+  Returns:
+      Tuple[RegisterType, int, List]: register type, start register and values
+                                      or None if the definition is not a register write
+  """
+  if definition.get('method') != ProxyMethod.PUT.value:
+    return None
+
+  query = definition['query']
+  register_type = __REGISTER_TYPES.get((definition['path'].rsplit('/', 1)[0], query.get('type')))
+  if register_type is None:
+    return None
+
+  key = register_type.value[4]
+  data = definition['body']['data']
+  if 'startReg' in query:
+    return register_type, query['startReg'], list(data[key+'s'])
+  else:
+    return register_type, query['reg'], [data[key]]
+
+def __get_register_write(command:Command) -> Tuple[RegisterType, int, List]:
+  # register write of a command, None if the command is not a mergeable register write
+  if command.target != "PROXY" or command.action != ProxyAction.REQUEST.value:
+    return None
+
+  write = decode_register_write(command.definition)
+  if write is None:
+    return None
+
+  # the program register write launches a program, never merged
+  register_type, start_register, values = write
+  if register_type.base_path == RegisterType.NUMERIC_INT.base_path and start_register == ConstantRegister.PROGRAM:
+    return None
+
+  return write
+
+def coalesce_writes(commands:List[Command]) -> List[Command]:
+  """function to merge the consecutive writes of contiguous registers of the same type
+     in a block write, respecting the register write limit
+     only the writes following each other in the list are merged, the order of the writes
+     relative to the program launches, the trackers and the waits is kept
+
+  Args:
+      commands (List[Command]): list of commands
+
+  Returns:
+      List[Command]: list of commands with merged writes
+  """
+  result = []
+  # writes waiting for a merge : register type, start register, values, commands
+  pending = None
+
+  def flush():
+    register_type, start_register, values, merged = pending
+    if len(merged) == 1:
+      # nothing merged, keep the command
+      result.append(merged[0])
+      return
+
+    method, path, query, body = __write_register(register_type, start_register, values)[0]
+    result.append(ProxyCommand(ProxyAction.REQUEST,
+                               ' ; '.join(command.description for command in merged),
+                               method,
+                               path,
+                               query,
+                               body))
+
+  for command in commands:
+    write = __get_register_write(command)
+
+    if write and pending:
+      register_type, start_register, values = write
+      p_type, p_start, p_values, p_merged = pending
+      # contiguous registers of the same type, in the write limit
+      if register_type is p_type and start_register == p_start + len(p_values)\
+         and len(p_values) + len(values) <= register_type.write_limit:
+        pending = (p_type, p_start, p_values + values, p_merged + [command])
+        continue
+
+    if pending:
+      flush()
+      pending = None
+
+    if write:
+      pending = (*write, [command])
+    else:
+      result.append(command)
+
+  if pending:
+    flush()
+
+  return result
+
+
 """
 HIGH LEVEL PROXY COMMAND
 """
-def run_program(program:Program) -> List[ProxyCommand]:
-  """function to generate the list of commands to necessary to launch a program
+def __copy_definition(element):
+  # copy of the dicts and lists of a command definition, the other values are immutable
+  if isinstance(element, dict):
+    return {key: __copy_definition(value) for key, value in element.items()}
+  if isinstance(element, list):
+    return [__copy_definition(value) for value in element]
+  return element
+
+def __build_program_launch(program:Program) -> Tuple[Tuple, Tuple]:
+  """function to build the command skeleton of a program launch (program register write and end tracker)
 
   Args:
       program (Program): program to launch
 
   Returns:
-      List[ProxyCommand]: list of commands to launch the program
+      Tuple[Tuple, Tuple]: write (description, method, path, query, body) and tracker (description, method, path, query, body)
+                           the tracker uid is set by run_program
   """
   # get write command parameters, __write_register return a list, so get the item 0
   w_method, w_path, w_query, w_body = __write_register(RegisterType.NUMERIC_INT,
                                                        ConstantRegister.PROGRAM,
                                                        program.value)[0]
 
+  # get track command parameters
+  t_method, t_path, t_query, t_body, _ = __track_register(RegisterType.NUMERIC_INT,
+                                                          ConstantRegister.PROCESS,
+                                                          DEFAULT_TRACKING_INTERVAL,
+                                                          (Relation.NOT_EQUAL.value, Process.IN_PROGRESS.value))
+
+  return (f"set program register to run {program.name} program (code : {program.value})",
+          w_method, w_path, w_query, w_body),\
+         (f"init tracker to track process register value wait until {Relation.NOT_EQUAL.name} {Process.IN_PROGRESS.name}",
+          t_method, t_path, t_query, t_body)
+
+# command skeletons of the program launches, precompiled for every program
+__PROGRAM_LAUNCHES = {program: __build_program_launch(program) for program in Program}
+
+def run_program(program:Program, expected_duration:float=None) -> List[ProxyCommand]:
+  """function to generate the list of commands to necessary to launch a program
+     the commands are copied from the precompiled program launch, only the uids are new
+     the end tracker polls according to the expected duration of the program (see TrackingPolicy)
+
+  Args:
+      program (Program): program to launch
+      expected_duration (float, optional): expected duration in seconds. Defaults to None (fixed interval).
+
+  Returns:
+      List[ProxyCommand]: list of commands to launch the program
+  """
+  (w_description, w_method, w_path, w_query, w_body),\
+  (t_description, t_method, t_path, t_query, t_body) = __PROGRAM_LAUNCHES[program]
+
   # define a proxy command to write data => write program value on register
   set_program_cmd = ProxyCommand(ProxyAction.REQUEST,
-                                 f"set program register to run {program.name} program (code : {program.value})",
+                                 w_description,
                                  w_method,
                                  w_path,
-                                 w_query,
-                                 w_body)
-
-
-  # get track command parameters
-  t_method, t_path, t_query, t_body, tracker_uid = __track_register(RegisterType.NUMERIC_INT,
-                                                       ConstantRegister.PROCESS,
-                                                       DEFAULT_TRACKING_INTERVAL,
-                                                      (Relation.NOT_EQUAL.value, Process.IN_PROGRESS.value))
+                                 __copy_definition(w_query),
+                                 __copy_definition(w_body))
 
+  # new tracker uid in a copy of the tracker body
+  tracker_uid = new_uid(('TRACKER', t_path, ConstantRegister.PROCESS))
+  body = __copy_definition(t_body)
+  body['setting']['settings']['uid'] = tracker_uid
+  body['setting']['settings'].update(TRACKING_POLICY.get_schedule(expected_duration).to_dict())
 
   # define a proxy command to track end of program
   tracker_cmd = ProxyCommand(ProxyAction.REQUEST,
-                             f"init tracker to track process register value wait until {Relation.NOT_EQUAL.name} {Process.IN_PROGRESS.name}",
-                             t_method, t_path, t_query, t_body)
+                             t_description,
+                             t_method, t_path, __copy_definition(t_query), body)
 
   # wait command with tracker uid
   wait_cmd = WaitCommand(f"wait end of program {program.name}", tracker_uid);
@@ -548,7 +867,8 @@ def set_utuf(user_tool:Union[ProxyEffector, Effector], user_frame:Union[ProxyFra
   # init a list with the set_utuf command
   commands = [set_utuf_cmd]
   # extend the list with commands to run the change_utuf program
-  commands.extend(run_program(Program.CHANGE_UTUF))
+  # short program, polled quickly from the launch
+  commands.extend(run_program(Program.CHANGE_UTUF, 0))
   
   return commands
 
@@ -594,33 +914,30 @@ def __set_movements_parameters(movements_parameters:List[int]) -> List[ProxyComm
 
   return commands
 
-def __set_movements_positions(positions:List[Position]) -> List[ProxyCommand]:
+def __set_movements_positions(path_array:PathArray) -> List[ProxyCommand]:
   """function to generate command or list of commands to set movements position
 
   Args:
-      positions (List[Position]): positions to set
+      path_array (PathArray): movements arrays containing the positions to set
 
   Returns:
       List[ProxyCommand]: 
   """
-  # maybe several type of position (JOINT or CARTESIAN) in the list
-  # so i use a generator to split them if necessary
-  pos_split_by_type_gen = __split_position_list_generator(positions)
-  
   # init a pos begin index
   pos_begin = ConstantRegister.POSITION_BEGIN
   
   # init a list for commands
   commands = []
 
-  # iterate in the generator
-  for _type, pos in pos_split_by_type_gen:
+  # maybe several type of position (JOINT or CARTESIAN) in the list
+  # so iterate on the runs of positions with the same type
+  for _type, start, stop in path_array.position_runs():
     # get the positions type and the register type associated
-    pos_type = "POSITION_"+_type
+    pos_type = "POSITION_"+_type.name
     reg_type = RegisterType[pos_type]
 
     # convert positions in dictionnary
-    pos_dict = [p.to_cmd_data() for p in pos]
+    pos_dict = path_array.positions_to_cmd_data(start, stop)
 
     # generate the command definition using write_register
     # if number of position exceed the write limit write_register return a list of cmd
@@ -641,35 +958,37 @@ def __set_movements_positions(positions:List[Position]) -> List[ProxyCommand]:
       commands.append(cmd)
     
     # increment pos_begin index
-    pos_begin+=len(pos)
+    pos_begin+=stop-start
   
   # return the list of commands
   return commands
 
 
-def set_movements(movements:List[Movement]) -> List[ProxyCommand]:
+def set_movements(movements:Union[List[Movement], PathArray]) -> List[ProxyCommand]:
   """function to generate a list of commands to set the movements data
+     the movements must fit in the registers (see movements_windows for the longer paths)
 
   Args:
-      movements (List[Movement]): movements to set
+      movements (Union[List[Movement], PathArray]): movements to set
 
   Returns:
       List[ProxyCommand]: list of commands to set movements data
   """
-  # init a list for parameters with movements list size (number of points to insert)
-  parameters = [len(movements)]
-  # init a list for positions
-  positions = []
+  # work on the movements arrays, no object by movement
+  path_array = movements if isinstance(movements, PathArray) else PathArray.from_movements(movements)
+
+  # table of the movement type codes indexed like the movement types of the arrays
+  type_codes = np.array([MovementTypeCode[mov_type.name] for mov_type in MOVEMENT_TYPES])
 
-  for movement in movements:
-    mov_type = movement.type
-    # extend the parameters list with movement.type, movement.speed, movement.cnt
-    parameters.extend((MovementTypeCode[mov_type], movement.speed, movement.cnt))
-    # add the position in the position list
-    positions.append(movement.position)
+  # init a list for parameters with movements list size (number of points to insert)
+  parameters = [len(path_array)]
+  # extend the parameters list with movement.type, movement.speed, movement.cnt of each movement
+  parameters.extend(np.column_stack((type_codes[path_array.types],
+                                     path_array.speed,
+                                     path_array.cnt)).ravel().tolist())
 
   set_para_cmds = __set_movements_parameters(parameters)
-  set_pos_cmds = __set_movements_positions(positions)
+  set_pos_cmds = __set_movements_positions(path_array)
 
   return set_para_cmds + set_pos_cmds
 
@@ -721,7 +1040,6 @@ def confirm_manipulation(manipulation:Manipulation):
   # get operation name str
   operation = manipulation.operation
 
-  print(p_equipment_ref)
   # get tracking def (relation, equipment code) to check the good manipulation
   relation, aop_equipment_ref = p_equipment_ref._get_operation_result(operation)
   # get info about register to track according to equipment type (type:RegisterType, num:int)
@@ -745,4 +1063,19 @@ def confirm_manipulation(manipulation:Manipulation):
   wait_cmd = WaitCommand(f"wait end of manipulation {operation} {equipment.reference} {equipment.type}",
                          tracker_uid)
 
-  return [tracker_command, wait_cmd]
\ No newline at end of file
+  return [tracker_command, wait_cmd]
+
+def movements_windows(movements:Union[List[Movement], PathArray],
+                      window:int=TRAJECTORY_WINDOW) -> Iterator[PathArray]:
+  """function to split the movements of a path in windows fitting in the registers
+     each window is set and launched on its own, the windows are built on demand
+
+  Args:
+      movements (Union[List[Movement], PathArray]): movements of the path
+      window (int, optional): max number of movements by window. Defaults to TRAJECTORY_WINDOW.
+
+  Yields:
+      PathArray: movements of a window
+  """
+  path_array = movements if isinstance(movements, PathArray) else PathArray.from_movements(movements)
+  return path_array.windows(window)
@@ -1,11 +1,40 @@
 
-from typing import List
-from mars.reference import Reference
-from model.definition import Drilling, Path, Manipulation, Probing
+from typing import Callable, Dict, Iterator, List, Union
+from mars.reference import Reference, Frame
+from mars.equipment import Equipment, Effector
+from model.definition import Definition, Drilling, Path, Manipulation, Probing
+from model.equipment import Operation
+from model.trajectory import PathArray
+from model.movement import Movement
 from model.command import Command
 from mars import equipment, proxy, hmi
+from mars.template import CommandTemplateCache
 from functools import partial
 
+def __iter_traj_gen_commands(user_tool:Effector,
+                             user_frame:Frame,
+                             movements:Union[List[Movement], PathArray],
+                             set_utuf:bool) -> Iterator[Command]:
+  # get cmd to update ut and uf, once for the whole path
+  if set_utuf:
+    yield from proxy.coalesce_writes(proxy.set_utuf(user_tool, user_frame))
+
+  # a long path is sent by windows fitting in the registers, one TRAJ_GEN launch by window
+  # the commands of a window are built when the previous ones are consumed
+  for window in proxy.movements_windows(movements):
+    # get cmd to set movements data
+    set_movements_cmds = proxy.set_movements(window)
+    # get cmd to run program and wait for end, polled from the expected end of the window
+    run_program_cmds = proxy.run_program(proxy.Program.TRAJ_GEN, window.estimate_duration())
+
+    yield from proxy.coalesce_writes(set_movements_cmds + run_program_cmds)
+
+def __traj_gen_commands(user_tool:Effector,
+                        user_frame:Frame,
+                        movements:Union[List[Movement], PathArray],
+                        set_utuf:bool) -> List[Command]:
+  return list(__iter_traj_gen_commands(user_tool, user_frame, movements, set_utuf))
+
 def __build_traj_gen_sequence(path:Path, set_utuf:bool) -> List[Command]:
   """function to generate list of commands to perform a trajectory
 
@@ -15,21 +44,18 @@ def __build_traj_gen_sequence(path:Path, set_utuf:bool) -> List[Command]:
   Returns:
       List[Command]: list of commands
   """
-  # get cmd to set movements data
-  set_movements_cmds = proxy.set_movements(path.movements)
-
-  # get cmd to run program and wait for end
-  run_program_cmds = proxy.run_program(proxy.Program.TRAJ_GEN)
+  return __traj_gen_commands(path.user_tool, path.user_frame, path.path_array, set_utuf)
 
+def __probing_commands(movements:Union[List[Movement], PathArray]) -> List[Command]:
   # get cmd to update ut and uf
-  if set_utuf:
-    set_utuf_cmds = proxy.set_utuf(path.user_tool, path.user_frame)
-    # return the list of commands with ut uf update
-    return set_utuf_cmds + set_movements_cmds + run_program_cmds
-  else:
-    # return the list of commands
-    return set_movements_cmds + run_program_cmds
-  
+  # set_utuf_cmds = proxy.set_utuf(probe.user_tool, probe.user_frame)
+  # get cmd to set movements data
+  set_movement_cmds = proxy.set_movements(movements)
+  # get cmd to run program and wait for end, a short move polled quickly from the launch
+  run_program_cmds = proxy.run_program(proxy.Program.PROBING, 0)
+
+  # return set_utuf_cmds + set_movement_cmds + run_program_cmds
+  return proxy.coalesce_writes(set_movement_cmds + run_program_cmds)
 
 def __build_probing_sequence(probe:Probing) -> List[Command]:
   """function to generate list of commands to perform a probing
@@ -40,31 +66,26 @@ def __build_probing_sequence(probe:Probing) -> List[Command]:
   Returns:
       List[Command]: list of commands
   """
-  # get cmd to update ut and uf
-  # set_utuf_cmds = proxy.set_utuf(probe.user_tool, probe.user_frame)
-  # get cmd to set movements data
-  set_movement_cmds = proxy.set_movements([probe.movement])
-  # get cmd to run program and wait for end
-  run_program_cmds = proxy.run_program(proxy.Program.PROBING)
-
-  # return set_utuf_cmds + set_movement_cmds + run_program_cmds
-  return set_movement_cmds + run_program_cmds
+  return __probing_commands([probe.movement])
 
-def __build_drilling_sequence(drilling:Drilling):
+def __drilling_commands(speed:int, feed:int, peak:bool) -> List[Command]:
   # TODO : add additional parameters if needed
 
   # get the drilling parameters
-  drilling_parameters = (drilling.speed, drilling.feed, int(drilling.peak))
+  drilling_parameters = (speed, feed, int(peak))
   # get cmd to set parameters
   set_para_cmds = proxy.set_drilling_parameters(drilling_parameters)
   # get cmd to run drilling sequence
 
-  run_program_cmds = proxy.run_program(proxy.Program.DRILLING)
+  run_program_cmds = proxy.run_program(proxy.Program.DRILLING, proxy.estimate_drilling_duration(feed, peak))
 
   # TODO : add cmd to get drilling report from effector
   # drilling_report_cmd = proxy.get_drilling_report()
 
-  return set_para_cmds + run_program_cmds # + drilling_report_cmd
+  return proxy.coalesce_writes(set_para_cmds + run_program_cmds) # + drilling_report_cmd
+
+def __build_drilling_sequence(drilling:Drilling):
+  return __drilling_commands(drilling.speed, drilling.feed, drilling.peak)
 
 def __build_manipulation_sequence(manipulation:Manipulation):
   # get command for hmi manipulation message
@@ -75,12 +96,12 @@ def __build_manipulation_sequence(manipulation:Manipulation):
   return hmi_msg_command + proxy_tracker_cmd
 
 def __build_effector_manipulation(manipulation:Manipulation):
-  
+
   manipulation_cmds = __build_manipulation_sequence(manipulation)
-    
+
   set_utuf_cmds = proxy.ut_update_sequence(manipulation)
 
-  return manipulation_cmds + set_utuf_cmds
+  return proxy.coalesce_writes(manipulation_cmds + set_utuf_cmds)
 
 COMMAND_REGISTER = {
   'MOVE.TCP.WORK' : partial(__build_traj_gen_sequence, set_utuf=True),
@@ -89,8 +110,113 @@ COMMAND_REGISTER = {
   'MOVE.STATION.WORK':  partial(__build_traj_gen_sequence, set_utuf=False),
   'MOVE.STATION.HOME' :  partial(__build_traj_gen_sequence, set_utuf=False),
   'MOVE.STATION.TOOL' :  partial(__build_traj_gen_sequence, set_utuf=False),
-  'WORK.DRILL' :  partial(__build_drilling_sequence), 
+  'WORK.DRILL' :  partial(__build_drilling_sequence),
   'WORK.PROBE' :  partial(__build_probing_sequence),
   'LOAD.EFFECTOR' :  partial(__build_effector_manipulation),
   'UNLOAD.EFFECTOR' : partial(__build_effector_manipulation),
-}
\ No newline at end of file
+}
+
+"""
+COMPILED TRANSLATORS
+raw definition document => command dicts, without Definition, Movement and Position objects
+same output as the command register applied on the parsed definition (reference path)
+"""
+
+def __translate_traj_gen(definition:Dict, set_utuf:bool) -> List[Dict]:
+  user_tool = Equipment['EFFECTOR'][definition['ut']]
+  user_frame = Reference['FRAME'][definition['uf']]
+
+  # columnar binary trajectory or list of movement documents
+  if definition.get('trajectory') is not None:
+    movements = PathArray.from_trajectory(definition['trajectory'])
+  else:
+    movements = PathArray.parse(definition['movements'])
+
+  # no command object kept, each window is converted before the next one is built
+  return [c.to_dict() for c in __iter_traj_gen_commands(user_tool, user_frame, movements, set_utuf)]
+
+def __translate_probing(definition:Dict) -> List[Dict]:
+  # check the user tool and the user frame like Probing.parse
+  Equipment['EFFECTOR'][definition['ut']]
+  Reference['FRAME'][definition['uf']]
+
+  movements = PathArray.parse([definition['movement']])
+
+  return [c.to_dict() for c in __probing_commands(movements)]
+
+def __translate_drilling(definition:Dict) -> List[Dict]:
+  return [c.to_dict() for c in __drilling_commands(definition['speed'],
+                                                   definition['feed'],
+                                                   definition['peak'])]
+
+def __translate_with_definition(definition:Dict,
+                                definition_object:Definition,
+                                builder:Callable) -> List[Dict]:
+  # no dedicated translator, the definition object is small
+  return [c.to_dict() for c in builder(definition_object.parse(definition))]
+
+def __translate_with_template(definition:Dict,
+                              action_type:str,
+                              definition_object:Definition,
+                              builder:Callable,
+                              template_cache:CommandTemplateCache) -> List[Dict]:
+  # identical definitions give identical command sets, only the uids are new
+  return template_cache.get(action_type, definition_object.parse(definition), builder)
+
+# dedicated translator of each sequence builder
+__TRANSLATORS = {
+  __build_traj_gen_sequence: __translate_traj_gen,
+  __build_probing_sequence: __translate_probing,
+  __build_drilling_sequence: __translate_drilling
+}
+
+# sequence builders of the small definitions served from the command templates
+__TEMPLATE_BUILDERS = {__build_drilling_sequence, __build_effector_manipulation}
+
+def precompile_templates(template_cache:CommandTemplateCache,
+                         command_register:Dict[str, partial]):
+  """function to build the command skeletons of the finite definition domains
+     (every effector x operation for the manipulations)
+
+  Args:
+      template_cache (CommandTemplateCache): command template cache
+      command_register (Dict[str, partial]): action types and associated sequence builders
+  """
+  manipulations = [Manipulation(operation, effector) for effector in Equipment['EFFECTOR']
+                                                     for operation in Operation]
+  for _type, builder in command_register.items():
+    if builder.func is __build_effector_manipulation:
+      template_cache.precompile(_type, manipulations, builder)
+
+def compile_translators(action_definition:Dict[str, Definition],
+                        command_register:Dict[str, partial],
+                        template_cache:CommandTemplateCache=None) -> Dict[str, Callable[[Dict], List[Dict]]]:
+  """function to compile the translator of each action type of the command register
+     a translator builds the command dicts of an action from its raw definition document
+     raise a KeyError if the definition document is not valid
+
+  Args:
+      action_definition (Dict[str, Definition]): action types and associated definition objects
+      command_register (Dict[str, partial]): action types and associated sequence builders
+      template_cache (CommandTemplateCache, optional): command template cache of the small definitions
+
+  Returns:
+      Dict[str, Callable[[Dict], List[Dict]]]: action types and associated translators
+  """
+  translators = {}
+  for _type, builder in command_register.items():
+    translator = __TRANSLATORS.get(builder.func)
+    if template_cache is not None and builder.func in __TEMPLATE_BUILDERS:
+      translators[_type] = partial(__translate_with_template,
+                                   action_type=_type,
+                                   definition_object=action_definition[_type],
+                                   builder=builder,
+                                   template_cache=template_cache)
+    elif translator:
+      # same keywords as the sequence builder (ex: set_utuf)
+      translators[_type] = partial(translator, **builder.keywords)
+    else:
+      translators[_type] = partial(__translate_with_definition,
+                                   definition_object=action_definition[_type],
+                                   builder=builder)
+  return translators
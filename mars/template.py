@@ -0,0 +1,94 @@
+import hashlib
+import json
+from itertools import count
+from typing import Callable, Dict, Iterable, List
+from model.command import refresh_uids
+from model.definition import Definition
+
+# max number of command skeletons kept, the next definitions are generated without template
+DEFAULT_MAX_TEMPLATES = 4096
+
+def get_definition_key(action_type:str, definition:Definition) -> str:
+  """function to compute the canonical hash of a definition, identical definitions give the same key
+
+  Args:
+      action_type (str): action type (ex: WORK.DRILL)
+      definition (Definition): definition object
+
+  Returns:
+      str: hexadecimal hash
+  """
+  content = json.dumps([action_type, definition.to_dict()], sort_keys=True, separators=(',', ':'))
+  return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+class CommandTemplateCache:
+  """cache of the command skeletons of the definitions giving identical command sets
+     (ex: drilling parameters, effector manipulations), keyed by the canonical hash of the definition
+     a skeleton is built once by the sequence builder, each request gets a copy with new uids
+     (command uids, tracker uids and waited uids)
+  """
+  def __init__(self, max_templates:int=DEFAULT_MAX_TEMPLATES):
+    self.__max_templates:int = max_templates
+    self.__templates:Dict[str, List[Dict]] = {}
+    self.__requests:int = 0
+    self.__built:int = 0
+
+  def __len__(self) -> int:
+    return len(self.__templates)
+
+  def get(self, action_type:str, definition:Definition, builder:Callable) -> List[Dict]:
+    """function to get the command set of a definition from its skeleton, the skeleton is built if unknown
+
+    Args:
+        action_type (str): action type
+        definition (Definition): definition object
+        builder (Callable): sequence builder of the action type (see COMMAND_REGISTER)
+
+    Returns:
+        List[Dict]: commands under dict format with new uids
+    """
+    self.__requests += 1
+    key = get_definition_key(action_type, definition)
+    skeleton = self.__templates.get(key)
+    if skeleton is None:
+      skeleton = self.__build(key, definition, builder)
+    return refresh_uids(skeleton)
+
+  def precompile(self, action_type:str, definitions:Iterable[Definition], builder:Callable):
+    """function to build the skeletons of a finite domain of definitions (ex: every effector x operation)
+
+    Args:
+        action_type (str): action type
+        definitions (Iterable[Definition]): definition objects
+        builder (Callable): sequence builder of the action type
+    """
+    for definition in definitions:
+      key = get_definition_key(action_type, definition)
+      if key not in self.__templates:
+        self.__build(key, definition, builder)
+
+  def clear(self):
+    """remove the skeletons and reset the counters
+    """
+    self.__templates.clear()
+    self.__requests = 0
+    self.__built = 0
+
+  def to_dict(self) -> Dict:
+    return {
+      'templates': len(self.__templates),
+      'requests': self.__requests,
+      'built': self.__built
+    }
+
+  def __build(self, key:str, definition:Definition, builder:Callable) -> List[Dict]:
+    self.__built += 1
+    # the uids of the skeleton are replaced by placeholders derived from the key
+    # => the deterministic uids of a request do not depend on the skeleton build
+    placeholders = count()
+    skeleton = refresh_uids([c.to_dict() for c in builder(definition)],
+                            lambda uid: f"{key}:{next(placeholders)}")
+    if len(self.__templates) < self.__max_templates:
+      # setdefault => the same skeleton if two threads build it
+      skeleton = self.__templates.setdefault(key, skeleton)
+    return skeleton
@@ -10,6 +10,8 @@
 # MODIFGEN from ..mars.reference import Reference
 DB_DRIVER = object()
 COMMAND_REGISTER = object()
+COMMAND_STORE = None
+COMMAND_TRANSLATORS = None
 # MODIFGEN EQUIPMENT = Equipment
 # MODIFGEN REFERENCE = Reference
 EQUIPMENT = object()
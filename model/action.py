@@ -1,9 +1,25 @@
+import asyncio
+import hashlib
+import inspect
+import logging
+import bson
+from collections import deque
 from enum import Enum
-from typing import Dict
+from functools import partial
+from typing import Dict, List
 from .definition import Definition, Drilling, Manipulation, Path, Probing
+from .command import refresh_uids
+from .uid import uid_scope
+from db.driver import AsyncDBDriver
+from db.exceptions import DBDriverException, DBExceptionType
+from .exceptions import ModelException, ModelExceptionType
 # MODIFGEN from .__init__ import *
 import model
 
+LOGGER = logging.getLogger("cmd_generator.model.action")
+
+# marker of an action whose stored command set is not loaded yet
+_NOT_LOADED = object()
 
 ACTION_DEFINITION = {
   'MOVE.TCP.WORK': Path,
@@ -18,6 +34,150 @@ ACTION_DEFINITION = {
   'UNLOAD.EFFECTOR':Manipulation
 }
 
+def __build_projection(action_definition:Dict) -> Dict:
+    """function to build the mongo projection used to fetch an action
+       the definition is restricted to the fields read by the definition
+       object associated to the action type (a drilling never pull path data)
+       the projection use aggregation expressions (mongodb >= 4.4)
+
+    Args:
+        action_definition (Dict): action types and associated definition objects
+
+    Returns:
+        Dict: projection
+    """
+    # group the action types by definition object
+    definition_types = {}
+    for _type, definition_object in action_definition.items():
+        definition_types.setdefault(definition_object, []).append(_type)
+
+    # a branch by definition object keeping only the fields it parses
+    branches = []
+    for definition_object, types in definition_types.items():
+        fields = {field: f'$definition.{field}' for field in definition_object._FIELDS}
+        branches.append({
+            'case': {'$in': ['$type', types]},
+            'then': fields
+        })
+
+    return {
+        'type': 1,
+        'description': 1,
+        'definition': {
+            '$switch': {
+                'branches': branches,
+                'default': '$definition'
+            }
+        }
+    }
+
+ACTION_PROJECTION = __build_projection(ACTION_DEFINITION)
+
+def get_document_hash(serialize_action: Dict) -> str:
+    """function to compute the hash of the action document content used for the commands generation
+       (type and definition)
+
+    Args:
+        serialize_action (Dict): action document
+
+    Returns:
+        str: hexadecimal hash
+    """
+    content = bson.encode({
+        'type': serialize_action['type'],
+        'definition': serialize_action['definition']
+    })
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+# document fields linking the actions
+GRAPH_FIELDS = ['dependencies', 'next']
+GRAPH_PROJECTION = {**ACTION_PROJECTION, **{field: 1 for field in GRAPH_FIELDS}}
+
+def _get_links(document:Dict, field:str) -> List[str]:
+    return [str(id) for id in (document.get(field) or [])]
+
+def _sort_topologically(documents:List[Dict]) -> List[Dict]:
+    """function to sort action documents in execution order
+       an action comes after its dependencies and before its next actions
+       the links to actions not in the list are ignored
+       the initial order is kept between independent actions
+
+    Args:
+        documents (List[Dict]): action documents
+
+    Raises:
+        ModelException: if the links contain a cycle
+
+    Returns:
+        List[Dict]: sorted documents
+    """
+    documents = {str(document['_id']): document for document in documents}
+
+    # build the successors list and the number of predecessors of each action
+    successors = {id: [] for id in documents}
+    predecessors = {id: 0 for id in documents}
+    for id, document in documents.items():
+        for dependency in _get_links(document, 'dependencies'):
+            if dependency in documents:
+                successors[dependency].append(id)
+                predecessors[id] += 1
+        for next_id in _get_links(document, 'next'):
+            if next_id in documents:
+                successors[id].append(next_id)
+                predecessors[next_id] += 1
+
+    # kahn algorithm
+    ready = deque(id for id in documents if predecessors[id] == 0)
+    sorted_documents = []
+    while ready:
+        id = ready.popleft()
+        sorted_documents.append(documents[id])
+        for successor in successors[id]:
+            predecessors[successor] -= 1
+            if predecessors[successor] == 0:
+                ready.append(successor)
+
+    if len(sorted_documents) != len(documents):
+        cycle = [id for id in documents if predecessors[id] > 0]
+        raise ModelException(["ACTION", "GRAPH"],
+                             ModelExceptionType.INVALID_GRAPH,
+                             f"the action graph contains a cycle between the actions {cycle}")
+
+    return sorted_documents
+
+async def _run_driver_query(query, *args):
+    """coroutine to run a database driver query without blocking the event loop
+       the query of an asynchronous driver is awaited,
+       the query of a synchronous driver is run in the default executor
+
+    Args:
+        query (Callable): driver function or coroutine function
+
+    Returns:
+        the query result
+    """
+    if inspect.iscoroutinefunction(query):
+        return await query(*args)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(query, *args))
+
+def _get_sync_driver():
+    """function to get the database driver of the synchronous queries
+
+    Raises:
+        DBDriverException: if the configured driver is asynchronous (see the *_async functions)
+
+    Returns:
+        the database driver
+    """
+    driver = model.DB_DRIVER
+    if isinstance(driver, AsyncDBDriver):
+        raise DBDriverException(["ACTION", "DBDRIVER"],
+                                DBExceptionType.UNSUPPORTED_OPERATION,
+                                "the asynchronous database driver can not be used by the synchronous generation")
+    return driver
+
 # action object
 class Action:
 
@@ -32,7 +192,7 @@ class Action:
     next : List[Action]
         list of next actions
     definition : object
-        definition object. read only
+        definition object, parsed from the source document on first access. read only
     priority : int
         action priority. read only
     description : str
@@ -50,24 +210,33 @@ class Action:
 
     """
 
+    __slots__ = ('__id', '__type', '__definition', '__description', '__document', '__hash', '__stored')
+
     def __init__(self, id: str,
                  atype: str,
                  definition: Definition,
-                 description: str):
+                 description: str,
+                 document: Dict = None):
 
         """Action object initializer
+        if definition is None, the definition is parsed from the source document on first access
 
         Args:
             id (str): unique action id
             atype (str): action type
-            definition (object): action definition according action type
+            definition (object): action definition according action type or None
             description (str): human readable description
+            document (Dict, optional): source document, used to compute the content hash
+                and to parse the definition
         """
 
         self.__id: str = id
         self.__type: str = atype
         self.__definition: Definition = definition
         self.__description: str = description
+        self.__document: Dict = document
+        self.__hash: str = None
+        self.__stored: List[Dict] = _NOT_LOADED
 
     # getter and setters
     @property
@@ -102,11 +271,17 @@ class Action:
 
     @property
     def definition(self) -> Definition:
-        """ get the definition object
+        """ get the definition object, parsed and memoized on first access
+
+        Raises:
+            KeyError: if the definition of the source document is not valid
 
         Returns:
             object: action definition
         """
+        if self.__definition is None and self.__document is not None:
+            definition_object: Definition = ACTION_DEFINITION[self.__type]
+            self.__definition = definition_object.parse(self.__document['definition'])
         return self.__definition
 
     @definition.setter
@@ -134,6 +309,17 @@ class Action:
         """
         self.__description = ndesc
 
+    @property
+    def hash(self) -> str:
+        """ get the hash of the source document content, computed on first access
+
+        Returns:
+            str: document hash or None if the action is not parsed from a document
+        """
+        if self.__hash is None and self.__document is not None:
+            self.__hash = get_document_hash(self.__document)
+        return self.__hash
+
     def __repr__(self) -> str:
         """ overload the __repr__ function
         Returns:
@@ -148,18 +334,19 @@ class Action:
         id = str(serialize_action['_id'])
 
         try:
-          definition_object:Definition = ACTION_DEFINITION[_type]
-          definition = definition_object.parse(serialize_action['definition'])
+          # check the action type, the definition is parsed on first access
+          ACTION_DEFINITION[_type]
           
           description = serialize_action['description']
 
           return Action(id, 
                 _type,
-                definition,
-                description)
+                None,
+                description,
+                serialize_action)
 
         except KeyError:
-          print(f'Action type {_type} is not a valid action type')
+          LOGGER.warning(f'Action type {_type} is not a valid action type')
 
         
     def to_dict(self):
@@ -167,25 +354,170 @@ class Action:
             "_id": self.__id,
             "type": self.__type,
             "description": self.__description,
-            "definition": self.__definition.to_dict(),
+            "definition": self.definition.to_dict(),
         }
         return d_action
 
     def get_commands(self):
-        # get the command fonction accordig the action type (ex:MOVE.TCP.WORK)
-        # the command register is defined in the register.py file in the mars module
-        cmd_fct = model.COMMAND_REGISTER[self.__type]
-        
-        #apply the fonction with the definition as parameters to get the commands
-        cmd_list = cmd_fct(self.__definition)
-        
-        # return the commands under dict format
-        return [c.to_dict() for c in cmd_list]
+        """ get the commands of the action under dict format
+
+        Raises:
+            ModelException: the action definition is not valid
+
+        Returns:
+            List[Dict]: commands
+        """
+        # uids of the commands derived from the action with the deterministic uid strategy
+        with uid_scope((self.__id, self.hash)):
+            return self.__generate_commands()
+
+    def __generate_commands(self):
+        # if a command store is configured, return the stored command set
+        # generated from the same document content, with new uids
+        store = model.COMMAND_STORE
+        if store and self.hash:
+            # the set may already be loaded with its batch (see load_stored_commands)
+            commands = store.find(self.__id, self.hash) if self.__stored is _NOT_LOADED else self.__stored
+            self.__stored = _NOT_LOADED
+            if commands is not None:
+                return refresh_uids(commands)
+
+        try:
+            translators = model.COMMAND_TRANSLATORS
+            if translators and self.__definition is None and self.__document is not None:
+                # fast path, the commands are built from the raw definition document
+                # without definition object (see compile_translators in the mars module)
+                commands = translators[self.__type](self.__document['definition'])
+            else:
+                # parse the definition only when the commands are generated
+                definition = self.definition
+
+                # get the command fonction accordig the action type (ex:MOVE.TCP.WORK)
+                # the command register is defined in the register.py file in the mars module
+                cmd_fct = model.COMMAND_REGISTER[self.__type]
+
+                #apply the fonction with the definition as parameters to get the commands
+                cmd_list = cmd_fct(definition)
+
+                # get the commands under dict format
+                commands = [c.to_dict() for c in cmd_list]
+
+        except (KeyError, ValueError) as error:
+            # missing field or unknown enumeration value in the definition
+            LOGGER.debug(f'Action {self.__id} definition is not valid : {error!r}')
+            raise ModelException(["ACTION", "COMMANDS"],
+                                 ModelExceptionType.PARSING_ERROR,
+                                 f"action {self.__id} definition is not valid : {error!r}")
+        except ModelException as error:
+            error.add_in_stack(["ACTION", "COMMANDS"])
+            raise error
+
+        # store the command set in background (write behind)
+        if store and self.hash:
+            store.save(self.__id, self.hash, commands)
+
+        return commands
     
     
+    @staticmethod
+    def load_stored_commands(actions:List['Action']):
+        """function to load the stored command sets of a batch of actions in one store request
+           the command sets are not read again by get_commands
+
+        Args:
+            actions (List[Action]): actions, None for a not found action
+        """
+        store = model.COMMAND_STORE
+        if not store:
+            return
+        actions = [action for action in actions if action and action.hash]
+        if not actions:
+            return
+        stored = store.find_many([(action.__id, action.hash) for action in actions])
+        for action, commands in zip(actions, stored):
+            action.__stored = commands
+
     @classmethod
     def get_from_db(cls, action_id:str):
-        action = model.DB_DRIVER.find_by_id(action_id)
+        action = _get_sync_driver().find_by_id(action_id, ACTION_PROJECTION)
         # MODIFGEN action = DB_DRIVER.find_by_id(action_id)
         if action:
             return cls.parse(action)
+
+    @classmethod
+    def get_many_from_db(cls, action_ids:List[str]) -> List['Action']:
+        # get all the documents in one database round trip
+        documents = _get_sync_driver().find_by_ids(action_ids, ACTION_PROJECTION)
+        # index the documents by id, the driver does not guarantee the order
+        documents = {str(document['_id']): document for document in documents}
+
+        # return the actions in the requested order, None if not found
+        actions = [cls.parse(documents[action_id]) if action_id in documents else None
+                   for action_id in action_ids]
+        cls.load_stored_commands(actions)
+        return actions
+
+    @classmethod
+    def get_graph_from_db(cls, root_id:str) -> List['Action']:
+        driver = _get_sync_driver()
+        if hasattr(driver, 'find_graph'):
+            # get the root and all the linked actions in one database round trip
+            documents = driver.find_graph(root_id, GRAPH_FIELDS, GRAPH_PROJECTION)
+        else:
+            # walk the graph level by level, one database round trip by level
+            documents = []
+            known = {str(root_id)}
+            level = [str(root_id)]
+            while level:
+                level_documents = driver.find_by_ids(level, GRAPH_PROJECTION)
+                documents.extend(level_documents)
+                level = list(dict.fromkeys(id for document in level_documents
+                                              for field in GRAPH_FIELDS
+                                              for id in _get_links(document, field) if id not in known))
+                known.update(level)
+
+        actions = [cls.parse(document) for document in _sort_topologically(documents)]
+        # ignore the actions with a non valid type
+        actions = [action for action in actions if action]
+        cls.load_stored_commands(actions)
+        return actions
+
+    @classmethod
+    async def get_from_db_async(cls, action_id:str):
+        action = await _run_driver_query(model.DB_DRIVER.find_by_id, action_id, ACTION_PROJECTION)
+        if action:
+            return cls.parse(action)
+
+    @classmethod
+    async def get_many_from_db_async(cls, action_ids:List[str]) -> List['Action']:
+        # get all the documents in one database round trip
+        documents = await _run_driver_query(model.DB_DRIVER.find_by_ids, action_ids, ACTION_PROJECTION)
+        # index the documents by id, the driver does not guarantee the order
+        documents = {str(document['_id']): document for document in documents}
+
+        # return the actions in the requested order, None if not found
+        return [cls.parse(documents[action_id]) if action_id in documents else None
+                for action_id in action_ids]
+
+    @classmethod
+    async def get_graph_from_db_async(cls, root_id:str) -> List['Action']:
+        driver = model.DB_DRIVER
+        if hasattr(driver, 'find_graph'):
+            # get the root and all the linked actions in one database round trip
+            documents = await _run_driver_query(driver.find_graph, root_id, GRAPH_FIELDS, GRAPH_PROJECTION)
+        else:
+            # walk the graph level by level, one database round trip by level
+            documents = []
+            known = {str(root_id)}
+            level = [str(root_id)]
+            while level:
+                level_documents = await _run_driver_query(driver.find_by_ids, level, GRAPH_PROJECTION)
+                documents.extend(level_documents)
+                level = list(dict.fromkeys(id for document in level_documents
+                                              for field in GRAPH_FIELDS
+                                              for id in _get_links(document, field) if id not in known))
+                known.update(level)
+
+        actions = [cls.parse(document) for document in _sort_topologically(documents)]
+        # ignore the actions with a non valid type
+        return [action for action in actions if action]
@@ -1,12 +1,14 @@
-from typing import Dict
-from uuid import uuid4
+from typing import Callable, Dict, List
+from .uid import new_uid
 class Command:
+  __slots__ = ('__uid', '__action', '__target', '__description', '__definition')
+
   def __init__(self,
                target:str,
                action:str,
                description:str,
                definition:Dict):
-    self.__uid = str(uuid4())
+    self.__uid = new_uid((target, action, description))
     self.__action = action
     self.__target = target
     self.__description = description
@@ -15,6 +17,22 @@ class Command:
   @property
   def uid(self):
     return self.__uid
+
+  @property
+  def target(self) -> str:
+    return self.__target
+
+  @property
+  def action(self) -> str:
+    return self.__action
+
+  @property
+  def description(self) -> str:
+    return self.__description
+
+  @property
+  def definition(self) -> Dict:
+    return self.__definition
   
   def to_dict(self):
     return {
@@ -24,3 +42,32 @@ class Command:
       'description' : self.__description,
       'definition' : self.__definition
     }
+
+def refresh_uids(commands:List[Dict], uid_function:Callable[[str], str]=new_uid) -> List[Dict]:
+  """function to copy a list of commands under dict format with new uids
+     each 'uid' value (command uid, tracker uid, waited uid) is replaced by a new uid,
+     the same value is replaced by the same new uid to keep the references between commands
+
+  Args:
+      commands (List[Dict]): list of commands under dict format
+      uid_function (Callable[[str], str], optional): function giving the new uid of a value. Defaults to new_uid.
+
+  Returns:
+      List[Dict]: copy of the commands with new uids
+  """
+  uids = {}
+
+  def new(value:str) -> str:
+    if value not in uids:
+      uids[value] = uid_function(value)
+    return uids[value]
+
+  def copy(element):
+    if isinstance(element, dict):
+      return {key: new(value) if key == 'uid' and isinstance(value, str) else copy(value)
+              for key, value in element.items()}
+    if isinstance(element, (list, tuple)):
+      return [copy(value) for value in element]
+    return element
+
+  return copy(commands)
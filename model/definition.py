@@ -1,17 +1,24 @@
 
 import abc
-from typing import Dict, List
+from typing import Dict, List, Union
 
 # MODIFGEN from .__init__ import *
 import model
 
 from .movement import Movement
+from .trajectory import PathArray
 from .equipment import EquipmentI, Operation
 from .reference import ReferenceI
 
 class Definition(object):
     __metaclass__ = abc.ABCMeta
 
+    # no instance dictionnary in the definition objects
+    __slots__ = ()
+
+    # definition fields read by the parse function
+    _FIELDS = []
+
     @abc.abstractmethod
     def parse(serialize_definition: Dict):
         return
@@ -25,17 +32,25 @@ class Path(Definition):
 
     """ Class used to represent a Movement
     """
-    def __init__(self, uf: ReferenceI, ut: EquipmentI, movements: List[Movement]):
+
+    __slots__ = ('__uf', '__ut', '__movements')
+
+    _FIELDS = ['ut', 'uf', 'movements', 'trajectory']
+
+    def __init__(self, uf: ReferenceI, ut: EquipmentI, movements: Union[List[Movement], PathArray]):
         """Movement object initializer
+        the movements are kept as a structure of arrays (PathArray)
 
         Args:
             uf (int): user frame id
             ut (int): user tool id
-            points (List[Point]): list of points describing the movement
+            movements (Union[List[Movement], PathArray]): movements describing the path
         """
         self.__uf: ReferenceI = uf
         self.__ut: EquipmentI = ut
-        self.__movements: List[Movement] = movements
+        if not isinstance(movements, PathArray):
+            movements = PathArray.from_movements(movements)
+        self.__movements: PathArray = movements
 
     @property
     def user_tool(self) -> str:
@@ -47,6 +62,11 @@ class Path(Definition):
 
     @property
     def movements(self) -> List[Movement]:
+        # movement objects built on demand from the arrays
+        return self.__movements.to_movements()
+
+    @property
+    def path_array(self) -> PathArray:
         return self.__movements
 
     @staticmethod
@@ -63,10 +83,11 @@ class Path(Definition):
         uf = model.REFERENCE['FRAME'][uf]
         #MODIFGEN uf = REFERENCE['FRAME'][uf]
 
-        movements = []
-
-        for sp in serialize_movement['movements']:
-            movements.append(Movement.parse(sp))
+        # columnar binary trajectory, decoded without per point dictionnary
+        if serialize_movement.get('trajectory') is not None:
+            movements = PathArray.from_trajectory(serialize_movement['trajectory'])
+        else:
+            movements = PathArray.parse(serialize_movement['movements'])
 
         return Path(uf, ut, movements)
 
@@ -74,7 +95,7 @@ class Path(Definition):
         return { 
             "uf": self.__uf.name,
             "ut": self.__ut.name,
-            "movements": [p.to_dict() for p in self.__movements]
+            "movements": self.__movements.to_dict()
         }
 
     def to_cmd_data(self) -> Dict:
@@ -83,26 +104,13 @@ class Path(Definition):
         Returns:
             Dict: dictionnary describing the path
         """
-        # init list for setttings
-        m_paras = []
-        # init list for position
-        m_positions = []
-        
-        # extract settings and position from movement list
-        for movement in self.__movements:
-            # get dict describing the movement
-            mvt_cmd_def = movement.to_cmd_data()
-            
-            # insert parameters in m_para and position in m_positions
-            m_paras.extend(mvt_cmd_def['parameters'])
-            m_positions.append(mvt_cmd_def['position'])
-
+        # settings and positions built from the arrays, without movement object
         return {
             "uf": self.__uf.value,
             "ut": self.__ut.value,
             "movements": {
-                "parameters": m_paras,
-                "positions": m_positions
+                "parameters": self.__movements.parameters_to_cmd_data(),
+                "positions": self.__movements.positions_to_cmd_data()
             }
         }
 
@@ -111,6 +119,10 @@ class Drilling(Definition):
     # TODO add other parameters in the futur: DrillingCycleLimit, ClampingCycleLimit, TemperatureAlarm, CurrentAlarm
     # update __init__ parse and to_dict
 
+    __slots__ = ('__speed', '__feed', '__peak')
+
+    _FIELDS = ['speed', 'feed', 'peak']
+
     def __init__(self, speed:int, feed:int, peak:bool):
         self.__speed = speed
         self.__feed = feed
@@ -150,6 +162,11 @@ class Drilling(Definition):
 
 
 class Probing(Definition):
+
+    __slots__ = ('__uf', '__ut', '__movement')
+
+    _FIELDS = ['ut', 'uf', 'movement']
+
     def __init__(self, ut:EquipmentI, uf:ReferenceI, movement:Movement):
         self.__uf: ReferenceI = uf
         self.__ut: EquipmentI = ut
@@ -191,6 +208,10 @@ class Probing(Definition):
 
 
 class Manipulation(Definition):
+
+    __slots__ = ('__operation', '__equipment')
+
+    _FIELDS = ['equipment', 'manipulation']
     
     def __init__(self, manipulation_type:Operation, equipment:EquipmentI):
         self.__operation:Operation = manipulation_type
@@ -1,11 +1,12 @@
+from typing import List
+from exceptions import BaseException, ExceptionType
 
-from exceptions import BaseException
-from utils import GetItemEnum
-from enum import Enum
-
-class ModelExceptionType(Enum, metaclass=GetItemEnum):
+class ModelExceptionType(ExceptionType):
   PARSING_ERROR = "MODEL_PARSING_ERROR"
+  INVALID_GRAPH = "MODEL_INVALID_GRAPH"
 
 class ModelException(BaseException):
-  def __init__(self, type:ModelExceptionType, description:str, module:str):
-    super()
\ No newline at end of file
+  def __init__(self, origin_stack:List[str], type:ModelExceptionType, description:str):
+    super().__init__(origin_stack,
+                     type,
+                     description)
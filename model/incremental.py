@@ -0,0 +1,145 @@
+from typing import Dict, List
+from .action import ACTION_PROJECTION, Action, get_document_hash
+from .exceptions import ModelException
+# MODIFGEN from .__init__ import *
+import model
+
+
+class IncrementalGenerator:
+
+    """Class used to regenerate only the commands of the modified actions of a job.
+
+    For each action, the generator keeps the hash of the document content
+    consumed by Action.parse, the last generated commands and the last update
+    date seen in its document (watermark). The watermarks are kept by action,
+    the requests on different action sets do not hide the updates to each other.
+
+    Methods
+    -------
+    regenerate(action_ids)
+        generate the commands of the new and modified actions
+
+    get_commands(action_id)
+        get the last generated commands of an action
+    """
+
+    def __init__(self, watermark_field: str = 'updated_at'):
+        """IncrementalGenerator object initializer
+
+        Args:
+            watermark_field (str, optional): document field containing the last update date
+        """
+        self.__watermark_field: str = watermark_field
+        self.__projection: Dict = {**ACTION_PROJECTION, watermark_field: 1}
+        self.__hashes: Dict[str, str] = {}
+        self.__commands: Dict[str, List[Dict]] = {}
+        self.__watermarks: Dict[str, object] = {}
+
+    def get_watermark(self, action_ids: List[str]):
+        """ get the update date from which the known actions of a list can have changed
+            (oldest last update date seen in their documents)
+
+        Args:
+            action_ids (List[str]): action ids
+
+        Returns:
+            update date or None if an action has no known update date
+        """
+        watermarks = [self.__watermarks.get(id) for id in action_ids]
+        if not watermarks or None in watermarks:
+            return None
+        return min(watermarks)
+
+    def get_commands(self, action_id: str) -> List[Dict]:
+        """ get the last generated commands of an action
+
+        Args:
+            action_id (str): action id
+
+        Returns:
+            List[Dict]: commands or None if the action is unknown
+        """
+        return self.__commands.get(action_id)
+
+    def regenerate(self, action_ids: List[str]) -> Dict[str, List[str]]:
+        """ generate the commands of the new actions and of the actions
+            whose document content changed since the last pass
+
+        if the watermarks of the known actions are known and the driver supports it,
+        only the documents updated since the oldest watermark are read for the known actions,
+        the deleted actions are found with an existence check of the known actions
+
+        Args:
+            action_ids (List[str]): ids of the job actions
+
+        Returns:
+            Dict[str, List[str]]: ids of the actions rebuilt, unchanged and missing,
+                                  errors of the actions with a non valid definition (by id)
+        """
+        driver = model.DB_DRIVER
+        known = [id for id in action_ids if id in self.__hashes]
+        unknown = [id for id in action_ids if id not in self.__hashes]
+        missing = []
+        errors = {}
+
+        watermark = self.get_watermark(known)
+        if known and watermark is not None and hasattr(driver, 'find_updated_since'):
+            # only the documents updated since the oldest watermark can have changed
+            job = set(known)
+            documents = [document for document in driver.find_updated_since(self.__watermark_field,
+                                                                              watermark,
+                                                                              self.__projection)
+                         if str(document['_id']) in job]
+            # the deleted actions are not returned by the updates query
+            found = {str(document['_id']) for document in driver.find_by_ids(known, {'_id': 1})}
+            missing.extend(id for id in known if id not in found)
+        else:
+            documents = driver.find_by_ids(known, self.__projection) if known else []
+            # the known actions not found have been deleted
+            found = {str(document['_id']) for document in documents}
+            missing.extend(id for id in known if id not in found)
+
+        if unknown:
+            new_documents = driver.find_by_ids(unknown, self.__projection)
+            found = {str(document['_id']) for document in new_documents}
+            missing.extend(id for id in unknown if id not in found)
+            documents.extend(new_documents)
+
+        rebuilt = []
+        for document in documents:
+            id = str(document['_id'])
+            self.__watermarks[id] = document.get(self.__watermark_field)
+
+            document_hash = get_document_hash(document)
+            if document_hash == self.__hashes.get(id):
+                continue
+
+            action = Action.parse(document)
+            # run the command register only for the new or modified actions
+            try:
+                commands = action.get_commands() if action is not None else None
+            except ModelException as error:
+                errors[id] = error.describe()
+                commands = None
+            if commands is None:
+                missing.append(id)
+                continue
+
+            self.__commands[id] = commands
+            self.__hashes[id] = document_hash
+            rebuilt.append(id)
+
+        for id in missing:
+            self.__hashes.pop(id, None)
+            self.__commands.pop(id, None)
+            self.__watermarks.pop(id, None)
+
+        rebuilt_ids = set(rebuilt)
+        missing_ids = set(missing)
+        return {
+            "rebuilt": rebuilt,
+            "unchanged": [id for id in action_ids if id not in rebuilt_ids and id not in missing_ids],
+            "missing": missing,
+            "errors": errors
+        }
+
@@ -0,0 +1,91 @@
+from typing import Callable, Dict, Hashable
+
+# max number of instances kept by an interner, the next ones are not shared
+DEFAULT_MAX_INSTANCES = 65536
+
+
+class Interner:
+
+    """Class used to share one immutable instance between identical values (flyweight).
+
+    The interner counts the requests and the created instances,
+    the difference is the number of allocations saved.
+
+    Methods
+    -------
+    get(key, factory)
+        get the shared instance of a key, created with factory if unknown
+
+    to_dict()
+        get the interner statistics
+    """
+
+    __slots__ = ('__name', '__max_instances', '__instances', '__requests', '__created')
+
+    def __init__(self, name: str, max_instances: int = DEFAULT_MAX_INSTANCES):
+        """Interner object initializer
+
+        Args:
+            name (str): interner name, used in the statistics
+            max_instances (int, optional): max number of shared instances
+        """
+        self.__name: str = name
+        self.__max_instances: int = max_instances
+        self.__instances: Dict = {}
+        self.__requests: int = 0
+        self.__created: int = 0
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    def __len__(self) -> int:
+        return len(self.__instances)
+
+    def get(self, key: Hashable, factory: Callable):
+        """ get the shared instance of a key
+
+        Args:
+            key (Hashable): value identifying the instance
+            factory (Callable): function without argument building the instance
+
+        Returns:
+            shared instance
+        """
+        self.__requests += 1
+        instance = self.__instances.get(key)
+        if instance is None:
+            self.__created += 1
+            instance = factory()
+            if len(self.__instances) < self.__max_instances:
+                # setdefault => the same instance if two threads create it
+                instance = self.__instances.setdefault(key, instance)
+        return instance
+
+    def clear(self):
+        """ remove the shared instances and reset the counters
+        """
+        self.__instances.clear()
+        self.__requests = 0
+        self.__created = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'instances': len(self.__instances),
+            'requests': self.__requests,
+            'created': self.__created,
+            'interned': self.__requests - self.__created
+        }
+
+
+CONFIGURATIONS = Interner('configurations')
+MOVEMENT_PARAMETERS = Interner('movement_parameters')
+
+
+def get_intern_statistics() -> Dict[str, Dict]:
+    """function to get the statistics of the model interners
+
+    Returns:
+        Dict[str, Dict]: statistics by interner name
+    """
+    return {interner.name: interner.to_dict() for interner in (CONFIGURATIONS, MOVEMENT_PARAMETERS)}
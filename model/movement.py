@@ -3,6 +3,41 @@ from typing import Dict, List, Tuple
 import numpy as np
 import abc
 
+from .intern import CONFIGURATIONS, MOVEMENT_PARAMETERS
+
+# number of decimals of the serialized position coordinates
+POSITION_DECIMALS = 3
+
+def round_vectors(vectors: np.ndarray, decimals: int = POSITION_DECIMALS) -> List[List[float]]:
+    """function to round a batch of position vectors in one numpy operation
+       the result is identical to round(float(value), decimals) on each coordinate :
+       numpy rounds value * 10**decimals, the coordinates for which this product is
+       close to a half, too big to be exact or not finite are rounded again with the python round function
+
+    Args:
+        vectors (np.ndarray): position vectors N x 6 (or a single vector)
+        decimals (int, optional): number of decimals. Defaults to POSITION_DECIMALS.
+
+    Returns:
+        List[List[float]]: rounded vectors as python floats
+    """
+    vectors = np.asarray(vectors, dtype=np.float64)
+    scale = 10.0 ** decimals
+    scaled = vectors * scale
+    rounded = np.rint(scaled) / scale
+
+    # fractional part close to 0.5 => numpy and python can round differently
+    # (the product error is below 1e-16 x scaled)
+    with np.errstate(invalid='ignore'):
+        magnitude = np.abs(scaled)
+        distance = np.abs(scaled - np.floor(scaled) - 0.5)
+        ambiguous = ~((distance > 1e-12 * np.maximum(1.0, magnitude)) & (magnitude < 2.0 ** 52))
+    if ambiguous.any():
+        for index in zip(*np.nonzero(ambiguous)):
+            rounded[index] = round(float(vectors[index]), decimals)
+
+    return rounded.tolist()
+
 class MovementType(Enum):
     """Path type enumeration
 
@@ -55,7 +90,10 @@ class ArmConfig(Enum):
 
 class Configuration:
     """Class used to represent the arm configuration
+    immutable, the identical configurations share one instance (see Configuration.intern)
     """
+    __slots__ = ('__wrist', '__forearm', '__arm', '__j4', '__j5', '__j6', '__cmd_data')
+
     def __init__(self, wrist: WristConfig,
                  forearm: ForeArmConfig,
                  arm: ArmConfig,
@@ -80,6 +118,46 @@ class Configuration:
         self.__j4: int = 0
         self.__j5: int = 0
         self.__j6: int = 0
+        self.__cmd_data: Dict = None
+
+    @staticmethod
+    def intern(wrist: WristConfig,
+               forearm: ForeArmConfig,
+               arm: ArmConfig,
+               j4: int = 0,
+               j5: int = 0,
+               j6: int = 0) -> 'Configuration':
+        """ get the shared Configuration object of a configuration
+
+        Returns:
+            Configuration: shared configuration
+        """
+        return CONFIGURATIONS.get((wrist, forearm, arm, j4, j5, j6),
+                                  lambda: Configuration(wrist, forearm, arm, j4, j5, j6))
+
+    @property
+    def wrist(self) -> WristConfig:
+        return self.__wrist
+
+    @property
+    def forearm(self) -> ForeArmConfig:
+        return self.__forearm
+
+    @property
+    def arm(self) -> ArmConfig:
+        return self.__arm
+
+    @property
+    def j4(self) -> int:
+        return self.__j4
+
+    @property
+    def j5(self) -> int:
+        return self.__j5
+
+    @property
+    def j6(self) -> int:
+        return self.__j6
 
     @staticmethod
     def parse(serialize_config: Dict) -> 'Configuration':
@@ -90,7 +168,7 @@ class Configuration:
         j5 = serialize_config['j5']
         j6 = serialize_config['j6']
 
-        return Configuration(wrist, forearm, arm, j4, j5, j6)
+        return Configuration.intern(wrist, forearm, arm, j4, j5, j6)
 
     def to_dict(self):
         return {
@@ -103,19 +181,42 @@ class Configuration:
         }
 
     def to_cmd_data(self):
-        return {
-            "wrist": self.__wrist.name,
-            "forearm": self.__forearm.name,
-            "arm": self.__arm.name,
-            "j4": self.__j4,
-            "j5": self.__j5,
-            "j6": self.__j6
-        }
+        # built once by configuration, each command body gets its own copy
+        # (a body modified by a caller must not change the next commands)
+        if self.__cmd_data is None:
+            self.__cmd_data = {
+                "wrist": self.__wrist.name,
+                "forearm": self.__forearm.name,
+                "arm": self.__arm.name,
+                "j4": self.__j4,
+                "j5": self.__j5,
+                "j6": self.__j6
+            }
+        return dict(self.__cmd_data)
+
+def get_parameters_cmd_data(cnt: int, speed: int, _type: MovementType) -> Dict:
+    """ get the command data of a movement parameters triple, copy of the shared data
+        (a body modified by a caller must not change the next commands)
+
+    Args:
+        cnt (int): passing accuracy
+        speed (int): movement speed
+        _type (MovementType): movement type
+
+    Returns:
+        Dict: movement parameters command data
+    """
+    return dict(MOVEMENT_PARAMETERS.get((cnt, speed, _type),
+                                        lambda: {"cnt": cnt, "speed": speed, "type": _type}))
+
 
 class Position:
 
     """Class used to represent a TCP position"""
 
+    # no instance dictionnary, a path can contain a lot of positions
+    __slots__ = ('_vector', '__type', '__config', '__e1', '__ut', '__uf')
+
     _VECTOR_KEYS=None
     __metaclass__ = abc.ABCMeta
 
@@ -165,6 +266,10 @@ class Position:
     def type(self):
         return self.__type.name
 
+    @property
+    def config(self) -> Configuration:
+        return self.__config
+
     @staticmethod
     def parse(serialize_position) -> 'Position':
         type = serialize_position['type']
@@ -202,15 +307,13 @@ class Position:
         }
 
     def __vector_to_dict(self):
-        vector_list = []
-        for index, key in enumerate(self.__class__._VECTOR_KEYS):
-            vector_list.append((key, round(float(self._vector[index]), 3)))
-
-        return dict(vector_list)
+        return dict(zip(self.__class__._VECTOR_KEYS, round_vectors(self._vector)))
 
 
 class PositionCrt(Position):
 
+    __slots__ = ()
+
     _VECTOR_KEYS = ['x', 'y', 'z', 'w', 'p', 'r']
 
     """ Class used to represent a Position in cartesian representation
@@ -246,6 +349,8 @@ class PositionCrt(Position):
 
 class PositionJoint(Position):
 
+    __slots__ = ()
+
     _VECTOR_KEYS = ['j1', 'j2', 'j3', 'j4', 'j5', 'j6']
 
     """ Class used to represent a Position in joint representation
@@ -280,6 +385,8 @@ class Movement:
 
     """ Class used to represent a movement passing point
     """
+    __slots__ = ('__cnt', '__speed', '__position', '__type')
+
     def __init__(self, cnt: int,
                  speed: int,
                  _type: MovementType,
@@ -336,11 +443,7 @@ class Movement:
 
     def to_cmd_data(self) -> Dict:
         return {
-            "parameters": {
-                    "cnt": self.__cnt,
-                    "speed": self.__speed,
-                    "type": self.__type
-                },
+            "parameters": get_parameters_cmd_data(self.__cnt, self.__speed, self.__type),
             "position": self.__position.to_cmd_data()
             }
     '''
@@ -0,0 +1,566 @@
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+
+from .movement import (ArmConfig, Configuration, ForeArmConfig, Movement,
+                       MovementType, PositionCrt, PositionJoint, PositionType,
+                       WristConfig, get_parameters_cmd_data, round_vectors)
+from .exceptions import ModelException, ModelExceptionType
+
+"""
+PathArray : structure of arrays describing the movements of a path
+
+columnar trajectory layout, stored in the 'trajectory' field of a path definition
+all the arrays are little endian binary fields with one item by movement :
+- count : number of movements
+- vectors : float64 N x 6 (x, y, z, w, p, r or j1 ... j6)
+- e1 : int32 (integer values only, a decimal value is rejected)
+- config : int8 N x 6 (wrist, forearm, arm, j4, j5, j6), enumerations coded by index
+- cnt : int32
+- speed : int32
+- type : uint8, movement type coded by index
+- position_type : uint8, position type coded by index, optional (CARTESIAN by default)
+"""
+
+MOVEMENT_TYPES = [MovementType.JOINT, MovementType.LINEAR, MovementType.CIRCULAR]
+POSITION_TYPES = [PositionType.CARTESIAN, PositionType.JOINT]
+WRIST_CONFIGS = [WristConfig.NOFLIP, WristConfig.FLIP]
+FOREARM_CONFIGS = [ForeArmConfig.UP, ForeArmConfig.DOWN]
+ARM_CONFIGS = [ArmConfig.TOWARD, ArmConfig.BACKWARD]
+
+VECTOR_DTYPE = np.dtype('<f8')
+E1_DTYPE = np.dtype('<i4')
+CONFIG_DTYPE = np.dtype('i1')
+CNT_DTYPE = np.dtype('<i4')
+SPEED_DTYPE = np.dtype('<i4')
+TYPE_DTYPE = np.dtype('u1')
+
+
+def _to_integers(values: List, dtype: np.dtype, field: str) -> np.ndarray:
+    """function to convert the values of an integer field (e1, cnt, speed) in an array
+       the decimal values and the values out of the dtype range are rejected, never truncated
+
+    Args:
+        values (List): field values, one by movement
+        dtype (np.dtype): integer dtype of the field
+        field (str): field name
+
+    Raises:
+        ModelException: a value is not an integer of the dtype range
+
+    Returns:
+        np.ndarray: field array
+    """
+    array = np.asarray(values, dtype=np.float64)
+    limits = np.iinfo(dtype)
+    valid = np.isfinite(array) & (array == np.trunc(array)) & (array >= limits.min) & (array <= limits.max)
+    if not valid.all():
+        value = values[int(np.argmin(valid))]
+        raise ModelException(["PATH", "TRAJECTORY"],
+                             ModelExceptionType.PARSING_ERROR,
+                             f"the {field} value {value!r} is not an integer of the {dtype} range")
+    return array.astype(dtype)
+
+
+def _from_buffer(serialize_trajectory: Dict, field: str, dtype: np.dtype, count: int, width: int = 1) -> np.ndarray:
+    """function to read a binary field of a columnar trajectory without copy
+       the buffer size must match the movement count
+
+    Args:
+        serialize_trajectory (Dict): columnar trajectory
+        field (str): field name
+        dtype (np.dtype): dtype of the field
+        count (int): movement count
+        width (int, optional): values by movement. Defaults to 1.
+
+    Raises:
+        ModelException: the field is missing or its size does not match the movement count
+
+    Returns:
+        np.ndarray: field array, shape (count,) or (count, width)
+    """
+    buffer = serialize_trajectory.get(field)
+    if not isinstance(buffer, (bytes, bytearray, memoryview)):
+        raise ModelException(["PATH", "TRAJECTORY"],
+                             ModelExceptionType.PARSING_ERROR,
+                             f"the {field} field is missing or is not binary")
+    if len(buffer) != count * width * dtype.itemsize:
+        raise ModelException(["PATH", "TRAJECTORY"],
+                             ModelExceptionType.PARSING_ERROR,
+                             f"the {field} field has {len(buffer)} bytes, {count * width * dtype.itemsize} expected for {count} movements")
+    array = np.frombuffer(buffer, dtype)
+    return array.reshape(count, width) if width > 1 else array
+
+
+def _check_indexes(array: np.ndarray, size: int, field: str):
+    """function to check the enum indexes of a columnar trajectory field
+
+    Args:
+        array (np.ndarray): index array
+        size (int): enum size
+        field (str): field name
+
+    Raises:
+        ModelException: an index is out of the enum
+    """
+    invalid = (array < 0) | (array >= size)
+    if invalid.any():
+        raise ModelException(["PATH", "TRAJECTORY"],
+                             ModelExceptionType.PARSING_ERROR,
+                             f"the {field} index {int(array[invalid][0])} is out of range (0 to {size - 1})")
+
+
+class PathArray:
+
+    """Class used to represent the movements of a path as a structure of arrays,
+    one item (or row) by movement, no object is built by movement.
+
+    Attributes
+    ----------
+    vectors : np.ndarray
+        float64 N x 6, position vectors (x, y, z, w, p, r or j1 ... j6)
+    e1 : np.ndarray
+        int32, 7 axis positions
+    cnt : np.ndarray
+        int32, passing accuracies
+    speed : np.ndarray
+        int32, movement speeds
+    types : np.ndarray
+        uint8, movement types coded by index in MOVEMENT_TYPES
+    position_types : np.ndarray
+        uint8, position types coded by index in POSITION_TYPES
+    configs : np.ndarray
+        int8 N x 6, packed arm configurations (wrist, forearm, arm, j4, j5, j6)
+    """
+
+    __slots__ = ('__vectors', '__e1', '__cnt', '__speed', '__types', '__position_types', '__configs')
+
+    def __init__(self, vectors: np.ndarray,
+                 e1: np.ndarray,
+                 cnt: np.ndarray,
+                 speed: np.ndarray,
+                 types: np.ndarray,
+                 position_types: np.ndarray,
+                 configs: np.ndarray) -> 'PathArray':
+        """PathArray object initializer
+
+        Args:
+            vectors (np.ndarray): position vectors N x 6
+            e1 (np.ndarray): 7 axis positions
+            cnt (np.ndarray): passing accuracies
+            speed (np.ndarray): movement speeds
+            types (np.ndarray): movement type indexes
+            position_types (np.ndarray): position type indexes
+            configs (np.ndarray): packed arm configurations N x 6
+        """
+        self.__vectors: np.ndarray = vectors
+        self.__e1: np.ndarray = e1
+        self.__cnt: np.ndarray = cnt
+        self.__speed: np.ndarray = speed
+        self.__types: np.ndarray = types
+        self.__position_types: np.ndarray = position_types
+        self.__configs: np.ndarray = configs
+
+    def __len__(self) -> int:
+        return len(self.__e1)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self.__vectors
+
+    @property
+    def e1(self) -> np.ndarray:
+        return self.__e1
+
+    @property
+    def cnt(self) -> np.ndarray:
+        return self.__cnt
+
+    @property
+    def speed(self) -> np.ndarray:
+        return self.__speed
+
+    @property
+    def types(self) -> np.ndarray:
+        return self.__types
+
+    @property
+    def position_types(self) -> np.ndarray:
+        return self.__position_types
+
+    @property
+    def configs(self) -> np.ndarray:
+        return self.__configs
+
+    @staticmethod
+    def empty(count: int) -> 'PathArray':
+        return PathArray(np.zeros((count, 6), VECTOR_DTYPE),
+                         np.zeros(count, E1_DTYPE),
+                         np.zeros(count, CNT_DTYPE),
+                         np.zeros(count, SPEED_DTYPE),
+                         np.zeros(count, TYPE_DTYPE),
+                         np.zeros(count, TYPE_DTYPE),
+                         np.zeros((count, 6), CONFIG_DTYPE))
+
+    @staticmethod
+    def parse(serialize_movements: List[Dict]) -> 'PathArray':
+        """function to build a PathArray from a list of serialized movements
+           (movement documents format, see Movement.parse)
+
+        Args:
+            serialize_movements (List[Dict]): list of serialized movements
+
+        Raises:
+            ModelException: an e1, cnt or speed value is not an integer
+
+        Returns:
+            PathArray: movements arrays
+        """
+        path_array = PathArray.empty(len(serialize_movements))
+        e1, cnt, speed = [], [], []
+
+        for i, serialize_movement in enumerate(serialize_movements):
+            serialize_position = serialize_movement['position']
+            position_type = PositionType[serialize_position['type']]
+
+            if position_type is PositionType.JOINT:
+                keys = PositionJoint._VECTOR_KEYS
+            else:
+                keys = PositionCrt._VECTOR_KEYS
+                serialize_config = serialize_position['config']
+                path_array.__configs[i] = (WRIST_CONFIGS.index(WristConfig[serialize_config['wrist']]),
+                                           FOREARM_CONFIGS.index(ForeArmConfig[serialize_config['forearm']]),
+                                           ARM_CONFIGS.index(ArmConfig[serialize_config['arm']]),
+                                           serialize_config['j4'],
+                                           serialize_config['j5'],
+                                           serialize_config['j6'])
+
+            svector = serialize_position['vector']
+            path_array.__vectors[i] = [svector[key] for key in keys]
+            e1.append(serialize_position['e1'])
+            cnt.append(serialize_movement['cnt'])
+            speed.append(serialize_movement['speed'])
+            path_array.__types[i] = MOVEMENT_TYPES.index(MovementType[serialize_movement['type']])
+            path_array.__position_types[i] = POSITION_TYPES.index(position_type)
+
+        path_array.__set_integers(e1, cnt, speed)
+        return path_array
+
+    @staticmethod
+    def from_trajectory(serialize_trajectory: Dict) -> 'PathArray':
+        """function to build a PathArray from a columnar trajectory
+           the binary fields are read with np.frombuffer without copy
+
+        Args:
+            serialize_trajectory (Dict): columnar trajectory
+
+        Raises:
+            ModelException: a field size does not match the count or an index is out of range
+
+        Returns:
+            PathArray: movements arrays
+        """
+        count = serialize_trajectory.get('count')
+        if not isinstance(count, int) or isinstance(count, bool) or count < 0:
+            raise ModelException(["PATH", "TRAJECTORY"],
+                                 ModelExceptionType.PARSING_ERROR,
+                                 f"the trajectory count {count!r} is not a positive integer")
+
+        if serialize_trajectory.get('position_type') is not None:
+            position_types = _from_buffer(serialize_trajectory, 'position_type', TYPE_DTYPE, count)
+        else:
+            position_types = np.zeros(count, TYPE_DTYPE)
+        types = _from_buffer(serialize_trajectory, 'type', TYPE_DTYPE, count)
+        configs = _from_buffer(serialize_trajectory, 'config', CONFIG_DTYPE, count, 6)
+
+        _check_indexes(types, len(MOVEMENT_TYPES), 'type')
+        _check_indexes(position_types, len(POSITION_TYPES), 'position_type')
+        _check_indexes(configs[:, 0], len(WRIST_CONFIGS), 'wrist')
+        _check_indexes(configs[:, 1], len(FOREARM_CONFIGS), 'forearm')
+        _check_indexes(configs[:, 2], len(ARM_CONFIGS), 'arm')
+
+        return PathArray(_from_buffer(serialize_trajectory, 'vectors', VECTOR_DTYPE, count, 6),
+                         _from_buffer(serialize_trajectory, 'e1', E1_DTYPE, count),
+                         _from_buffer(serialize_trajectory, 'cnt', CNT_DTYPE, count),
+                         _from_buffer(serialize_trajectory, 'speed', SPEED_DTYPE, count),
+                         types,
+                         position_types,
+                         configs)
+
+    @staticmethod
+    def from_movements(movements: List[Movement]) -> 'PathArray':
+        """function to build a PathArray from a list of movement objects
+
+        Args:
+            movements (List[Movement]): list of movements
+
+        Raises:
+            ModelException: an e1, cnt or speed value is not an integer
+
+        Returns:
+            PathArray: movements arrays
+        """
+        path_array = PathArray.empty(len(movements))
+        e1, cnt, speed = [], [], []
+
+        for i, movement in enumerate(movements):
+            position = movement.position
+            config = position.config
+
+            if config is not None:
+                path_array.__configs[i] = (WRIST_CONFIGS.index(config.wrist),
+                                           FOREARM_CONFIGS.index(config.forearm),
+                                           ARM_CONFIGS.index(config.arm),
+                                           config.j4,
+                                           config.j5,
+                                           config.j6)
+
+            path_array.__vectors[i] = position.vector
+            e1.append(position.e1)
+            cnt.append(movement.cnt)
+            speed.append(movement.speed)
+            path_array.__types[i] = MOVEMENT_TYPES.index(MovementType[movement.type])
+            path_array.__position_types[i] = POSITION_TYPES.index(PositionType[position.type])
+
+        path_array.__set_integers(e1, cnt, speed)
+        return path_array
+
+    def __set_integers(self, e1: List, cnt: List, speed: List):
+        # the int32 arrays would truncate the decimal values
+        self.__e1[:] = _to_integers(e1, E1_DTYPE, 'e1')
+        self.__cnt[:] = _to_integers(cnt, CNT_DTYPE, 'cnt')
+        self.__speed[:] = _to_integers(speed, SPEED_DTYPE, 'speed')
+
+    def to_trajectory(self) -> Dict:
+        """function to build the columnar trajectory of the movements
+
+        Returns:
+            Dict: columnar trajectory
+        """
+        return {
+            'count': len(self),
+            'vectors': self.__vectors.astype(VECTOR_DTYPE, copy=False).tobytes(),
+            'e1': self.__e1.astype(E1_DTYPE, copy=False).tobytes(),
+            'config': self.__configs.astype(CONFIG_DTYPE, copy=False).tobytes(),
+            'cnt': self.__cnt.astype(CNT_DTYPE, copy=False).tobytes(),
+            'speed': self.__speed.astype(SPEED_DTYPE, copy=False).tobytes(),
+            'type': self.__types.astype(TYPE_DTYPE, copy=False).tobytes(),
+            'position_type': self.__position_types.astype(TYPE_DTYPE, copy=False).tobytes()
+        }
+
+    def to_movements(self) -> List[Movement]:
+        """function to build the movement objects, one by row
+
+        Returns:
+            List[Movement]: list of movements
+        """
+        e1 = self.__e1.tolist()
+        configs = self.__configs.tolist()
+        cnt = self.__cnt.tolist()
+        speed = self.__speed.tolist()
+        types = self.__types.tolist()
+        position_types = self.__position_types.tolist()
+
+        movements = []
+        for i in range(len(self)):
+            if POSITION_TYPES[position_types[i]] is PositionType.JOINT:
+                position = PositionJoint(self.__vectors[i], e1[i])
+            else:
+                position = PositionCrt(self.__vectors[i], e1[i], self.__get_configuration(configs[i]))
+
+            movements.append(Movement(cnt[i], speed[i], MOVEMENT_TYPES[types[i]], position))
+
+        return movements
+
+    def window(self, start: int, stop: int) -> 'PathArray':
+        """function to get the movements of a range, the arrays are views on the path arrays
+
+        Args:
+            start (int): index of the first movement
+            stop (int): index after the last movement
+
+        Returns:
+            PathArray: movements of the range
+        """
+        return PathArray(self.__vectors[start:stop],
+                         self.__e1[start:stop],
+                         self.__cnt[start:stop],
+                         self.__speed[start:stop],
+                         self.__types[start:stop],
+                         self.__position_types[start:stop],
+                         self.__configs[start:stop])
+
+    def windows(self, size: int) -> Iterator['PathArray']:
+        """function to split the movements in consecutive windows of size movements at most
+
+        Args:
+            size (int): max number of movements by window
+
+        Yields:
+            PathArray: movements of a window
+        """
+        for start in range(0, len(self), size):
+            yield self.window(start, start + size)
+
+    def estimate_duration(self) -> float:
+        """function to estimate the duration of the movements : length of the linear and circular
+           movements between cartesian positions over their speed (mm/s)
+           the joint movements and the first movement (start position unknown) are not counted
+
+        Returns:
+            float: expected duration in seconds
+        """
+        cartesian = self.__position_types == POSITION_TYPES.index(PositionType.CARTESIAN)
+        # movements from a cartesian position to a cartesian position with a speed in mm/s
+        counted = cartesian[1:] & cartesian[:-1] & (self.__types[1:] != MOVEMENT_TYPES.index(MovementType.JOINT))\
+                  & (self.__speed[1:] > 0)
+        if not counted.any():
+            return 0.0
+
+        lengths = np.linalg.norm(np.diff(self.__vectors[:, :3], axis=0), axis=1)
+        return float(np.sum(lengths[counted] / self.__speed[1:][counted]))
+
+    def position_runs(self) -> Iterator[Tuple[PositionType, int, int]]:
+        """function to split the movements in runs of consecutive positions of the same type
+
+        Yields:
+            Tuple[PositionType, int, int]: position type, index of the first and after the last movement of the run
+        """
+        count = len(self)
+        if count == 0:
+            return
+
+        # indexes where the position type changes
+        changes = np.flatnonzero(np.diff(self.__position_types)) + 1
+        bounds = [0] + changes.tolist() + [count]
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            yield POSITION_TYPES[self.__position_types[start]], start, stop
+
+    def positions_to_cmd_data(self, start: int = 0, stop: int = None) -> List[Dict]:
+        """function to build the command data of a range of positions
+           identical to Position.to_cmd_data
+
+        Args:
+            start (int, optional): index of the first position. Defaults to 0.
+            stop (int, optional): index after the last position. Defaults to the number of movements.
+
+        Returns:
+            List[Dict]: list of positions command data
+        """
+        stop = len(self) if stop is None else stop
+
+        # all the coordinates of the range rounded at once
+        vectors = round_vectors(self.__vectors[start:stop])
+        e1 = self.__e1[start:stop].tolist()
+        configs = self.__configs[start:stop].tolist()
+        position_types = self.__position_types[start:stop].tolist()
+
+        positions = []
+        for vector, e, config, position_type in zip(vectors, e1, configs, position_types):
+            position_type = POSITION_TYPES[position_type]
+
+            if position_type is PositionType.JOINT:
+                keys = PositionJoint._VECTOR_KEYS
+                cmd_config = None
+            else:
+                keys = PositionCrt._VECTOR_KEYS
+                # command data shared by the identical configurations
+                cmd_config = self.__get_configuration(config).to_cmd_data()
+
+            positions.append({
+                "ut": 0,
+                "uf": 0,
+                "type": position_type.value,
+                "e1": e,
+                "vector": dict(zip(keys, vector)),
+                "config": cmd_config
+            })
+
+        return positions
+
+    def to_dict(self) -> List[Dict]:
+        """function to build the serialized movements, identical to Movement.to_dict
+
+        Returns:
+            List[Dict]: list of serialized movements
+        """
+        vectors = round_vectors(self.__vectors)
+        e1 = self.__e1.tolist()
+        configs = self.__configs.tolist()
+        cnt = self.__cnt.tolist()
+        speed = self.__speed.tolist()
+        types = self.__types.tolist()
+        position_types = self.__position_types.tolist()
+
+        movements = []
+        for i, vector in enumerate(vectors):
+            position_type = POSITION_TYPES[position_types[i]]
+
+            if position_type is PositionType.JOINT:
+                keys = PositionJoint._VECTOR_KEYS
+                config = None
+            else:
+                keys = PositionCrt._VECTOR_KEYS
+                config = self.__get_configuration(configs[i]).to_dict()
+
+            movements.append({
+                "cnt": cnt[i],
+                "speed": speed[i],
+                "position": {
+                    "ut": 0,
+                    "uf": 0,
+                    "type": position_type.name,
+                    "e1": e1[i],
+                    "vector": dict(zip(keys, vector)),
+                    "config": config
+                },
+                "type": MOVEMENT_TYPES[types[i]].name
+            })
+
+        return movements
+
+    @staticmethod
+    def __get_configuration(config: List[int]) -> Configuration:
+        # shared configuration of a packed configuration row
+        wrist, forearm, arm, j4, j5, j6 = config
+        return Configuration.intern(WRIST_CONFIGS[wrist],
+                                    FOREARM_CONFIGS[forearm],
+                                    ARM_CONFIGS[arm],
+                                    j4, j5, j6)
+
+    def parameters_to_cmd_data(self) -> List[Dict]:
+        """function to build the command data of the movements parameters
+           identical to the parameters of Movement.to_cmd_data
+
+        Returns:
+            List[Dict]: list of movements parameters
+        """
+        return [get_parameters_cmd_data(cnt, speed, MOVEMENT_TYPES[mvt_type])
+                for cnt, speed, mvt_type in zip(self.__cnt.tolist(),
+                                                self.__speed.tolist(),
+                                                self.__types.tolist())]
+
+
+def decode_trajectory(serialize_trajectory: Dict) -> List[Movement]:
+    """function to build the movements of a path from a columnar trajectory
+       each position vector is a view on the vectors buffer
+
+    Args:
+        serialize_trajectory (Dict): columnar trajectory
+
+    Returns:
+        List[Movement]: list of movements
+    """
+    return PathArray.from_trajectory(serialize_trajectory).to_movements()
+
+
+def encode_trajectory(serialize_movements: List[Dict]) -> Dict:
+    """function to build a columnar trajectory from a list of serialized movements
+       (movement documents format, see Movement.parse)
+
+    Args:
+        serialize_movements (List[Dict]): list of serialized movements
+
+    Returns:
+        Dict: columnar trajectory
+    """
+    return PathArray.parse(serialize_movements).to_trajectory()
@@ -0,0 +1,175 @@
+import hashlib
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from itertools import count
+from threading import Lock
+from typing import Dict, Hashable, Iterator, List, Tuple
+from uuid import uuid4
+
+from exceptions import BaseException, BaseExceptionType
+
+DEFAULT_BATCH_SIZE = 256
+
+# scope of the deterministic uids (see uid_scope)
+__SCOPE:ContextVar = ContextVar('uid_scope', default=None)
+
+def _format_uid(data:bytes) -> str:
+  # uuid version 4 string (8-4-4-4-12) from 16 bytes, same result as str(UUID(bytes=data, version=4))
+  h = data.hex()
+  return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
+
+class UidGenerator:
+  """generator of command and tracker uids
+  """
+  def new(self, content:Hashable=None) -> str:
+    """function to get a new uid
+
+    Args:
+        content (Hashable, optional): content identifying the uid owner, used by the deterministic strategy
+
+    Returns:
+        str: uid
+    """
+    raise NotImplementedError
+
+class RandomUidGenerator(UidGenerator):
+  """a uuid4 by uid, one entropy read by uid
+  """
+  def new(self, content:Hashable=None) -> str:
+    return str(uuid4())
+
+class BatchedRandomUidGenerator(UidGenerator):
+  """random uuid4 uids, the random bytes of batch_size uids are read at once
+  """
+  def __init__(self, batch_size:int=DEFAULT_BATCH_SIZE):
+    self.__batch_size:int = batch_size
+    self.__uids:List[str] = []
+    self.__lock = Lock()
+
+  def new(self, content:Hashable=None) -> str:
+    with self.__lock:
+      if not self.__uids:
+        data = os.urandom(16 * self.__batch_size)
+        self.__uids = [_format_uid(data[i:i + 16]) for i in range(0, len(data), 16)]
+      return self.__uids.pop()
+
+class CounterUidGenerator(UidGenerator):
+  """uids made of a random prefix by process and a counter
+     the prefix is drawn again in a forked process
+  """
+  def __init__(self):
+    self.__pid:int = None
+    self.__prefix:str = None
+    self.__counter:Iterator[int] = None
+    self.__lock = Lock()
+
+  def new(self, content:Hashable=None) -> str:
+    with self.__lock:
+      if self.__pid != os.getpid():
+        self.__pid = os.getpid()
+        self.__prefix = uuid4().hex[:20]
+        self.__counter = count()
+      value = next(self.__counter)
+
+    prefix = self.__prefix
+    return f"{prefix[:8]}-{prefix[8:12]}-{prefix[12:16]}-{prefix[16:20]}-{value:012x}"
+
+class DeterministicUidGenerator(UidGenerator):
+  """uids derived from the content of the uid owner and from the current uid scope
+     (ex: the action id and the action document hash), the same document always gives the same uids
+     the identical contents of a scope are distinguished by their occurrence number
+     out of a scope, the uids are random
+  """
+  def __init__(self, seed:str=''):
+    # hash key limited to 64 bytes
+    self.__seed:bytes = hashlib.blake2b(seed.encode(), digest_size=32).digest() if seed else b''
+
+  def new(self, content:Hashable=None) -> str:
+    scope = _get_scope()
+    if scope is None:
+      return str(uuid4())
+
+    key, occurrences = scope
+    occurrence = occurrences.get(content, 0)
+    occurrences[content] = occurrence + 1
+
+    digest = hashlib.blake2b(repr((key, content, occurrence)).encode(),
+                             digest_size=16,
+                             key=self.__seed).digest()
+    return _format_uid(digest)
+
+class UidStrategy(Enum):
+  RANDOM = RandomUidGenerator
+  BATCHED = BatchedRandomUidGenerator
+  COUNTER = CounterUidGenerator
+  DETERMINISTIC = DeterministicUidGenerator
+
+UID_GENERATOR:UidGenerator = RandomUidGenerator()
+
+def _get_scope() -> Tuple[Hashable, Dict]:
+  return __SCOPE.get()
+
+@contextmanager
+def uid_scope(key:Hashable):
+  """context manager defining the scope of the deterministic uids
+
+  Args:
+      key (Hashable): scope key (ex: action id and document hash)
+  """
+  token = __SCOPE.set((key, {}))
+  try:
+    yield
+  finally:
+    __SCOPE.reset(token)
+
+def new_uid(content:Hashable=None) -> str:
+  """function to get a new uid from the configured uid generator
+
+  Args:
+      content (Hashable, optional): content identifying the uid owner
+
+  Returns:
+      str: uid
+  """
+  return UID_GENERATOR.new(content)
+
+def set_uid_generator(generator:UidGenerator):
+  global UID_GENERATOR
+  UID_GENERATOR = generator
+
+def build_uid_generator(uid_config:Dict) -> UidGenerator:
+  """function to build the uid generator from a configuration
+     uid_config can contains following keys:
+     - strategy : RANDOM (default), BATCHED, COUNTER or DETERMINISTIC
+     - batch_size : number of uids drawn at once (BATCHED)
+     - seed : key of the uid hash (DETERMINISTIC)
+
+  Args:
+      uid_config (Dict): uid configuration
+
+  Raises:
+      BaseException
+
+  Returns:
+      UidGenerator: uid generator
+  """
+  strategy = str(uid_config.get('strategy', 'RANDOM')).upper()
+  try:
+    generator_class = UidStrategy[strategy].value
+  except KeyError:
+    raise BaseException(['UID'],
+                        BaseExceptionType.CONFIG_NOT_CONFORM,
+                        f"the uid strategy {strategy} is not supported")
+
+  try:
+    if generator_class is BatchedRandomUidGenerator:
+      return BatchedRandomUidGenerator(int(uid_config.get('batch_size', DEFAULT_BATCH_SIZE)))
+    if generator_class is DeterministicUidGenerator:
+      return DeterministicUidGenerator(str(uid_config.get('seed', '')))
+    return generator_class()
+  except (TypeError, ValueError) as error:
+    raise BaseException(['UID'],
+                        BaseExceptionType.CONFIG_NOT_CONFORM,
+                        f"uid configuration not conform : {error}")
@@ -0,0 +1,252 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+from bson.raw_bson import RawBSONDocument
+from utils import get_config_from_file
+from exceptions import BaseException, BaseExceptionType
+from db.functions import build_driver
+import bson
+import json
+import logging
+import argparse
+import os
+import sys
+import time
+import model
+from model.action import ACTION_PROJECTION, Action
+from model.exceptions import ModelException
+from model.uid import build_uid_generator, set_uid_generator
+from mars.proxy import build_tracking_policy, set_tracking_policy
+import mars
+
+__MARS_CONFIG_FILE = './config/mars.yaml'
+
+# number of documents sent to a worker in one task
+__DEFAULT_CHUNK_SIZE = 64
+LOGGER = logging.getLogger("cmd_precompiler")
+
+def init_worker(uid_config:Dict, tracking_config:Dict):
+  # the workers only need the environment enumerations, the command register, the uid strategy
+  # and the tracking policy, the documents are sent by the main process
+  set_uid_generator(build_uid_generator(uid_config))
+  set_tracking_policy(build_tracking_policy(tracking_config))
+  # the templates contain the tracker settings
+  mars.COMMAND_TEMPLATES.clear()
+  model.EQUIPMENT = mars.EQUIPMENT
+  model.REFERENCE = mars.REFERENCE
+  model.COMMAND_REGISTER = mars.COMMAND_REGISTER
+  model.COMMAND_TRANSLATORS = mars.COMMAND_TRANSLATORS
+
+def compile_documents(raw_documents:List[bytes]) -> List[Tuple[str, List[Dict]]]:
+  """function run by the workers to generate the commands of a chunk of documents
+
+  Args:
+      raw_documents (List[bytes]): action documents under bson format
+
+  Returns:
+      List[Tuple[str, List[Dict]]]: list of (action id, commands), commands is None if the action is not valid
+  """
+  results = []
+  for raw in raw_documents:
+    document = RawBSONDocument(raw)
+    try:
+      action = Action.parse(document)
+      commands = action.get_commands() if action else None
+    except ModelException as error:
+      LOGGER.warning(f"action {document['_id']} not compiled : {error.describe()}")
+      commands = None
+    except Exception as error:
+      # an unexpected failure on one action must not abort the whole run, the action is counted invalid
+      LOGGER.warning(f"action {document['_id']} not compiled : {error!r}")
+      commands = None
+    results.append((str(document['_id']), commands))
+  return results
+
+def chunk_documents(documents:Iterable[Dict], chunk_size:int) -> Iterator[List[bytes]]:
+  """function to group the documents streamed from the database in chunks of bson documents
+
+  Args:
+      documents (Iterable[Dict]): documents
+      chunk_size (int): number of documents by chunk
+
+  Yields:
+      List[bytes]: chunk of documents under bson format
+  """
+  chunk = []
+  for document in documents:
+    raw = getattr(document, 'raw', None)
+    chunk.append(raw if raw is not None else bson.encode(document))
+    if len(chunk) == chunk_size:
+      yield chunk
+      chunk = []
+  if chunk:
+    yield chunk
+
+class OutputWriter:
+  """write the command sets in a ndjson file (one json object by line)
+     or in a bson file (bson documents one after the other)
+  """
+  def __init__(self, file_path:str, output_format:str):
+    self.__format = output_format
+    self.__file = open(file_path, 'wb')
+
+  def write(self, action_id:str, commands:List[Dict]):
+    result = {"uid": action_id, "commands": commands}
+    if self.__format == 'bson':
+      self.__file.write(bson.encode(result))
+    else:
+      self.__file.write(json.dumps(result).encode() + b'\n')
+
+  def close(self):
+    self.__file.close()
+
+def precompile(db_config:Dict,
+               output_file:str,
+               output_format:str='ndjson',
+               workers:int=None,
+               chunk_size:int=__DEFAULT_CHUNK_SIZE,
+               max_in_flight:int=None,
+               uid_config:Dict=None,
+               tracking_config:Dict=None) -> Dict:
+  """function to generate the commands of all the actions of the configured collection
+     the documents are streamed with a server side cursor and the generation is distributed
+     on a process pool, the number of chunks in progress is bounded to keep a flat memory use
+
+  Args:
+      db_config (Dict): database configuration
+      output_file (str): path of the output file
+      output_format (str, optional): ndjson or bson. Defaults to 'ndjson'.
+      workers (int, optional): number of processes. Defaults to the number of cpu.
+      chunk_size (int, optional): number of documents by task. Defaults to 64.
+      max_in_flight (int, optional): max number of tasks in progress. Defaults to 2 x workers.
+      uid_config (Dict, optional): uid generation configuration. Defaults to random uids.
+      tracking_config (Dict, optional): tracking configuration. Defaults to fixed interval trackers.
+
+  Raises:
+      BaseException
+
+  Returns:
+      Dict: statistics (actions, invalid, duration, throughput)
+  """
+  workers = workers or os.cpu_count()
+  max_in_flight = max_in_flight or 2 * workers
+
+  # build the database driver without cache, preload or command store
+  driver_config = {key:value for key, value in db_config.items()
+                   if key not in ('cache', 'preload', 'command_store')}
+  driver = build_driver(driver_config)
+  if not hasattr(driver, 'find_all'):
+    raise BaseException(['PRECOMPILE', 'DBDRIVER'],
+                        BaseExceptionType.CONFIG_NOT_CONFORM,
+                        f"the database type {db_config.get('type')} can not stream the collection")
+
+  # stream the documents (server side cursor for mongodb)
+  documents = driver.find_all(ACTION_PROJECTION)
+
+  writer = OutputWriter(output_file, output_format)
+  actions = 0
+  invalid = 0
+  start = time.monotonic()
+
+  try:
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=init_worker,
+                             initargs=(uid_config or {}, tracking_config or {})) as executor:
+      in_flight:Set[Future] = set()
+
+      def write_results(done:Set[Future]):
+        nonlocal actions, invalid
+        for future in done:
+          for action_id, commands in future.result():
+            if commands is None:
+              invalid += 1
+            else:
+              writer.write(action_id, commands)
+              actions += 1
+
+      for chunk in chunk_documents(documents, chunk_size):
+        # wait for a task end if too many tasks are in progress
+        if len(in_flight) >= max_in_flight:
+          done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+          write_results(done)
+          LOGGER.debug(f"{actions} actions precompiled")
+
+        in_flight.add(executor.submit(compile_documents, chunk))
+
+      done, _ = wait(in_flight)
+      write_results(done)
+  finally:
+    # the sets already generated are written even if the run is interrupted
+    writer.close()
+
+  duration = time.monotonic() - start
+
+  return {
+    "actions": actions,
+    "invalid": invalid,
+    "duration": duration,
+    "throughput": actions / duration if duration > 0 else 0
+  }
+
+if __name__ == '__main__':
+  LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+  try:
+    parser = argparse.ArgumentParser(description="precompile the commands of all the actions of the configured collection")
+    parser.add_argument('-v', "--verbose", action='store_true')
+    parser.add_argument('--environment-config',
+                        type=str,
+                        default=__MARS_CONFIG_FILE,
+                        help='path of environment configuration yaml file')
+    parser.add_argument('-o', '--output',
+                        type=str,
+                        required=True,
+                        help='path of the output file')
+    parser.add_argument('-f', '--format',
+                        type=str,
+                        choices=['ndjson', 'bson'],
+                        default='ndjson',
+                        help='format of the output file')
+    parser.add_argument('-w', '--workers',
+                        type=int,
+                        default=None,
+                        help='number of worker processes, default number of cpu')
+    parser.add_argument('--chunk-size',
+                        type=int,
+                        default=__DEFAULT_CHUNK_SIZE,
+                        help='number of actions by worker task')
+    parser.add_argument('--max-in-flight',
+                        type=int,
+                        default=None,
+                        help='max number of worker tasks in progress, default 2 x workers')
+    args = parser.parse_args()
+
+    if args.verbose:
+      logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+    else:
+      logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+    LOGGER.info("load configurations")
+    environment_config = get_config_from_file(args.environment_config)
+
+    LOGGER.info("run commands precompilation")
+    statistics = precompile(environment_config['database'],
+                            args.output,
+                            args.format,
+                            args.workers,
+                            args.chunk_size,
+                            args.max_in_flight,
+                            environment_config.get('uid'),
+                            environment_config.get('tracking'))
+
+    LOGGER.info(f"{statistics['actions']} actions precompiled in {statistics['duration']:.1f} s "
+                f"({statistics['throughput']:.0f} actions/s), {statistics['invalid']} invalid actions")
+
+  except BaseException as error:
+    LOGGER.fatal(error.describe())
+    sys.exit(1)
+  except KeyError as error:
+    LOGGER.fatal(f"the configuration parameter {error.args[0]} is missing")
+    sys.exit(1)
+  except KeyboardInterrupt as error:
+    LOGGER.info("manual interruption of the program")
+    sys.exit(1)
@@ -0,0 +1,50 @@
+import os
+import sys
+
+# the modules are imported from the repository root (python command_generator.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def make_movement():
+    """factory of movement documents (see Movement.parse)"""
+    def make_movement(x=0.0, y=0.0, z=0.0, speed=50, cnt=100, type='LINEAR', e1=0, joint=False):
+        if joint:
+            position = {'type': 'JOINT', 'e1': e1,
+                        'vector': {'j1': x, 'j2': y, 'j3': z, 'j4': 0.0, 'j5': 0.0, 'j6': 0.0}}
+        else:
+            position = {'type': 'CARTESIAN', 'e1': e1,
+                        'vector': {'x': x, 'y': y, 'z': z, 'w': 0.0, 'p': 0.0, 'r': 0.0},
+                        'config': {'wrist': 'NOFLIP', 'forearm': 'UP', 'arm': 'TOWARD', 'j4': 0, 'j5': 0, 'j6': 0}}
+        return {'cnt': cnt, 'speed': speed, 'type': type, 'position': position}
+    return make_movement
+
+
+@pytest.fixture
+def environment(monkeypatch):
+    """factory of the mars environment on a memory database, the model globals are restored after the test"""
+    import mars
+    import model
+
+    def environment(documents, driver=None):
+        config = {'database': {'type': 'MEMORY', 'documents': documents}}
+        equipment, reference, register, memory_driver, store = mars.build_environment(config)
+        monkeypatch.setattr(model, 'EQUIPMENT', equipment)
+        monkeypatch.setattr(model, 'REFERENCE', reference)
+        monkeypatch.setattr(model, 'COMMAND_REGISTER', register)
+        monkeypatch.setattr(model, 'DB_DRIVER', driver or memory_driver)
+        monkeypatch.setattr(model, 'COMMAND_STORE', store)
+        monkeypatch.setattr(model, 'COMMAND_TRANSLATORS', mars.COMMAND_TRANSLATORS)
+        return model.DB_DRIVER
+    return environment
+
+
+@pytest.fixture
+def make_drilling():
+    """factory of drilling action documents"""
+    def make_drilling(id, speed=1000, feed=20, **fields):
+        return {'_id': id, 'type': 'WORK.DRILL', 'description': f'drilling {id}',
+                'definition': {'speed': speed, 'feed': feed, 'peak': False}, **fields}
+    return make_drilling
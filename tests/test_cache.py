@@ -0,0 +1,146 @@
+import itertools
+import time
+from db.cache import CachedDriver
+from db.memory import MemoryDriver
+
+
+class CountingDriver(MemoryDriver):
+    def __init__(self, documents):
+        self.queries = []
+        super().__init__(documents)
+
+    def find_by_id(self, id, projection=None):
+        self.queries.append([id])
+        return super().find_by_id(id, projection)
+
+    def find_by_ids(self, ids, projection=None):
+        self.queries.append(list(ids))
+        return super().find_by_ids(ids, projection)
+
+
+class PollingDriver:
+    """driver without watch function, the cache polls the documents"""
+    def __init__(self, documents):
+        self.documents = {document['_id']: document for document in documents}
+
+    def find_by_id(self, id, projection=None):
+        return self.documents.get(id)
+
+    def find_by_ids(self, ids, projection=None):
+        return [self.documents[id] for id in ids if id in self.documents]
+
+
+def _wait_for(condition):
+    for _ in range(100):
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_second_read_is_a_hit():
+    driver = CountingDriver([{'_id': 'a', 'value': 1}])
+    cache = CachedDriver(driver)
+
+    assert cache.find_by_id('a') == {'_id': 'a', 'value': 1}
+    assert cache.find_by_id('a') == {'_id': 'a', 'value': 1}
+
+    assert driver.queries == [['a']]
+    assert cache.statistics.to_dict() == {'hits': 1, 'misses': 1, 'evictions': 0, 'invalidations': 0}
+    cache.close()
+
+
+def test_document_is_served_only_for_its_projection():
+    driver = CountingDriver([{'_id': 'a', 'value': 1}])
+    cache = CachedDriver(driver)
+
+    cache.find_by_id('a', {'value': 1})
+    cache.find_by_id('a', {'_id': 1})
+
+    assert len(driver.queries) == 2
+    assert cache.statistics.misses == 2
+    cache.close()
+
+
+def test_only_the_missing_documents_are_requested():
+    driver = CountingDriver([{'_id': 'a'}, {'_id': 'b'}])
+    cache = CachedDriver(driver)
+    cache.find_by_id('a')
+
+    documents = cache.find_by_ids(['a', 'b', 'c'])
+
+    assert sorted(document['_id'] for document in documents) == ['a', 'b']
+    assert driver.queries == [['a'], ['b', 'c']]
+    cache.close()
+
+
+def test_expired_document_is_a_miss():
+    driver = CountingDriver([{'_id': 'a'}])
+    cache = CachedDriver(driver, ttl=-1)
+
+    cache.find_by_id('a')
+    cache.find_by_id('a')
+
+    assert len(driver.queries) == 2
+    assert cache.statistics.evictions == 1
+    cache.close()
+
+
+def test_least_recently_used_document_is_evicted():
+    driver = CountingDriver([{'_id': id} for id in 'abc'])
+    cache = CachedDriver(driver, max_entries=2)
+    cache.find_by_id('a')
+    cache.find_by_id('b')
+    # a is used => b is the least recently used document
+    cache.find_by_id('a')
+    cache.find_by_id('c')
+
+    assert len(cache) == 2
+    cache.find_by_id('a')
+    cache.find_by_id('b')
+    assert driver.queries == [['a'], ['b'], ['c'], ['b']]
+    cache.close()
+
+
+def test_modified_document_is_invalidated_by_the_watch():
+    driver = CountingDriver([{'_id': 'a', 'value': 0}])
+    cache = CachedDriver(driver, poll_interval=3600)
+
+    # the watch is opened by the invalidation thread, modify until a modification is followed
+    values = itertools.count(1)
+
+    def modified():
+        cache.find_by_id('a')
+        driver.update('a', {'value': next(values)})
+        return _wait_for(lambda: len(cache) == 0)
+
+    assert _wait_for(modified)
+    assert cache.find_by_id('a')['value'] == driver.find_by_id('a')['value']
+    assert cache.statistics.invalidations >= 1
+    cache.close()
+
+
+def test_modified_document_is_invalidated_by_the_polling():
+    driver = PollingDriver([{'_id': 'a', 'value': 1}])
+    cache = CachedDriver(driver, poll_interval=0.01)
+    cache.find_by_id('a')
+
+    driver.documents['a'] = {'_id': 'a', 'value': 2}
+
+    assert _wait_for(lambda: len(cache) == 0)
+    assert cache.find_by_id('a') == {'_id': 'a', 'value': 2}
+    cache.close()
+
+
+def test_document_fetched_during_an_invalidation_is_not_stored():
+    class InvalidatedDriver(PollingDriver):
+        def find_by_id(self, id, projection=None):
+            # modification notified while the document is read
+            cache.invalidate(id)
+            return super().find_by_id(id, projection)
+
+    cache = CachedDriver(InvalidatedDriver([{'_id': 'a'}]), poll_interval=3600)
+
+    assert cache.find_by_id('a') == {'_id': 'a'}
+    assert len(cache) == 0
+    cache.close()
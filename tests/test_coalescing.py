@@ -0,0 +1,70 @@
+from mars.proxy import (ConstantRegister, ProxyAction, ProxyCommand, ProxyMethod, RegisterType,
+                        WaitCommand, coalesce_writes, decode_register_write, run_program, Program)
+
+
+def write(start_register, values, register_type=RegisterType.NUMERIC_INT):
+    # register write built like the proxy builders (single or block path)
+    block = len(values) > 1
+    return ProxyCommand(ProxyAction.REQUEST,
+                        f"write {start_register}",
+                        ProxyMethod.PUT,
+                        register_type.base_path + ('/block' if block else '/single'),
+                        register_type.build_query(start_register, len(values)),
+                        {'data': register_type.build_body(values if block else values[0])})
+
+
+def writes(commands):
+    return [decode_register_write(command.definition) for command in commands]
+
+
+def test_contiguous_writes_are_merged_in_order():
+    commands = coalesce_writes([write(20, [1]), write(21, [2, 3]), write(23, [4])])
+
+    assert writes(commands) == [(RegisterType.NUMERIC_INT, 20, [1, 2, 3, 4])]
+    assert commands[0].description == "write 20 ; write 21 ; write 23"
+
+
+def test_single_write_is_kept():
+    command = write(20, [1])
+
+    assert coalesce_writes([command]) == [command]
+
+
+def test_not_contiguous_writes_are_not_merged():
+    commands = coalesce_writes([write(20, [1]), write(22, [2])])
+
+    assert writes(commands) == [(RegisterType.NUMERIC_INT, 20, [1]), (RegisterType.NUMERIC_INT, 22, [2])]
+
+
+def test_register_types_are_not_merged():
+    commands = coalesce_writes([write(20, [1]), write(21, [2.5], RegisterType.NUMERIC_FLOAT)])
+
+    assert [write[0] for write in writes(commands)] == [RegisterType.NUMERIC_INT, RegisterType.NUMERIC_FLOAT]
+
+
+def test_write_limit_is_respected():
+    limit = RegisterType.NUMERIC_INT.write_limit
+    commands = coalesce_writes([write(20 + k, [k]) for k in range(limit + 5)])
+
+    assert [len(write[2]) for write in writes(commands)] == [limit, 5]
+    assert writes(commands)[1][1] == 20 + limit
+
+
+def test_program_launch_is_never_merged():
+    commands = coalesce_writes([write(ConstantRegister.PROGRAM, [Program.TRAJ_GEN.value]), write(2, [1])])
+
+    assert len(commands) == 2
+
+
+def test_order_with_launch_tracker_and_wait_is_kept():
+    launch = run_program(Program.TRAJ_GEN)
+    commands = [write(20, [1]), write(21, [2])] + launch + [write(22, [3])]
+
+    result = coalesce_writes(commands)
+
+    # the launch writes the program register, not contiguous with the parameters
+    assert writes(result[:2]) == [(RegisterType.NUMERIC_INT, 20, [1, 2]),
+                                  (RegisterType.NUMERIC_INT, ConstantRegister.PROGRAM, [Program.TRAJ_GEN.value])]
+    assert result[2:4] == launch[1:]
+    assert isinstance(result[3], WaitCommand)
+    assert writes(result[4:]) == [(RegisterType.NUMERIC_INT, 22, [3])]
@@ -0,0 +1,123 @@
+import json
+import time
+import pytest
+from db.command_cache import DiskCommandCache
+from db.exceptions import DBDriverException
+from db.memory import MemoryDriver
+
+COMMANDS = [{'uid': 'a', 'target': 'PROXY', 'definition': {'uid': 'b'}}]
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'cache' / 'commands.sqlite')
+
+
+def test_set_is_served_for_the_same_document_hash(cache_path):
+    cache = DiskCommandCache(cache_path)
+    cache.save('action', 'hash', COMMANDS)
+
+    assert cache.find('action', 'hash') == COMMANDS
+    assert cache.find('action', 'other hash') is None
+    assert cache.find('other action', 'hash') is None
+
+
+def test_set_survives_a_restart_only_for_the_same_version(cache_path):
+    cache = DiskCommandCache(cache_path, version='1')
+    cache.save('action', 'hash', COMMANDS)
+    cache.close()
+
+    assert DiskCommandCache(cache_path, version='1').find('action', 'hash') == COMMANDS
+    assert DiskCommandCache(cache_path, version='2').find('action', 'hash') is None
+
+
+def test_expired_set_is_not_served(cache_path):
+    cache = DiskCommandCache(cache_path, ttl=-1)
+    cache.save('action', 'hash', COMMANDS)
+
+    assert cache.find('action', 'hash') is None
+
+
+def test_least_recently_used_sets_are_evicted(cache_path):
+    commands = [{'uid': 'x' * 80}]
+    # room for 3 sets
+    size = len(json.dumps(commands))
+    cache = DiskCommandCache(cache_path, max_size=3 * size)
+    for action in ('a', 'b', 'c'):
+        cache.save(action, 'hash', commands)
+    # a is used => b is the least recently used set
+    cache.find('a', 'hash')
+    cache.save('d', 'hash', commands)
+
+    assert cache.size == 3 * size
+    assert cache.find('b', 'hash') is None
+    assert cache.find('a', 'hash') == commands
+    assert cache.find('d', 'hash') == commands
+
+
+def test_modified_action_is_invalidated(cache_path):
+    driver = MemoryDriver([{'_id': 'action', 'type': 'WORK.DRILL', 'definition': {}}])
+    cache = DiskCommandCache(cache_path, driver=driver)
+    cache.save('action', 'hash', COMMANDS)
+
+    driver.update('action', {'definition': {'speed': 1}})
+
+    # the invalidation thread follows the modifications
+    for _ in range(100):
+        if len(cache) == 0:
+            break
+        time.sleep(0.01)
+    assert len(cache) == 0
+    cache.close()
+
+
+def _wait_for(condition):
+    for _ in range(100):
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_set_is_served_by_id_only_while_the_modifications_are_followed(cache_path):
+    DiskCommandCache(cache_path).save('before', 'hash', COMMANDS)
+    driver = MemoryDriver([{'_id': 'action', 'type': 'WORK.DRILL', 'definition': {}}])
+    cache = DiskCommandCache(cache_path, driver=driver)
+    assert _wait_for(lambda: cache.watching)
+    cache.save('action', 'hash', COMMANDS)
+
+    assert cache.find('action') == COMMANDS
+    # stored before the follow => the modifications may be missed
+    assert cache.find('before') is None
+    assert cache.find('before', 'hash') == COMMANDS
+    assert DiskCommandCache(cache_path).find('action') is None
+    cache.close()
+
+
+def test_set_generated_from_a_modified_document_is_not_stored(cache_path):
+    driver = MemoryDriver([{'_id': 'action', 'type': 'WORK.DRILL', 'definition': {}}])
+    cache = DiskCommandCache(cache_path, driver=driver)
+    assert _wait_for(lambda: cache.watching)
+    cache.save('action', 'old hash', COMMANDS)
+
+    read_at = time.time()
+    driver.update('action', {'definition': {'speed': 1}})
+    assert _wait_for(lambda: len(cache) == 0)
+    cache.save('action', 'old hash', COMMANDS, read_at)
+
+    assert cache.find('action') is None
+    cache.save('action', 'new hash', COMMANDS, time.time())
+    assert cache.find('action') == COMMANDS
+    cache.close()
+
+
+def test_not_reachable_file_raises(tmp_path):
+    (tmp_path / 'file').write_text('')
+
+    with pytest.raises(DBDriverException):
+        DiskCommandCache(str(tmp_path / 'file' / 'commands.sqlite'))
+
+
+def test_build_from_config_requires_the_path():
+    with pytest.raises(DBDriverException):
+        DiskCommandCache.build_from_config({'ttl': 10})
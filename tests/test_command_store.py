@@ -0,0 +1,76 @@
+from db.command_store import MemoryCommandStore
+from model.action import Action
+
+COMMANDS = [{'uid': 'a'}]
+
+
+def test_pending_set_is_served_before_the_write():
+    store = MemoryCommandStore(flush_interval=60)
+    store.save('action', 'hash', COMMANDS)
+
+    assert store.find('action', 'hash') == COMMANDS
+    store.close()
+
+
+def test_close_writes_the_queued_sets():
+    store = MemoryCommandStore(batch_size=1000, flush_interval=60)
+    for n in range(10):
+        store.save(f'action {n}', 'hash', COMMANDS)
+
+    store.close()
+
+    assert all(store._read(f':action {n}:hash') == COMMANDS for n in range(10))
+
+
+def test_set_is_served_for_the_same_version_and_hash():
+    store = MemoryCommandStore(version='1')
+    store.save('action', 'hash', COMMANDS)
+    store.close()
+
+    assert store.find('action', 'hash') == COMMANDS
+    assert store.find('action', 'other hash') is None
+    assert store._read('2:action:hash') is None
+    assert store.version == '1'
+
+
+class CountingStore(MemoryCommandStore):
+    def __init__(self, **kwargs):
+        self.reads = 0
+        self.batch_reads = 0
+        super().__init__(**kwargs)
+
+    def _read(self, key):
+        self.reads += 1
+        return super()._read(key)
+
+    def _read_many(self, keys):
+        self.batch_reads += 1
+        return super()._read_many(keys)
+
+
+def test_batch_is_read_in_one_request():
+    store = CountingStore(flush_interval=60)
+    store._write([(':written:hash', 'written', 'hash', COMMANDS)])
+    store.save('pending', 'hash', COMMANDS)
+
+    found = store.find_many([('written', 'hash'), ('pending', 'hash'), ('missing', 'hash')])
+    store.close()
+
+    assert found == [COMMANDS, COMMANDS, None]
+    assert store.batch_reads == 1
+    assert store.reads == 0
+
+
+def test_stored_sets_of_a_batch_are_loaded_once(environment, make_drilling, monkeypatch):
+    import model
+    environment([make_drilling(f'drill {n}') for n in range(5)])
+    store = CountingStore()
+    monkeypatch.setattr(model, 'COMMAND_STORE', store)
+
+    generated = [action.get_commands() for action in Action.get_many_from_db([f'drill {n}' for n in range(5)])]
+    store.close()
+    served = [action.get_commands() for action in Action.get_many_from_db([f'drill {n}' for n in range(5)])]
+
+    assert store.batch_reads == 2
+    assert store.reads == 0
+    assert [len(commands) for commands in served] == [len(commands) for commands in generated]
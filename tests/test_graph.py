@@ -0,0 +1,100 @@
+import pytest
+from bson import ObjectId
+from db.mongodb import MongoDriver, _build_graph_pipeline, _get_graph_frontier
+from model.action import GRAPH_FIELDS, Action, _sort_topologically
+from model.exceptions import ModelException, ModelExceptionType
+
+IDS = [str(ObjectId()) for _ in range(5)]
+
+
+def action(id, next=(), dependencies=()):
+    return {'_id': id, 'next': list(next), 'dependencies': list(dependencies)}
+
+
+class GraphCollection:
+    """collection evaluating the graph pipeline : start documents and $graphLookup closure of each field"""
+    def __init__(self, documents):
+        self.documents = {str(document['_id']): document for document in documents}
+        self.aggregations = 0
+
+    def aggregate(self, pipeline):
+        self.aggregations += 1
+        start_ids = [str(id) for id in pipeline[0]['$match']['_id']['$in']]
+        found = {id: self.documents[id] for id in start_ids if id in self.documents}
+        for stage in pipeline[1:]:
+            lookup = stage.get('$graphLookup')
+            if lookup is None:
+                continue
+            field = lookup['connectFromField']
+            reached = {}
+            level = [linked for id in start_ids if id in self.documents
+                     for linked in self.documents[id].get(field, [])]
+            while level:
+                level = [id for id in level if id in self.documents and id not in reached]
+                reached.update((id, self.documents[id]) for id in level)
+                level = [linked for id in level for linked in self.documents[id].get(field, [])]
+            for id, document in reached.items():
+                found.setdefault(id, document)
+        return list(found.values())
+
+
+def test_actions_are_sorted_in_execution_order():
+    documents = [action('b', next=['c']), action('c'), action('a', next=['b']), action('d', dependencies=['c'])]
+
+    assert [document['_id'] for document in _sort_topologically(documents)] == ['a', 'b', 'c', 'd']
+
+
+def test_cycle_raises_a_model_exception():
+    documents = [action('a', next=['b']), action('b', next=['a']), action('c', next=['a'])]
+
+    with pytest.raises(ModelException) as error:
+        _sort_topologically(documents)
+
+    assert error.value.describe()['default'] == ModelExceptionType.INVALID_GRAPH.value
+    assert "['a', 'b']" in error.value.describe()['description']
+
+
+def test_graph_pipeline_keeps_the_link_fields():
+    pipeline = _build_graph_pipeline('actions', IDS[:2], GRAPH_FIELDS, {'type': 1})
+
+    assert pipeline[0] == {'$match': {'_id': {'$in': [ObjectId(id) for id in IDS[:2]]}}}
+    assert [stage['$graphLookup']['connectFromField'] for stage in pipeline if '$graphLookup' in stage] == GRAPH_FIELDS
+    assert pipeline[-1] == {'$project': {'type': 1, **{field: 1 for field in GRAPH_FIELDS}}}
+
+
+def test_graph_frontier_contains_the_unknown_links():
+    documents = {}
+    frontier = _get_graph_frontier(documents, [action('a', next=['b']), action('b', dependencies=['c', 'a'])],
+                                   GRAPH_FIELDS)
+
+    assert frontier == ['c']
+    assert sorted(documents) == ['a', 'b']
+    assert _get_graph_frontier(documents, [action('c', next=['b'])], GRAPH_FIELDS) == []
+
+
+def test_find_graph_follows_the_mixed_paths():
+    # root -next-> 1 <-dependencies- 2 : 3 is only reached through the dependencies of 2
+    collection = GraphCollection([action(IDS[0], next=[IDS[1]]),
+                                  action(IDS[1], dependencies=[IDS[2]]),
+                                  action(IDS[2], dependencies=[IDS[3]]),
+                                  action(IDS[3], next=[IDS[4]]),
+                                  action(IDS[4])])
+    driver = MongoDriver('localhost', 27017, 'mars', 'actions', lazy=True)
+    driver._MongoDriver__get_raw_collection = lambda: collection
+
+    documents = driver.find_graph(IDS[0], GRAPH_FIELDS)
+
+    assert sorted(str(document['_id']) for document in documents) == sorted(IDS)
+    assert collection.aggregations == 3
+
+
+def test_graph_from_memory_database(environment, make_drilling):
+    # a -next-> b -dependencies-> c -dependencies-> d
+    environment([make_drilling('a', next=['b']),
+                 make_drilling('b', dependencies=['c']),
+                 make_drilling('c', dependencies=['d']),
+                 make_drilling('d')])
+
+    actions = Action.get_graph_from_db('a')
+
+    assert [action.id for action in actions] == ['a', 'd', 'c', 'b']
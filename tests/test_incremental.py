@@ -0,0 +1,81 @@
+from db.memory import MemoryDriver
+from model.incremental import IncrementalGenerator
+
+
+class WatermarkDriver(MemoryDriver):
+    """memory driver able to find the documents updated since a date (included, like the mongo driver)"""
+    def __init__(self, documents):
+        super().__init__(documents)
+        self.queries = []
+
+    def find_updated_since(self, field, value, projection=None):
+        self.queries.append(value)
+        return [document for document in self.find_all(projection)
+                if document.get(field) is not None and document[field] >= value]
+
+
+def test_only_new_and_modified_actions_are_rebuilt(environment, make_drilling):
+    driver = environment([make_drilling('a'), make_drilling('b')])
+    generator = IncrementalGenerator()
+
+    assert generator.regenerate(['a', 'b'])['rebuilt'] == ['a', 'b']
+
+    driver.update('b', {'definition': {'speed': 500, 'feed': 20, 'peak': False}})
+    report = generator.regenerate(['a', 'b'])
+
+    assert report['rebuilt'] == ['b']
+    assert report['unchanged'] == ['a']
+    assert generator.get_commands('b') is not None
+
+
+def test_deleted_and_unknown_actions_are_missing(environment, make_drilling):
+    driver = environment([make_drilling('a'), make_drilling('b')])
+    generator = IncrementalGenerator()
+    generator.regenerate(['a', 'b'])
+
+    driver.delete('a')
+    report = generator.regenerate(['a', 'b', 'c'])
+
+    assert sorted(report['missing']) == ['a', 'c']
+    assert generator.get_commands('a') is None
+
+
+def test_non_valid_definition_is_reported(environment, make_drilling):
+    document = make_drilling('a')
+    del document['definition']['feed']
+    environment([document])
+
+    report = IncrementalGenerator().regenerate(['a'])
+
+    assert report['missing'] == ['a']
+    assert report['errors']['a']['default'] == 'MODEL_PARSING_ERROR'
+
+
+def test_watermark_is_kept_by_action(environment, make_drilling):
+    driver = WatermarkDriver([make_drilling('a', updated_at=1), make_drilling('b', updated_at=5)])
+    environment([], driver)
+    generator = IncrementalGenerator()
+    generator.regenerate(['a'])
+    generator.regenerate(['b'])
+
+    # a is modified after its own watermark but before the watermark of b
+    driver.update('a', {'definition': {'speed': 500, 'feed': 20, 'peak': False}, 'updated_at': 3})
+
+    assert generator.regenerate(['b'])['rebuilt'] == []
+    assert generator.regenerate(['a'])['rebuilt'] == ['a']
+    assert driver.queries == [5, 1]
+    assert generator.get_watermark(['a', 'b']) == 3
+
+
+def test_deletion_is_reported_with_watermark(environment, make_drilling):
+    driver = WatermarkDriver([make_drilling('a', updated_at=1), make_drilling('b', updated_at=2)])
+    environment([], driver)
+    generator = IncrementalGenerator()
+    generator.regenerate(['a', 'b'])
+
+    driver.delete('a')
+    report = generator.regenerate(['a', 'b'])
+
+    assert driver.queries == [1]
+    assert report['missing'] == ['a']
+    assert report['unchanged'] == ['b']
@@ -0,0 +1,39 @@
+import math
+import numpy as np
+import pytest
+from model.movement import round_vectors
+
+SPECIAL_VALUES = [0.0005, 0.0015, 0.0025, -0.0005, -0.0025, 1.0005, 2.675, -2.675, 1.2345, 0.1235,
+                  0.0, -0.0, -0.0004, float('nan'), float('inf'), float('-inf'),
+                  2.0 ** 52, -2.0 ** 52, 1e300, -1e300, 4503599627370.4995, 5e-324]
+
+
+def _python_round(vectors, decimals=3):
+    return [[round(float(value), decimals) for value in vector] for vector in vectors]
+
+
+def _same(rounded, expected):
+    # repr distinguishes -0.0 from 0.0 and compares nan
+    return [list(map(repr, vector)) for vector in rounded] == [list(map(repr, vector)) for vector in expected]
+
+
+def test_special_values_are_rounded_like_python():
+    values = SPECIAL_VALUES + [0.0] * (-len(SPECIAL_VALUES) % 6)
+    vectors = np.array(values).reshape(-1, 6)
+
+    assert _same(round_vectors(vectors), _python_round(vectors))
+
+
+@pytest.mark.parametrize('scale', [1e-3, 1.0, 1e3, 1e6, 1e12])
+def test_random_values_are_rounded_like_python(scale):
+    rng = np.random.default_rng(16)
+    vectors = rng.uniform(-scale, scale, (1000, 6))
+    # exact ties of the decimal representation
+    vectors[:500] = np.round(vectors[:500], 3) + 0.0005
+
+    assert _same(round_vectors(vectors), _python_round(vectors))
+
+
+def test_single_vector_is_rounded():
+    assert round_vectors([1.0005, -0.0, 2.675, 0.5, math.pi, -math.e]) == \
+        [round(value, 3) for value in [1.0005, -0.0, 2.675, 0.5, math.pi, -math.e]]
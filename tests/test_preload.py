@@ -0,0 +1,90 @@
+import time
+from db.memory import MemoryDriver
+from db.preload import PreloadedDriver
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class NotWatchedDriver:
+    """driver without change notifications and without watermark"""
+    def __init__(self, documents):
+        self.documents = {document['_id']: document for document in documents}
+
+    def find_all(self, projection=None):
+        return list(self.documents.values())
+
+
+class WatermarkDriver(NotWatchedDriver):
+    """driver without change notifications, finding the documents updated since a date (included)"""
+    def find_updated_since(self, field, value, projection=None):
+        return [document for document in self.documents.values() if document.get(field, value) >= value]
+
+
+class ModifiedDuringLoadDriver(MemoryDriver):
+    """memory driver modifying a document while the collection is loaded"""
+    def find_all(self, projection=None):
+        for n, document in enumerate(super().find_all(projection)):
+            if n == 0:
+                self.update('b', {'value': 2})
+            yield document
+
+
+def test_collection_is_loaded():
+    driver = PreloadedDriver(MemoryDriver([{'_id': 'a'}, {'_id': 'b'}]))
+
+    assert len(driver) == 2
+    assert driver.find_by_ids(['b', 'c']) == [{'_id': 'b'}]
+    driver.close()
+
+
+def test_changes_are_followed():
+    memory = MemoryDriver([{'_id': 'a', 'value': 1}])
+    driver = PreloadedDriver(memory)
+
+    memory.insert({'_id': 'b', 'value': 1})
+    memory.update('a', {'value': 2})
+    memory.delete('b')
+    memory.insert({'_id': 'c', 'value': 1})
+
+    assert wait_until(lambda: driver.find_by_id('c') is not None)
+    assert driver.find_by_id('a')['value'] == 2
+    assert driver.find_by_id('b') is None
+    driver.close()
+
+
+def test_change_during_the_load_is_not_lost():
+    memory = ModifiedDuringLoadDriver([{'_id': 'a', 'value': 1}, {'_id': 'b', 'value': 1}])
+    driver = PreloadedDriver(memory)
+
+    assert wait_until(lambda: driver.find_by_id('b')['value'] == 2)
+    driver.close()
+
+
+def test_collection_is_reloaded_without_watch_and_watermark():
+    source = NotWatchedDriver([{'_id': 'a'}])
+    driver = PreloadedDriver(source, sync_interval=0.01)
+
+    source.documents['b'] = {'_id': 'b'}
+    del source.documents['a']
+
+    assert wait_until(lambda: driver.find_by_id('b') is not None and driver.find_by_id('a') is None)
+    driver.close()
+
+
+def test_document_of_the_watermark_date_is_synchronized():
+    source = WatermarkDriver([{'_id': 'a', 'updated_at': 10}])
+    driver = PreloadedDriver(source, sync_interval=0.01)
+
+    # written after the load with the same date as the watermark
+    source.documents['b'] = {'_id': 'b', 'updated_at': 10}
+
+    assert wait_until(lambda: driver.find_by_id('b') is not None)
+    assert driver.watermark == 10
+    driver.close()
@@ -0,0 +1,85 @@
+import json
+import re
+import mars
+from mars.template import CommandTemplateCache, get_definition_key
+from model.definition import Drilling
+from model.uid import DeterministicUidGenerator, set_uid_generator, uid_scope
+import model.uid
+
+DRILLING = {'speed': 1000, 'feed': 20, 'peak': True}
+UID = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+
+
+def uids(commands):
+    return UID.findall(json.dumps(commands))
+
+
+def normalize(commands):
+    # uids replaced by their order of appearance, the references between commands are kept
+    numbers = {}
+    return UID.sub(lambda match: str(numbers.setdefault(match.group(0), len(numbers))), json.dumps(commands))
+
+
+def build(definition):
+    return mars.COMMAND_REGISTER['WORK.DRILL'](definition)
+
+
+def test_definition_key_depends_on_the_content():
+    key = get_definition_key('WORK.DRILL', Drilling.parse(DRILLING))
+
+    assert key == get_definition_key('WORK.DRILL', Drilling.parse(dict(reversed(DRILLING.items()))))
+    assert key != get_definition_key('WORK.DRILL', Drilling.parse({**DRILLING, 'feed': 30}))
+    assert key != get_definition_key('WORK.PROBE', Drilling.parse(DRILLING))
+
+
+def test_skeleton_is_built_once_with_new_uids_by_request():
+    cache = CommandTemplateCache()
+
+    first = cache.get('WORK.DRILL', Drilling.parse(DRILLING), build)
+    second = cache.get('WORK.DRILL', Drilling.parse(DRILLING), build)
+
+    assert cache.to_dict() == {'templates': 1, 'requests': 2, 'built': 1}
+    assert normalize(first) == normalize(second)
+    assert not set(uids(first)) & set(uids(second))
+
+
+def test_template_gives_the_builder_commands():
+    commands = CommandTemplateCache().get('WORK.DRILL', Drilling.parse(DRILLING), build)
+
+    assert normalize(commands) == normalize([command.to_dict() for command in build(Drilling.parse(DRILLING))])
+
+
+def test_max_templates_is_respected():
+    cache = CommandTemplateCache(max_templates=1)
+    cache.get('WORK.DRILL', Drilling.parse(DRILLING), build)
+
+    commands = cache.get('WORK.DRILL', Drilling.parse({**DRILLING, 'feed': 30}), build)
+
+    assert len(cache) == 1
+    assert commands is not None
+    cache.clear()
+    assert cache.to_dict() == {'templates': 0, 'requests': 0, 'built': 0}
+
+
+def test_manipulation_templates_are_precompiled(environment):
+    environment([])
+    manipulation = {'equipment': {'type': 'EFFECTOR', 'reference': 'WEB_C_DRILLING'}, 'manipulation': 'LOAD'}
+    built = mars.COMMAND_TEMPLATES.to_dict()['built']
+
+    mars.COMMAND_TRANSLATORS['LOAD.EFFECTOR'](manipulation)
+
+    assert mars.COMMAND_TEMPLATES.to_dict()['built'] == built
+
+
+def test_deterministic_uids_do_not_depend_on_the_skeleton(monkeypatch):
+    monkeypatch.setattr(model.uid, 'UID_GENERATOR', model.uid.UID_GENERATOR)
+    set_uid_generator(DeterministicUidGenerator('seed'))
+
+    def generate(cache):
+        with uid_scope(('action', 'hash')):
+            return cache.get('WORK.DRILL', Drilling.parse(DRILLING), build)
+
+    cache = CommandTemplateCache()
+    generate(cache)
+
+    assert generate(cache) == generate(CommandTemplateCache())
@@ -0,0 +1,60 @@
+import pytest
+from mars import proxy
+from mars.exceptions import MarsException
+from mars.proxy import (DEFAULT_TRACKING_INTERVAL, Program, TrackingPolicy, build_tracking_policy,
+                        estimate_drilling_duration, run_program, set_tracking_policy)
+
+
+@pytest.fixture
+def tracking_policy(monkeypatch):
+    """set a tracking policy for the test, the default policy is restored after the test"""
+    monkeypatch.setattr(proxy, 'TRACKING_POLICY', proxy.TRACKING_POLICY)
+    return set_tracking_policy
+
+
+def tracker_settings(commands):
+    return commands[1].definition['body']['setting']['settings']
+
+
+def test_fixed_interval_by_default():
+    settings = tracker_settings(run_program(Program.TRAJ_GEN, 12.0))
+
+    assert settings['interval'] == DEFAULT_TRACKING_INTERVAL
+    assert 'delay' not in settings and 'backoff' not in settings
+
+
+def test_adaptive_schedule(tracking_policy):
+    tracking_policy(TrackingPolicy(adaptive=True))
+
+    settings = tracker_settings(run_program(Program.TRAJ_GEN, 12.0))
+
+    assert settings['delay'] == 9600
+    assert settings['interval'] == 100
+    assert settings['backoff'] == {'factor': 2.0, 'max_interval': DEFAULT_TRACKING_INTERVAL}
+
+
+def test_adaptive_delay_is_capped(tracking_policy):
+    tracking_policy(TrackingPolicy(adaptive=True, max_delay=5000))
+
+    assert tracker_settings(run_program(Program.TRAJ_GEN, 1363.737))['delay'] == 5000
+
+
+def test_unknown_duration_keeps_the_fixed_interval(tracking_policy):
+    tracking_policy(TrackingPolicy(adaptive=True))
+
+    assert tracker_settings(run_program(Program.TRAJ_GEN))['interval'] == DEFAULT_TRACKING_INTERVAL
+
+
+def test_drilling_duration_uses_the_configured_stroke(tracking_policy):
+    assert estimate_drilling_duration(20, False) == 30.0
+    assert estimate_drilling_duration(0, False) is None
+
+    tracking_policy(build_tracking_policy({'drilling_stroke': 5}))
+
+    assert estimate_drilling_duration(20, True) == 30.0
+
+
+@pytest.mark.parametrize('config', [{'backoff': 0.5}, {'max_delay': -1}, {'fast_interval': 'fast'}])
+def test_not_conform_configuration_raises(config):
+    with pytest.raises(MarsException):
+        build_tracking_policy(config)
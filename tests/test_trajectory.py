@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from model.exceptions import ModelException
+from model.movement import Movement
+from model.trajectory import PathArray
+
+
+def test_trajectory_round_trip(make_movement):
+    path = PathArray.parse([make_movement(x=1.5, e1=10, speed=30, cnt=50),
+                            make_movement(x=2.0, type='JOINT', joint=True)])
+
+    copy = PathArray.from_trajectory(path.to_trajectory())
+
+    assert np.array_equal(copy.vectors, path.vectors)
+    assert copy.e1.tolist() == [10, 0]
+    assert copy.speed.tolist() == [30, 50]
+    assert copy.cnt.tolist() == [50, 100]
+
+
+def test_integral_float_values_are_accepted(make_movement):
+    path = PathArray.parse([make_movement(e1=1234.0, speed=40.0)])
+
+    assert path.e1.tolist() == [1234]
+    assert path.speed.tolist() == [40]
+
+
+@pytest.mark.parametrize('fields', [{'e1': 1234.5}, {'speed': 12.5}, {'cnt': float('nan')}, {'e1': 2 ** 31}])
+def test_not_integer_values_are_rejected(make_movement, fields):
+    with pytest.raises(ModelException):
+        PathArray.parse([make_movement(), make_movement(**fields)])
+
+
+def test_movement_objects_are_validated(make_movement):
+    movement = Movement.parse(make_movement(e1=1234.5))
+
+    with pytest.raises(ModelException):
+        PathArray.from_movements([movement])
+
+
+def test_shared_command_data_is_not_modified_by_a_caller(make_movement):
+    path = PathArray.parse([make_movement(), make_movement(x=1.0)])
+    positions = path.positions_to_cmd_data()
+    parameters = path.parameters_to_cmd_data()
+
+    positions[0]['config']['wrist'] = 'FLIP'
+    parameters[0]['speed'] = 1
+
+    assert path.positions_to_cmd_data()[1]['config']['wrist'] == 'NOFLIP'
+    assert path.parameters_to_cmd_data()[1]['speed'] == 50
+
+
+def _corrupt(trajectory, field, value):
+    trajectory = dict(trajectory)
+    trajectory[field] = value
+    return trajectory
+
+
+@pytest.mark.parametrize('field, value', [('count', 3),
+                                          ('count', None),
+                                          ('vectors', b'\x00' * 8),
+                                          ('e1', b''),
+                                          ('config', b'\x00' * 6),
+                                          ('type', b'\x03\x01'),
+                                          ('position_type', b'\x00\x02'),
+                                          ('config', b'\x00\x02\x00\x00\x00\x00' * 2),
+                                          ('speed', None)])
+def test_malformed_trajectory_is_rejected(make_movement, field, value):
+    trajectory = PathArray.parse([make_movement(), make_movement(x=1.0)]).to_trajectory()
+
+    with pytest.raises(ModelException):
+        PathArray.from_trajectory(_corrupt(trajectory, field, value))
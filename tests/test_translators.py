@@ -0,0 +1,75 @@
+import json
+import re
+import pytest
+import mars
+import model
+from model.action import ACTION_DEFINITION
+from model.trajectory import encode_trajectory
+
+UID = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+MOVEMENT_TYPES = ['LINEAR', 'JOINT', 'CIRCULAR']
+EFFECTOR = {'type': 'EFFECTOR', 'reference': 'WEB_C_DRILLING'}
+
+
+def normalize(commands):
+    # uids replaced by their order of appearance, the references between commands are kept
+    numbers = {}
+    return UID.sub(lambda match: str(numbers.setdefault(match.group(0), len(numbers))), json.dumps(commands))
+
+
+def movements(make_movement, count):
+    # several trajectory windows, joint and cartesian positions, all the movement types
+    return [make_movement(x=n * 1.0005, y=-n / 3, z=2.675, speed=10 + n, cnt=n % 101,
+                          type=MOVEMENT_TYPES[n % 3], e1=n, joint=n % 7 == 3)
+            for n in range(count)]
+
+
+def path(make_movement, ut='WEB_C_DRILLING', uf='CELL_FRAME', count=70):
+    return {'ut': ut, 'uf': uf, 'movements': movements(make_movement, count)}
+
+
+DEFINITIONS = {
+    'MOVE.TCP.WORK': lambda make_movement: path(make_movement),
+    'MOVE.TCP.APPROACH': lambda make_movement: path(make_movement, count=5),
+    'MOVE.TCP.CLEARANCE': lambda make_movement: path(make_movement, count=1),
+    'MOVE.STATION.WORK': lambda make_movement: path(make_movement),
+    'MOVE.STATION.TOOL': lambda make_movement: path(make_movement, count=3),
+    'MOVE.STATION.HOME': lambda make_movement: path(make_movement, ut='NONE', uf='NONE', count=3),
+    'WORK.DRILL': lambda make_movement: {'speed': 1000, 'feed': 20, 'peak': True},
+    'WORK.PROBE': lambda make_movement: {'ut': 'WEB_C_DRILLING', 'uf': 'CELL_FRAME',
+                                         'movement': make_movement(x=1.0005, speed=20)},
+    'LOAD.EFFECTOR': lambda make_movement: {'equipment': EFFECTOR, 'manipulation': 'LOAD'},
+    'UNLOAD.EFFECTOR': lambda make_movement: {'equipment': EFFECTOR, 'manipulation': 'UNLOAD'},
+}
+
+
+def reference(action_type, definition):
+    # object path : definition object, command objects, then dict format
+    commands = model.COMMAND_REGISTER[action_type](ACTION_DEFINITION[action_type].parse(definition))
+    return [command.to_dict() for command in commands]
+
+
+def test_all_the_action_types_are_tested():
+    assert set(DEFINITIONS) == set(ACTION_DEFINITION)
+
+
+@pytest.mark.parametrize('action_type', sorted(DEFINITIONS))
+def test_translator_gives_the_object_path_commands(environment, make_movement, action_type):
+    environment([])
+    definition = DEFINITIONS[action_type](make_movement)
+
+    commands = mars.COMMAND_TRANSLATORS[action_type](definition)
+
+    assert normalize(commands) == normalize(reference(action_type, definition))
+
+
+@pytest.mark.parametrize('action_type', ['MOVE.TCP.WORK', 'MOVE.STATION.HOME'])
+def test_translator_gives_the_object_path_commands_for_a_columnar_trajectory(environment, make_movement,
+                                                                               action_type):
+    environment([])
+    definition = DEFINITIONS[action_type](make_movement)
+    definition['trajectory'] = encode_trajectory(definition.pop('movements'))
+
+    commands = mars.COMMAND_TRANSLATORS[action_type](definition)
+
+    assert normalize(commands) == normalize(reference(action_type, definition))
@@ -0,0 +1,42 @@
+import re
+import pytest
+from exceptions import BaseException
+from model.uid import (BatchedRandomUidGenerator, CounterUidGenerator, DeterministicUidGenerator,
+                       build_uid_generator, uid_scope)
+
+UID = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+
+
+@pytest.mark.parametrize('generator', [BatchedRandomUidGenerator(4), CounterUidGenerator(),
+                                       DeterministicUidGenerator('seed')])
+def test_uids_are_unique(generator):
+    with uid_scope(('action', 'hash')):
+        uids = [generator.new('content') for _ in range(10)]
+
+    assert len(set(uids)) == 10
+    assert all(UID.match(uid) for uid in uids)
+
+
+def test_deterministic_uids_depend_on_the_scope_and_the_seed():
+    def generate(seed, key):
+        generator = DeterministicUidGenerator(seed)
+        with uid_scope(key):
+            return [generator.new('a'), generator.new('b'), generator.new('a')]
+
+    assert generate('seed', ('action', 'hash')) == generate('seed', ('action', 'hash'))
+    assert generate('seed', ('action', 'hash')) != generate('seed', ('action', 'other hash'))
+    assert generate('seed', ('action', 'hash')) != generate('other seed', ('action', 'hash'))
+
+
+def test_deterministic_uids_are_random_out_of_a_scope():
+    generator = DeterministicUidGenerator()
+
+    assert generator.new('a') != generator.new('a')
+
+
+def test_build_uid_generator():
+    assert isinstance(build_uid_generator({'strategy': 'counter'}), CounterUidGenerator)
+    with pytest.raises(BaseException):
+        build_uid_generator({'strategy': 'SEQUENTIAL'})
+    with pytest.raises(BaseException):
+        build_uid_generator({'strategy': 'BATCHED', 'batch_size': 'big'})
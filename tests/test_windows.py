@@ -0,0 +1,55 @@
+import numpy as np
+import mars
+from mars.proxy import (ConstantRegister, Program, RegisterType, TRAJECTORY_WINDOW,
+                        decode_register_write, movements_windows)
+from model.trajectory import PathArray
+
+
+def test_trajectory_window_fits_in_the_registers():
+    # positions from POSITION_BEGIN in the position bank
+    assert ConstantRegister.POSITION_BEGIN + TRAJECTORY_WINDOW - 1 <= RegisterType.POSITION_CARTESIAN.bank_size
+    # number of movements + type, speed and cnt of each movement before the effector reference
+    assert ConstantRegister.MOVEMENT_PARA_BEGIN + 3 * TRAJECTORY_WINDOW < ConstantRegister.EFFECTOR_REFERENCE
+
+
+def test_windows_split_the_path(make_movement):
+    path = PathArray.parse([make_movement(x=float(i)) for i in range(100)])
+
+    windows = list(movements_windows(path, 43))
+
+    assert [len(window) for window in windows] == [43, 43, 14]
+    assert windows[1].vectors[0, 0] == 43.0
+    # the windows are views on the path arrays
+    assert all(np.shares_memory(window.vectors, path.vectors) for window in windows)
+
+
+def test_estimate_duration(make_movement):
+    path = PathArray.parse([make_movement(),
+                            make_movement(x=100.0, speed=50),
+                            make_movement(x=100.0, y=50.0, speed=25),
+                            make_movement(x=500.0, type='JOINT')])
+
+    # 100 mm at 50 mm/s + 50 mm at 25 mm/s, the joint movement is not counted
+    assert path.estimate_duration() == 4.0
+    assert path.window(0, 1).estimate_duration() == 0.0
+
+
+def test_long_path_commands_respect_the_register_banks(make_movement):
+    count = 2 * TRAJECTORY_WINDOW + 5
+    definition = {'ut': 'WEB_C_DRILLING', 'uf': 'CELL_FRAME',
+                  'movements': [make_movement(x=float(i)) for i in range(count)]}
+
+    commands = mars.COMMAND_TRANSLATORS['MOVE.TCP.WORK'](definition)
+
+    writes = [decode_register_write(command['definition']) for command in commands
+              if command['target'] == "PROXY" and command['definition'].get('method') == 'PUT']
+    launches = [write for write in writes
+                if write[0] is RegisterType.NUMERIC_INT and write[1] == ConstantRegister.PROGRAM]
+    positions = [write for write in writes if write[0].base_path == RegisterType.POSITION_CARTESIAN.base_path]
+    parameters = [write for write in writes
+                  if write[0] is RegisterType.NUMERIC_INT and write[1] >= ConstantRegister.MOVEMENT_PARA_BEGIN]
+
+    assert [write[2] for write in launches] == [[Program.CHANGE_UTUF.value]] + 3 * [[Program.TRAJ_GEN.value]]
+    assert sum(len(write[2]) for write in positions) == count
+    assert all(write[1] + len(write[2]) - 1 <= write[0].bank_size for write in positions)
+    assert all(write[1] + len(write[2]) - 1 < ConstantRegister.EFFECTOR_REFERENCE for write in parameters)